@@ -0,0 +1,177 @@
+"""Versioned snapshots of the game data as generated for the wiki, and the diff between two of them.
+
+A snapshot holds the cargo rows of every table (see wiki/data_tables.py), keyed by lua id, or by name for the
+tables without one (ex. recipeUsage). Snapshots are stored in SQLite, one zlib compressed json blob per table, under
+a game version: a build id, or by default a digest of the game files (see lua_util.game_files_digest).
+
+Comparing two versions gives the objects added, removed, renamed and changed in each table: the next steps only
+have to generate and upload those (see game_snapshot and ChangeSet).
+
+Example Usage:
+
+    store = SnapshotStore(Path(".game_snapshots.sqlite"))
+    store.save(version, take_snapshot(get_data_tables(game)))
+    diff = diff_snapshots(store.load(store.previous_version(version)), store.load(version))
+    diff.log()
+"""
+
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+import json
+from pathlib import Path
+import sqlite3
+from typing import Any
+import zlib
+
+from desynced_wiki_scripts.util.logger import get_logger
+from desynced_wiki_scripts.wiki.data_tables import TableData
+from desynced_wiki_scripts.wiki.lua_data import to_rows
+
+logger = get_logger()
+
+TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshot (
+    version TEXT PRIMARY KEY,
+    created TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS snapshot_table (
+    version TEXT NOT NULL,
+    name TEXT NOT NULL,
+    data BLOB NOT NULL,
+    PRIMARY KEY (version, name)
+);
+"""
+
+
+@dataclass
+class SnapshotObject:
+    name: str
+    # Cargo fields, empty ones left out.
+    fields: dict[str, Any]
+
+
+# Table name -> object key -> object
+Snapshot = dict[str, dict[str, SnapshotObject]]
+
+
+def object_key(obj: Any) -> str:
+    """Stable id of an object across versions: its lua id, else its name."""
+    return getattr(obj, "lua_id", None) or obj.name
+
+
+def take_snapshot(tables: dict[str, TableData]) -> Snapshot:
+    snapshot: Snapshot = {}
+    for table_name, table in tables.items():
+        objects = list(table.objects)
+        snapshot[table_name] = {object_key(obj): SnapshotObject(obj.name, row) for obj, row in zip(objects, to_rows(table.type, objects))}
+    return snapshot
+
+
+@dataclass
+class TableDiff:
+    # Names, in the new version for renamed or changed objects.
+    added: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+    # (old name, new name)
+    renamed: list[tuple[str, str]] = field(default_factory=list)
+    # Name -> changed fields
+    changed: dict[str, list[str]] = field(default_factory=dict)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.renamed or self.changed)
+
+    def updated_names(self) -> set[str]:
+        """Objects whose data file must be written and uploaded."""
+        return {*self.added, *(new for _, new in self.renamed), *self.changed}
+
+
+@dataclass
+class SnapshotDiff:
+    tables: dict[str, TableDiff]
+
+    def log(self):
+        logger.info(f"{'Table':<20} | {'Added':>6} | {'Removed':>7} | {'Renamed':>7} | {'Changed':>7}")
+        logger.info("-" * 59)
+        for table_name, d in sorted(self.tables.items()):
+            logger.info(f"{table_name:<20} | {len(d.added):>6} | {len(d.removed):>7} | {len(d.renamed):>7} | {len(d.changed):>7}")
+        for table_name, d in sorted(self.tables.items()):
+            for name in d.added:
+                logger.debug(f"{table_name}: added {name}")
+            for name in d.removed:
+                logger.debug(f"{table_name}: removed {name}")
+            for old_name, new_name in d.renamed:
+                logger.info(f"{table_name}: renamed {old_name} -> {new_name}")
+            for name, fields in d.changed.items():
+                logger.debug(f"{table_name}: changed {name}: {', '.join(fields)}")
+
+
+def diff_tables(old: dict[str, SnapshotObject], new: dict[str, SnapshotObject]) -> TableDiff:
+    diff = TableDiff()
+    for key, new_object in new.items():
+        old_object = old.get(key)
+        if old_object is None:
+            diff.added.append(new_object.name)
+            continue
+        if old_object.name != new_object.name:
+            diff.renamed.append((old_object.name, new_object.name))
+        changed_fields = sorted(
+            name for name in old_object.fields.keys() | new_object.fields.keys() if old_object.fields.get(name) != new_object.fields.get(name)
+        )
+        if changed_fields:
+            diff.changed[new_object.name] = changed_fields
+    diff.removed = [old_object.name for key, old_object in old.items() if key not in new]
+    return diff
+
+
+def diff_snapshots(old: Snapshot, new: Snapshot) -> SnapshotDiff:
+    """Compares two versions by object key, for the tables of both. Tables of only one of them are ignored."""
+    return SnapshotDiff({table_name: diff_tables(old[table_name], new[table_name]) for table_name in new if table_name in old})
+
+
+class SnapshotStore:
+    def __init__(self, path: Path | str):
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(_SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def save(self, version: str, snapshot: Snapshot):
+        """Saves the snapshot of a version, replacing the previous one of the same version."""
+        created = datetime.now(UTC).strftime(TIMESTAMP_FORMAT)
+        with self.connection:
+            self.connection.execute("INSERT OR IGNORE INTO snapshot (version, created) VALUES (?, ?)", (version, created))
+            self.connection.execute("DELETE FROM snapshot_table WHERE version = ?", (version,))
+            self.connection.executemany(
+                "INSERT INTO snapshot_table (version, name, data) VALUES (?, ?, ?)",
+                ((version, table_name, self._encode(objects)) for table_name, objects in snapshot.items()),
+            )
+        logger.info(f"Saved game data snapshot {version}")
+
+    def load(self, version: str) -> Snapshot:
+        rows = self.connection.execute("SELECT name, data FROM snapshot_table WHERE version = ?", (version,)).fetchall()
+        if not rows:
+            raise KeyError(f"No snapshot of version {version}, saved versions: {self.versions()}")
+        return {table_name: self._decode(data) for table_name, data in rows}
+
+    def versions(self) -> list[str]:
+        """Saved versions, oldest first."""
+        return [row[0] for row in self.connection.execute("SELECT version FROM snapshot ORDER BY created, rowid")]
+
+    def previous_version(self, version: str) -> str | None:
+        """Version saved last before `version`."""
+        versions = self.versions()
+        index = versions.index(version) if version in versions else len(versions)
+        return versions[index - 1] if index > 0 else None
+
+    @staticmethod
+    def _encode(objects: dict[str, SnapshotObject]) -> bytes:
+        content = {key: [obj.name, obj.fields] for key, obj in objects.items()}
+        return zlib.compress(json.dumps(content, ensure_ascii=False, sort_keys=True).encode("utf-8"))
+
+    @staticmethod
+    def _decode(data: bytes) -> dict[str, SnapshotObject]:
+        content: dict[str, list] = json.loads(zlib.decompress(data).decode("utf-8"))
+        return {key: SnapshotObject(name, fields) for key, (name, fields) in content.items()}
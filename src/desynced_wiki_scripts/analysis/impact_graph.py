@@ -0,0 +1,124 @@
+"""Which wiki pages show the data of an object, to purge them when it changes.
+
+Human pages render more than their own object: recipes list ingredients and producers (Recipe cargo), items list what
+they are used in, tech pages list prerequisites and unlocks (TechTemplates, Module:TechRecipe). Those come from cargo
+queries, which MediaWiki does not track: a page shows stale data until its parser cache expires, unless purged.
+
+The graph links each row of the generated tables (see wiki/data_tables.py) to the objects whose pages render it, in
+both directions: an ingredient page lists the recipe, the recipe page lists the ingredient. Navboxes are left out:
+they are pre-rendered templates, and editing a template already re-renders the pages including it.
+
+Example Usage:
+
+    graph = ImpactGraph.from_tables(get_data_tables(game))
+    titles = graph.affected_pages([(DataCategory.item, "Metal Ore")])
+"""
+
+from collections import defaultdict
+from pathlib import Path
+from typing import Iterable
+
+from desynced_wiki_scripts.models.category_filters import CategoryFilter
+from desynced_wiki_scripts.util.logger import get_logger
+from desynced_wiki_scripts.wiki.data_categories import DataCategory, category_has_human_pages
+from desynced_wiki_scripts.wiki.data_tables import TableData
+from desynced_wiki_scripts.wiki.lua_data import to_rows
+from desynced_wiki_scripts.wiki.navboxes import NAVBOX_TYPES, categorize
+from desynced_wiki_scripts.wiki.titles import get_data_file_name, get_data_page_title, get_human_page_title
+
+logger = get_logger()
+
+# (table, object name)
+Node = tuple[DataCategory, str]
+
+
+class ImpactGraph:
+    def __init__(self):
+        self._links: dict[Node, set[Node]] = defaultdict(set)
+        # Object name -> nodes of the objects with a page of that name, in several tables for name collisions.
+        self._pages_by_name: dict[str, list[Node]] = defaultdict(list)
+        self._nodes: set[Node] = set()
+
+    def add(self, node: Node):
+        self._nodes.add(node)
+        if category_has_human_pages(node[0]):
+            self._pages_by_name[node[1]].append(node)
+
+    def link(self, node: Node, name: str):
+        """Links `node` to the objects with a page named `name`, in both directions."""
+        for other in self._pages_by_name.get(name, []):
+            if other != node:
+                self._links[node].add(other)
+                self._links[other].add(node)
+
+    @staticmethod
+    def from_tables(tables: dict[DataCategory, TableData]) -> "ImpactGraph":
+        graph = ImpactGraph()
+        for table_name, table in tables.items():
+            for obj in table.objects:
+                graph.add((table_name, obj.name))
+
+        def objects(table_name: DataCategory) -> list:
+            return list(tables[table_name].objects) if table_name in tables else []
+
+        for usage in objects(DataCategory.recipeUsage):
+            # Ingredient, producer or miner <-> crafted or mined object.
+            graph.link((DataCategory(usage.target_table), usage.target), usage.subject)
+            graph.link((DataCategory.recipeUsage, usage.name), usage.subject)
+            graph.link((DataCategory.recipeUsage, usage.name), usage.target)
+
+        for tech in objects(DataCategory.tech):
+            for required_tech in tech.required_tech:
+                graph.link((DataCategory.tech, tech.name), required_tech)
+        for unlock in objects(DataCategory.techUnlock):
+            graph.link((DataCategory.tech, unlock.tech_name), unlock.unlocks)
+            graph.link((DataCategory.techUnlock, unlock.name), unlock.tech_name)
+            graph.link((DataCategory.techUnlock, unlock.name), unlock.unlocks)
+        for row in objects(DataCategory.techTree):
+            graph.link((DataCategory.techTree, row.name), row.name)
+        for category in objects(DataCategory.techCategory):
+            for tech in objects(DataCategory.tech):
+                if tech.category == category.name or tech.category in category.sub_categories:
+                    graph.link((DataCategory.techCategory, category.name), tech.name)
+
+        for raw_cost in objects(DataCategory.rawCost):
+            graph.link((DataCategory.rawCost, raw_cost.name), raw_cost.name)
+        for throughput in objects(DataCategory.throughput):
+            graph.link((DataCategory.throughput, throughput.name), throughput.product)
+            graph.link((DataCategory.throughput, throughput.name), throughput.producer)
+
+        graph._link_category_filters(tables)
+        return graph
+
+    def _link_category_filters(self, tables: dict[DataCategory, TableData]):
+        """Links each category filter to the objects it sorts, as the navboxes do."""
+        if DataCategory.categoryFilter not in tables:
+            return
+        filter_rows = to_rows(CategoryFilter, tables[DataCategory.categoryFilter].objects)
+        rows_by_table: dict[DataCategory, list] = {}
+        for navbox_type, type_data in NAVBOX_TYPES.items():
+            if type_data.table not in tables:
+                continue
+            if type_data.table not in rows_by_table:
+                table = tables[type_data.table]
+                rows_by_table[type_data.table] = to_rows(table.type, table.objects)
+            for navbox_category in categorize(navbox_type, filter_rows, rows_by_table[type_data.table]):
+                for name in navbox_category.names:
+                    self.link((DataCategory.categoryFilter, navbox_category.name), name)
+
+    def data_page_titles(self) -> dict[str, Node]:
+        """Data page title of every object, as generated (see iter_output_pages), not normalized by the wiki."""
+        return {get_data_page_title(category, Path(get_data_file_name(name)).stem): (category, name) for category, name in self._nodes}
+
+    def affected_pages(self, changed: Iterable[Node]) -> set[str]:
+        """Titles of the human pages showing the data of the changed objects: their own pages and the linked ones."""
+        affected: set[Node] = set()
+        for node in changed:
+            if node not in self._nodes:
+                logger.debug(f"Unknown changed object {node}, skipping.")
+                continue
+            affected.add(node)
+            affected |= self._links.get(node, set())
+
+        pages = [(category, name) for category, name in affected if category_has_human_pages(category)]
+        return {get_human_page_title(category, Path(get_data_file_name(name)).stem) for category, name in pages}
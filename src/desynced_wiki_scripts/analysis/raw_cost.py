@@ -0,0 +1,83 @@
+from collections import defaultdict
+from dataclasses import dataclass, field
+
+from desynced_wiki_scripts.models.raw_cost import RawCost, RawCostProducer, RawResource
+
+from .recipe_graph import MemoizedWalk, RecipeGraph
+
+# Exported values are rounded, float noise makes for unreadable cargo data.
+PRECISION = 4
+
+
+@dataclass
+class NodeCost:
+    """Cost of one unit of a node."""
+
+    # Raw resource name to amount.
+    resources: dict[str, float] = field(default_factory=dict)
+    # Crafting time with the fastest producer at every step.
+    time: float = 0.0
+
+
+class RawCostCalculator:
+    """Expands every craftable object into its total raw resources and crafting time.
+
+    Each node is resolved once and cached, recipes producing several units are divided accordingly.
+    Crafting time only accounts for producers, not for mining the raw resources.
+
+    Usage:
+        costs = RawCostCalculator(RecipeGraph.from_game_data(game)).compute_all()
+    """
+
+    def __init__(self, graph: RecipeGraph):
+        self.graph = graph
+        self._walk = MemoizedWalk(self._compute, self._raw)
+
+    def cost(self, name: str) -> NodeCost:
+        return self._walk.get(name)
+
+    def compute_all(self) -> list[RawCost]:
+        return [self.raw_cost(name) for name in self.graph.names()]
+
+    def raw_cost(self, name: str) -> RawCost:
+        recipe = self.graph.recipe(name)
+        node = self.cost(name)
+        producers = []
+        if recipe:
+            ingredients_time = self._ingredients_time(name)
+            num_produced = self.graph.num_produced(recipe)
+            producers = [
+                RawCostProducer(producer.producer, round(producer.time / num_produced + ingredients_time, PRECISION))
+                for producer in recipe.producers
+            ]
+
+        return RawCost(
+            name=name,
+            total_time=round(node.time, PRECISION),
+            raw_resources=[RawResource(resource, round(amount, PRECISION)) for resource, amount in sorted(node.resources.items())],
+            producers=producers,
+        )
+
+    @staticmethod
+    def _raw(name: str) -> NodeCost:
+        return NodeCost(resources={name: 1.0})
+
+    def _ingredients_time(self, name: str) -> float:
+        recipe = self.graph.recipe(name)
+        assert recipe
+        num_produced = self.graph.num_produced(recipe)
+        return sum(item.amount / num_produced * self.cost(item.ingredient).time for item in recipe.items)
+
+    def _compute(self, name: str) -> NodeCost:
+        recipe = self.graph.recipe(name)
+        if recipe is None:
+            return self._raw(name)
+
+        num_produced = self.graph.num_produced(recipe)
+        resources: dict[str, float] = defaultdict(float)
+        for item in recipe.items:
+            for resource, amount in self.cost(item.ingredient).resources.items():
+                resources[resource] += item.amount / num_produced * amount
+
+        fastest = min((producer.time for producer in recipe.producers), default=0.0)
+        return NodeCost(resources=dict(resources), time=fastest / num_produced + self._ingredients_time(name))
@@ -0,0 +1,84 @@
+from typing import Callable, Generic, TypeVar
+
+from desynced_wiki_scripts.lua.game_data import GameData
+from desynced_wiki_scripts.models.item import MiningRecipe
+from desynced_wiki_scripts.models.recipe import Recipe, RecipeType
+from desynced_wiki_scripts.util.logger import get_logger
+from desynced_wiki_scripts.wiki.data_categories import DataCategory
+
+logger = get_logger()
+
+T = TypeVar("T")
+
+
+class RecipeGraph:
+    """Craftable objects keyed by name, as referenced by recipe ingredients.
+
+    Nodes without a recipe (or with an empty one) are raw resources.
+    Techs are not part of the graph: their recipes are per research progress, not per crafted object.
+    """
+
+    def __init__(self, recipes: dict[str, Recipe], mining_recipes: dict[str, list[MiningRecipe]] | None = None):
+        self.recipes = recipes
+        self.mining_recipes = mining_recipes or {}
+
+    @staticmethod
+    def from_game_data(game: GameData) -> "RecipeGraph":
+        recipes: dict[str, Recipe] = {}
+        for category, obj, recipe in game.iter_recipes():
+            if category == DataCategory.tech or not recipe.items:
+                continue
+            if obj.name in recipes:
+                logger.warning(f"Recipe graph: '{obj.name}' ({category}) has the same name as another craftable object, keeping the first one.")
+                continue
+            recipes[obj.name] = recipe
+
+        mining_recipes = {item.name: item.mining_recipes for item in game.items if item.mining_recipes}
+        return RecipeGraph(recipes, mining_recipes)
+
+    def recipe(self, name: str) -> Recipe | None:
+        """Returns the recipe crafting `name`, or None for raw resources."""
+        recipe = self.recipes.get(name)
+        if recipe is None or recipe.recipe_type == RecipeType.NONE or not recipe.items:
+            return None
+        return recipe
+
+    def names(self) -> list[str]:
+        """Names of all craftable objects, sorted."""
+        return sorted(name for name in self.recipes if self.recipe(name))
+
+    @staticmethod
+    def num_produced(recipe: Recipe) -> int:
+        # Production recipes created without an amount leave it unset in lua.
+        return recipe.num_produced or 1
+
+
+class MemoizedWalk(Generic[T]):
+    """Resolves each graph node once, recursively, so a whole catalog resolves in linear time.
+
+    `compute` may call `get` on other nodes. A node reached again while it is being computed is a cycle:
+    it resolves to `on_cycle(name)` for that lookup instead of recursing forever.
+    """
+
+    def __init__(self, compute: Callable[[str], T], on_cycle: Callable[[str], T]):
+        self._compute = compute
+        self._on_cycle = on_cycle
+        self._cache: dict[str, T] = {}
+        self._in_progress: set[str] = set()
+
+    def get(self, name: str) -> T:
+        if name in self._cache:
+            return self._cache[name]
+
+        if name in self._in_progress:
+            logger.warning(f"Recipe cycle detected through '{name}', treating it as a raw resource there.")
+            return self._on_cycle(name)
+
+        self._in_progress.add(name)
+        try:
+            value = self._compute(name)
+        finally:
+            self._in_progress.discard(name)
+
+        self._cache[name] = value
+        return value
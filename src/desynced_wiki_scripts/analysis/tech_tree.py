@@ -0,0 +1,102 @@
+import math
+from collections import Counter, deque
+
+from desynced_wiki_scripts.models.recipe import RecipeItem
+from desynced_wiki_scripts.models.tech import Technology, TechnologyTree
+from desynced_wiki_scripts.util.logger import get_logger
+
+logger = get_logger()
+
+
+class TechTree:
+    """Technologies as a DAG of requirements, keyed by tech name.
+
+    Requirements on techs that are not part of the tree (ignored techs) are dropped.
+    """
+
+    def __init__(self, technologies: list[Technology]):
+        self.technologies = {tech.name: tech for tech in technologies}
+        # Tech name to the names of the techs it directly requires.
+        self.prerequisites: dict[str, list[str]] = {}
+        # Tech name to the names of the techs directly requiring it.
+        self.unlocks: dict[str, list[str]] = {name: [] for name in self.technologies}
+        for tech in technologies:
+            required = sorted({req for req in tech.required_tech if req in self.technologies})
+            self.prerequisites[tech.name] = required
+            for req in required:
+                self.unlocks[req].append(tech.name)
+
+        self.order = self._topological_order()
+        self._all_prerequisites: dict[str, list[str]] = {}
+        self._depth: dict[str, int] = {}
+        self._walk()
+
+    def _topological_order(self) -> list[str]:
+        """Kahn's algorithm, visiting ready techs by name so the order is stable between runs."""
+        remaining = {name: len(reqs) for name, reqs in self.prerequisites.items()}
+        ready = deque(sorted(name for name, count in remaining.items() if count == 0))
+        order: list[str] = []
+        while ready:
+            name = ready.popleft()
+            order.append(name)
+            for unlocked in sorted(self.unlocks[name]):
+                remaining[unlocked] -= 1
+                if remaining[unlocked] == 0:
+                    ready.append(unlocked)
+
+        if len(order) != len(self.prerequisites):
+            cyclic = sorted(set(self.prerequisites) - set(order))
+            logger.warning(f"Tech tree: circular requirements between {cyclic}, leaving them out of the tree.")
+        return order
+
+    def _walk(self):
+        position = {name: idx for idx, name in enumerate(self.order)}
+        for name in self.order:
+            reqs = self.prerequisites[name]
+            self._depth[name] = max((self._depth[req] + 1 for req in reqs), default=0)
+
+            closure = set(reqs)
+            for req in reqs:
+                closure.update(self._all_prerequisites[req])
+            self._all_prerequisites[name] = sorted(closure, key=lambda n: position[n])
+
+    def depth(self, name: str) -> int:
+        """Longest chain of requirements leading to `name`, 0 for techs without requirements (seed techs)."""
+        return self._depth[name]
+
+    def all_prerequisites(self, name: str) -> list[str]:
+        """Every tech required before `name`, directly or not, in topological order."""
+        return self._all_prerequisites[name]
+
+    def research_count(self, name: str) -> int:
+        """Number of times the tech recipe must be completed."""
+        tech = self.technologies[name]
+        return math.ceil(tech.progress_count / (tech.recipe.num_produced or 1))
+
+    def cumulative_cost(self, name: str) -> tuple[int, list[RecipeItem]]:
+        """Recipe completions and ingredients needed to research `name` and all its prerequisites."""
+        progress_count = 0
+        amounts: Counter[str] = Counter()
+        for tech_name in self._all_prerequisites[name] + [name]:
+            count = self.research_count(tech_name)
+            progress_count += count
+            for item in self.technologies[tech_name].recipe.items:
+                amounts[item.ingredient] += item.amount * count
+
+        return progress_count, [RecipeItem(ingredient, amount) for ingredient, amount in sorted(amounts.items())]
+
+    def rows(self) -> list[TechnologyTree]:
+        rows = []
+        for name in self.order:
+            progress_count, cost = self.cumulative_cost(name)
+            rows.append(
+                TechnologyTree(
+                    name=name,
+                    lua_id=self.technologies[name].lua_id,
+                    depth=self._depth[name],
+                    cumulative_progress_count=progress_count,
+                    all_prerequisites=self._all_prerequisites[name],
+                    cumulative_cost=cost,
+                )
+            )
+        return rows
@@ -0,0 +1,111 @@
+from dataclasses import dataclass
+
+from desynced_wiki_scripts.lua.game_data import GameData
+from desynced_wiki_scripts.lua.lua_util import duration_to_per_minute
+from desynced_wiki_scripts.models.recipe import Recipe, RecipeProducer, RecipeType
+from desynced_wiki_scripts.models.throughput import Throughput, UpstreamProducer
+
+from .raw_cost import PRECISION
+from .recipe_graph import MemoizedWalk, RecipeGraph
+
+
+@dataclass
+class Supply:
+    """Fastest way to get an ingredient."""
+
+    # Producer or miner name, empty if the ingredient cannot be produced.
+    producer: str = ""
+    items_per_minute: float = 0.0
+    # Power of the whole chain sustaining one such producer.
+    chain_power_per_second: float = 0.0
+
+
+class ThroughputCalculator:
+    """Items/minute per producer of every production recipe, with the upstream producers needed to sustain it.
+
+    Ingredients are always supplied by their fastest producer, or fastest miner for raw resources.
+    Supplies are resolved once per ingredient and reused across the whole recipe graph.
+
+    Usage:
+        throughputs = ThroughputCalculator.from_game_data(game).compute_all()
+    """
+
+    def __init__(self, graph: RecipeGraph, power_by_name: dict[str, float]):
+        self.graph = graph
+        # Power usage per second of producers and miners, by name.
+        self.power_by_name = power_by_name
+        self._supplies = MemoizedWalk(self._compute_supply, lambda _name: Supply())
+
+    @staticmethod
+    def from_game_data(game: GameData) -> "ThroughputCalculator":
+        power_by_name: dict[str, float] = {entity.name: entity.power_usage_per_second for entity in game.entities}
+        power_by_name.update({component.name: component.power_usage_per_second for component in game.components})
+        return ThroughputCalculator(RecipeGraph.from_game_data(game), power_by_name)
+
+    def compute_all(self) -> list[Throughput]:
+        return [
+            self.throughput(name, producer)
+            for name in self.graph.names()
+            for producer in self._production_producers(name)
+        ]
+
+    def supply(self, name: str) -> Supply:
+        return self._supplies.get(name)
+
+    def throughput(self, name: str, producer: RecipeProducer) -> Throughput:
+        recipe = self.graph.recipe(name)
+        assert recipe
+        upstream = self._upstream(recipe, producer)
+
+        return Throughput(
+            name=f"{name}_{producer.producer}",
+            product=name,
+            producer=producer.producer,
+            items_per_minute=round(duration_to_per_minute(producer.time, self.graph.num_produced(recipe)) or 0, PRECISION),
+            power_usage_per_second=self.power_by_name.get(producer.producer, 0),
+            chain_power_per_second=round(self._chain_power(producer, upstream), PRECISION),
+            upstream=[UpstreamProducer(item, self.supply(item).producer, round(count, PRECISION)) for item, count in upstream.items()],
+        )
+
+    def _production_producers(self, name: str) -> list[RecipeProducer]:
+        recipe = self.graph.recipe(name)
+        if not recipe or recipe.recipe_type != RecipeType.PRODUCTION:
+            return []
+        return [producer for producer in recipe.producers if producer.time > 0]
+
+    def _upstream(self, recipe: Recipe, producer: RecipeProducer) -> dict[str, float]:
+        """Ingredient name to number of its fastest producers needed to keep `producer` busy."""
+        crafts_per_minute = duration_to_per_minute(producer.time) or 0
+        upstream = {}
+        for item in recipe.items:
+            supply = self.supply(item.ingredient)
+            upstream[item.ingredient] = item.amount * crafts_per_minute / supply.items_per_minute if supply.items_per_minute else 0.0
+        return upstream
+
+    def _chain_power(self, producer: RecipeProducer, upstream: dict[str, float]) -> float:
+        power = self.power_by_name.get(producer.producer, 0)
+        return power + sum(count * self.supply(item).chain_power_per_second for item, count in upstream.items())
+
+    def _compute_supply(self, name: str) -> Supply:
+        candidates: list[Supply] = []
+        recipe = self.graph.recipe(name)
+        for producer in self._production_producers(name):
+            assert recipe
+            candidates.append(
+                Supply(
+                    producer=producer.producer,
+                    items_per_minute=duration_to_per_minute(producer.time, self.graph.num_produced(recipe)) or 0,
+                    chain_power_per_second=self._chain_power(producer, self._upstream(recipe, producer)),
+                )
+            )
+
+        for mining_recipe in self.graph.mining_recipes.get(name, []):
+            candidates.append(
+                Supply(
+                    producer=mining_recipe.miner_component,
+                    items_per_minute=duration_to_per_minute(mining_recipe.mining_seconds) or 0,
+                    chain_power_per_second=self.power_by_name.get(mining_recipe.miner_component, 0),
+                )
+            )
+
+        return max(candidates, key=lambda supply: supply.items_per_minute, default=Supply())
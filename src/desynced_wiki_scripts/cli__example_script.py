@@ -1,18 +1,21 @@
 # pylint: disable=unused-argument
 # pylint: disable=unused-import
 # (remove those when implementing)
+from __future__ import annotations
 
 import argparse
-from typing import override
+from typing import TYPE_CHECKING, override
 from .cli_tools.common import (
     CliTools,
     CliToolsOptions,
     PageMode,
-    Page,
 )
 from .wiki.data_categories import DataCategory
 from .util.logger import get_logger
 
+if TYPE_CHECKING:
+    from .cli_tools.common import Page
+
 logger = get_logger()
 
 
@@ -0,0 +1,126 @@
+"""Runs the wiki Lua modules over every object locally and reports their cost.
+
+Uses the files written by generate_wiki, nothing is fetched from the wiki.
+"""
+
+import argparse
+from collections import Counter, defaultdict
+from dataclasses import asdict
+import json
+import logging
+from pathlib import Path
+import pprint
+
+from .lua_wiki_modules.harness import CallStats, WikiModuleHarness
+from .util.constants import DEFAULT_WIKI_OUTPUT_DIR
+from .util.logger import get_logger
+from .wiki.cargo.cargo_emulator import CargoQuery
+from .wiki.navboxes import NavboxType
+
+logger = get_logger()
+
+ALL_ROWS = 1_000_000
+
+
+def benchmark(harness: WikiModuleHarness, repeat: int, cold: bool) -> list[CallStats]:
+    tech_names = [row["name"] for row in harness.cargo.query(CargoQuery(tables="tech", fields="name", order_by="name", limit=ALL_ROWS))]
+    calls: list[tuple[str, str, dict[str, str]]] = [
+        ("Navboxes", "create", {"title": navbox_type.value, "type": navbox_type.value}) for navbox_type in NavboxType
+    ]
+    calls += [("TechRecipe", "render", {"name": name}) for name in tech_names]
+
+    results = []
+    modules = {}
+    for _ in range(repeat):
+        for module_name, function, args in calls:
+            if cold or module_name not in modules:
+                modules[module_name] = harness.load_module(module_name)
+            stats = harness.invoke(modules[module_name], function, args, module_name=module_name)
+            if stats.error:
+                logger.error(f"{module_name}.{function}({args}) failed: {stats.error}")
+            results.append(stats)
+    return results
+
+
+def report(results: list[CallStats], slowest: int):
+    by_function: dict[str, list[CallStats]] = defaultdict(list)
+    for stats in results:
+        by_function[f"{stats.module}.{stats.function}"].append(stats)
+
+    logger.info(f"{'Function':<20} | {'Calls':>6} | {'Errors':>6} | {'Total ms':>9} | {'Mean ms':>8} | {'Max ms':>7} | {'Queries':>7} | {'Rows':>6} | {'loadData':>8} | {'Expands':>7}")
+    logger.info("-" * 112)
+    for function, calls in sorted(by_function.items()):
+        times = [c.wall_time * 1000 for c in calls]
+        counts: Counter[str] = sum((c.counts for c in calls), Counter())
+        logger.info(
+            f"{function:<20} | {len(calls):>6} | {sum(1 for c in calls if c.error):>6} | {sum(times):>9.2f} | {sum(times) / len(times):>8.3f} |"
+            f" {max(times):>7.3f} | {counts['cargo_query']:>7} | {counts['cargo_rows']:>6} | {counts['load_data']:>8} | {counts['expand_template']:>7}"
+        )
+
+    logger.info(f"Slowest {slowest} calls:")
+    for stats in sorted(results, key=lambda s: s.wall_time, reverse=True)[:slowest]:
+        logger.info(f"  {stats.wall_time * 1000:>8.3f} ms {stats.module}.{stats.function}({stats.args}) {dict(stats.counts)}")
+
+
+def main_impl(args):
+    logger.info(f"Running with args:\n{pprint.pformat(vars(args))}")
+
+    harness = WikiModuleHarness(Path(args.wiki_output_directory))
+    results = benchmark(harness, args.repeat, args.cold)
+    report(results, args.slowest)
+
+    if args.json_report:
+        with open(args.json_report, "w", encoding="utf-8") as f:
+            # asdict would rebuild the Counter from (key, value) pairs, counting the pairs.
+            json.dump([asdict(stats) | {"counts": dict(stats.counts), "output": None} for stats in results], f, indent=2)
+        logger.info(f"Wrote {len(results)} calls to {args.json_report}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run the wiki lua modules locally for every object, with mw stand-ins, and report time and query counts",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument(
+        "--wiki-output-directory",
+        type=str,
+        help="Path to the directory containing the output wiki files for gamedata",
+        default=DEFAULT_WIKI_OUTPUT_DIR,
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        help="Number of times to run every call",
+        default=1,
+    )
+    parser.add_argument(
+        "--cold",
+        action=argparse.BooleanOptionalAction,
+        help="If True, reloads the module before every call, dropping module level caches",
+        default=False,
+    )
+    parser.add_argument(
+        "--slowest",
+        type=int,
+        help="Number of slowest calls to list",
+        default=10,
+    )
+    parser.add_argument(
+        "--json-report",
+        type=str,
+        help="If set, writes the stats of every call to this json file",
+    )
+    parser.add_argument(
+        "--debug",
+        action="store_true",
+        help="Enable debug output (sets logging level to DEBUG)",
+        default=False,
+    )
+
+    parsed_args = parser.parse_args()
+    logger.setLevel(logging.DEBUG if parsed_args.debug else logging.INFO)
+    main_impl(parsed_args)
+
+
+if __name__ == "__main__":
+    main()
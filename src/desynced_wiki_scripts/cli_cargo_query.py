@@ -0,0 +1,83 @@
+"""Runs a Cargo query locally against the files written by generate_wiki.
+
+Example: cargo_query item "name, luaId" --where 'type = "Resource"' --order-by name --explain
+"""
+
+import argparse
+import json
+import logging
+from pathlib import Path
+import time
+
+from .util.constants import DEFAULT_WIKI_OUTPUT_DIR
+from .util.logger import get_logger
+from .wiki.cargo.cargo_emulator import DEFAULT_QUERY_LIMIT, CargoEmulator, CargoQuery
+
+logger = get_logger()
+
+
+def main_impl(args):
+    start = time.perf_counter()
+    emulator = CargoEmulator.from_output_dir(Path(args.wiki_output_directory))
+    logger.info(f"Loaded {len(emulator.tables())} tables in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    query = CargoQuery(
+        tables=args.tables,
+        fields=args.fields,
+        where=args.where,
+        join=args.join_on,
+        group_by=args.group_by,
+        order_by=args.order_by,
+        limit=args.limit,
+    )
+    logger.debug(f"SQL: {query.to_sql()}")
+    if args.explain:
+        for detail in emulator.explain(query):
+            logger.info(f"Plan: {detail}")
+
+    start = time.perf_counter()
+    rows = emulator.query(query)
+    elapsed = time.perf_counter() - start
+
+    print(json.dumps(rows, indent=2, ensure_ascii=False))
+    logger.info(f"{len(rows)} rows in {elapsed * 1000:.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run a cargo query against the generated wiki files, without the wiki",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument("tables", type=str, help='Cargo tables, ex. "item" or "item=i, recipeUsage=u"')
+    parser.add_argument("fields", type=str, help='Cargo fields, ex. "name, i.luaId=id"')
+    parser.add_argument("--where", type=str, default="", help="Where clause, in cargo syntax")
+    parser.add_argument("--join-on", type=str, default="", help='Join on, ex. "i.name=u.subject"')
+    parser.add_argument("--group-by", type=str, default="", help="Group by")
+    parser.add_argument("--order-by", type=str, default="", help="Order by")
+    parser.add_argument("--limit", type=int, default=DEFAULT_QUERY_LIMIT, help="Max rows, like cargo defaults to")
+    parser.add_argument(
+        "--explain",
+        action="store_true",
+        help="Log the SQLite query plan, to see which indexes the query uses",
+        default=False,
+    )
+    parser.add_argument(
+        "--wiki-output-directory",
+        type=str,
+        help="Path to the directory containing the output wiki files for gamedata",
+        default=DEFAULT_WIKI_OUTPUT_DIR,
+    )
+    parser.add_argument(
+        "--debug",
+        action="store_true",
+        help="Enable debug output (sets logging level to DEBUG)",
+        default=False,
+    )
+
+    parsed_args = parser.parse_args()
+    logger.setLevel(logging.DEBUG if parsed_args.debug else logging.INFO)
+    main_impl(parsed_args)
+
+
+if __name__ == "__main__":
+    main()
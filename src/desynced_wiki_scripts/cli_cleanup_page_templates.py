@@ -1,151 +1,152 @@
-from typing import override
-from .cli_tools.common import CliTools, Page
+from __future__ import annotations
+
+import argparse
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from itertools import batched
+import json
+import os
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, override
+from .cli_tools.common import PREFETCH_BATCH_SIZE, PageProcessor, ProcessorTools, iter_output_pages
 from .wiki.data_categories import DataCategory
 from .wiki.page_template import (
     CATEGORY_PAGE_BLUEPRINT,
     TemplateName,
-    extract_template_info,
-    extract_templates_from_page,
     get_mandatory_templates,
     get_template_info,
 )
+from .wiki.page_mirror import MirrorSync
 from .wiki.page_url import WikiUrl
+from .wiki.xml_dump import DumpPage, iter_dump_pages
+from .wiki.wikitext import Edit, TemplateNode, apply_edits, parse_wikitext
 from .util.logger import get_logger
 
+if TYPE_CHECKING:
+    from .cli_tools.common import Page
 
 logger = get_logger()
 
 
-def cut_template_to_arg_count(content: str, desired_count: int):
-    read_pointer = 0
-    content_length = len(content)
-    current_arg_count = 0
-    while read_pointer < content_length:
-        arg_pos = content.find("|", read_pointer)
-        if arg_pos == -1:
-            break
-
-        current_arg_count += 1
-        if current_arg_count > desired_count:
-            return content[0:arg_pos].strip()
-
-        read_pointer += arg_pos
-
-    return content
-
-
-TEMPLATE_START = "{{"
-TEMPLATE_END = "}}"
+SWAP_TEMPLATES: dict[DataCategory, dict[TemplateName, TemplateName]] = {DataCategory.instruction: {"Infobox": "Instruction_Top"}}
 
 
-def replace_at_index(content: str, start_pos: int, old_content: str, new_content: str):
-    return content[:start_pos] + content[start_pos:].replace(old_content, new_content)
+def _cut_start(content: str, node: TemplateNode, desired_count: int) -> int:
+    """Where to cut the template to keep `desired_count` arguments, whitespace before the first removed "|" included."""
+    lower_bound = node.separators[desired_count - 1] + 1 if desired_count else node.name_end
+    cut = node.separators[desired_count]
+    while cut > lower_bound and content[cut - 1].isspace():
+        cut -= 1
+    return cut
 
 
-def find_closing(content: str, start_pos: int) -> int:
-    opened_count = 1
-    read_pointer = start_pos
-    next_close: None | int = None
-    while opened_count > 0:
-        next_open = content.find(TEMPLATE_START, read_pointer)
-        next_close = content.find(TEMPLATE_END, read_pointer)
-        if next_close == -1:
-            raise ValueError(f"Wrong content? '{content}'")
+def cleanup_edits(category: DataCategory, content: str, title: str) -> list[Edit]:
+    """Edits swapping old template names (SWAP_TEMPLATES) and removing extra arguments from templates having too many.
 
-        if next_open != -1 and next_open < next_close:
-            read_pointer = next_open + len(TEMPLATE_START)
-            opened_count += 1
-        else:
-            read_pointer = next_close + len(TEMPLATE_END)
-            opened_count -= 1
-
-    assert next_close is not None
-    return next_close
+    Argument counts are checked against the swapped name.
+    """
+    swaps = SWAP_TEMPLATES.get(category, {})
+    edits: list[Edit] = []
+    # Templates in this range are removed with the arguments of their parent.
+    removed = range(0)
 
+    for node in parse_wikitext(content).templates:
+        if node.start in removed:
+            continue
 
-def cleanup_extra_arguments(content: str, title: str) -> str:
-    """Try to remove extra arguments from template when there are too many
-    Mostly using logic from extract_templates_info_from_page"""
+        name = node.name
+        if new_name := swaps.get(name):
+            logger.info(f"Page '{title}' has old template '{name}', replacing with '{new_name}' -> {WikiUrl.get_page_history(title)}")
+            edits.append(Edit(node.name_start, node.name_end, new_name))
+            name = new_name
 
-    read_pointer = 0
+        if expected_info := get_template_info(name):
+            if node.arg_count < expected_info.arg_count:
+                logger.error(f"Page {title} has template {name} with fewer args can expected, this needs manual fixing")
+            elif node.arg_count > expected_info.max_arg_count:
+                # Then we have too many args and we can try to remove some
+                removed = range(_cut_start(content, node, expected_info.max_arg_count), node.content_end)
+                edits.append(Edit(removed.start, removed.stop))
 
-    while read_pointer < len(content):
-        # Find the next template start
-        start_pos = content.find(TEMPLATE_START, read_pointer)
-        if start_pos == -1:
-            break
+    return edits
 
-        start_pos += len(TEMPLATE_START)
 
-        # Find the corresponding template end
-        end_pos = find_closing(content, start_pos)
-        if end_pos == -1:
-            break
+def cleanup_page_content(category: DataCategory, content: str, title: str) -> str:
+    """Template swaps and argument cleanup, applied in one pass"""
+    return apply_edits(content, cleanup_edits(category, content, title))
 
-        # Extract the template content
-        template_content = content[start_pos:end_pos]
 
-        # Process nested templates recursively
-        cleaned_content = cleanup_extra_arguments(template_content, title)
-        if cleaned_content != template_content:
-            content = replace_at_index(content, start_pos, template_content, cleaned_content)
-            # we replaced some content, start again without advancing reading pointer
-            continue
+def find_missing_templates(category, content) -> list[TemplateName]:
+    """List here all mandatory templates for category that are not used in content"""
 
-        # Extract the main template name
-        used_template = extract_template_info(template_content)
-        if used_template:
-            used_name = used_template[0]
-            used_info = used_template[1]
-            if expected_info := get_template_info(used_name):
-                if used_info.arg_count < expected_info.arg_count:
-                    logger.error(f"Page {title} has template {used_name} with fewer args can expected, this needs manual fixing")
-                elif used_info.arg_count > expected_info.max_arg_count:
-                    # Then we have too many args and we can try to remove some
-                    cleaned_template = cut_template_to_arg_count(template_content, expected_info.max_arg_count)
-                    content = replace_at_index(content, start_pos, template_content, cleaned_template)
-                    continue
+    if mandatory := get_mandatory_templates(category):
+        wikitext = parse_wikitext(content)
+        return [name for name in mandatory if not wikitext.has_template(name)]
 
-        # Move the read pointer past this template
-        read_pointer = end_pos + len(TEMPLATE_END)
+    return []
 
-    return content
 
+def test_category_templates_consistency():
+    for cat, content in CATEGORY_PAGE_BLUEPRINT.items():
+        if missing := find_missing_templates(cat, content):
+            raise ValueError(f"Category {cat} default template does not fit rules from find_missing_templates, missing: {missing}")
 
-SWAP_TEMPLATES: dict[DataCategory, dict[TemplateName, TemplateName]] = {DataCategory.instruction: {"Infobox": "Instruction_Top"}}
 
+@dataclass
+class PageLint:
+    title: str
+    # None when the page needs no change.
+    updated_content: str | None
+    missing_templates: list[TemplateName]
+    # Revision the lint was made on, from the dump.
+    revision_id: int = 0
 
-def swap_templates(category, content, title) -> str:
-    """Batch replace old template names with new ones"""
-    if swaps := SWAP_TEMPLATES.get(category):
-        for old, new in swaps.items():
-            if content.find(old):
-                content = content.replace(old, new)
-                logger.info(f"Page '{title}' has old template '{old}', replacing with '{new}' -> {WikiUrl.get_page_history(title)}")
 
-    return content
+def lint_page(category: DataCategory, title: str, content: str, revision_id: int = 0) -> PageLint:
+    """Runs every check on one page content. Top level function: runs in the process pool of the dump mode."""
+    updated_content = cleanup_page_content(category, content, title)
+    # -> Extra cleanup checks go here <-
 
+    return PageLint(
+        title=title,
+        updated_content=updated_content if updated_content != content else None,
+        missing_templates=find_missing_templates(category, updated_content),
+        revision_id=revision_id,
+    )
 
-def find_missing_templates(category, content) -> list[TemplateName]:
-    """List here all mandatory templates for category that are not used in content"""
 
-    if mandatory := get_mandatory_templates(category):
-        used = extract_templates_from_page(content)
-        missing = [name for name in mandatory if name not in used]
+def _lint_dump_page(task: tuple[DataCategory, DumpPage]) -> PageLint:
+    category, page = task
+    return lint_page(category, page.title, page.text, page.revision_id)
 
-        return missing
 
-    return []
+def bounded_map(executor: Executor, fn: Callable, tasks: Iterable, max_pending: int) -> Iterator:
+    """Like executor.map, in order, but only reads `max_pending` tasks ahead instead of the whole iterable."""
+    pending: deque[Future] = deque()
+    for task in tasks:
+        pending.append(executor.submit(fn, task))
+        if len(pending) >= max_pending:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
 
 
-def test_category_templates_consistency():
-    for cat, content in CATEGORY_PAGE_BLUEPRINT.items():
-        if missing := find_missing_templates(cat, content):
-            raise ValueError(f"Category {cat} default template does not fit rules from find_missing_templates, missing: {missing}")
+class CleanupPageTemplates(PageProcessor):
+    summary = "Cleanup page templates"
 
+    def __init__(self):
+        test_category_templates_consistency()
+        self.update_pages: list[str] = []
 
-class CleanupPageTemplates(CliTools):
-    _update_pages = []
+    def report_lint(self, lint: PageLint):
+        title = lint.title
+        if lint.missing_templates:
+            missing_str = ",".join(title for title in lint.missing_templates)
+            logger.warning(f"Page '{title}' is missing some templates: '{missing_str}' -> {WikiUrl.get_page(title)}")
+        if lint.updated_content is not None:
+            logger.info(f"Updating content for page: '{title}' -> {WikiUrl.get_page_history(title)}")
+            self.update_pages.append((title))
 
     @override
     def process_page(
@@ -155,44 +156,145 @@ class CleanupPageTemplates(CliTools):
         file_content: str,
     ) -> bool:
         title = page.title()
-        if not page.exists():
+        # A page created earlier in the same pass is not saved yet but has text.
+        if not page.exists() and not page.text:
             logger.error(f"Page '{title}' did not exists -> {WikiUrl.get_page(title)}")
             return False
 
-        updated_content = swap_templates(category, page.text, title)
-        updated_content = cleanup_extra_arguments(updated_content, title)
-        # -> Extra cleanup checks go here <-
+        lint = lint_page(category, title, page.text)
+        self.report_lint(lint)
 
-        missing_templates = find_missing_templates(category, updated_content)
-        if missing_templates:
-            missing_str = ",".join(title for title in missing_templates)
-            logger.warning(f"Page '{title}' is missing some templates: '{missing_str}' -> {WikiUrl.get_page(title)}")
-
-        if updated_content != page.text:
-            logger.info(f"Updating content for page: '{title}' -> {WikiUrl.get_page_history(title)}")
-            self._update_pages.append((title))
-
-            if self.args.apply:
-                page.text = updated_content
-                page.save()
-                return True
+        if lint.updated_content is not None:
+            page.text = lint.updated_content
+            # Saved by the pass, only with --apply
+            return self.cli.args.apply
 
         return False
 
-    def main(self):
-        test_category_templates_consistency()
-        self.process_all_pages()
-
-        if self._update_pages:
+    @override
+    def report(self):
+        if self.update_pages:
             logger.info("Updated pages:")
-            for title in self._update_pages:
+            for title in self.update_pages:
                 print(f"- {title} -> {WikiUrl.get_page_history(title)}")
         else:
             logger.info("No pages were updated.")
 
 
+@dataclass
+class CleanupPageTemplatesTools(ProcessorTools):
+    """The cleanup alone, with its XML dump mode"""
+
+    xml_dump: Path | None = field(init=False, default=None)
+    workers: int | None = field(init=False, default=None)
+    edits_file: Path | None = field(init=False, default=None)
+
+    @property
+    def cleanup(self) -> CleanupPageTemplates:
+        processor = self.processors[0]
+        assert isinstance(processor, CleanupPageTemplates)
+        return processor
+
+    @override
+    def add_args(self, parser: argparse.ArgumentParser):
+        super().add_args(parser)
+        parser.add_argument(
+            "--xml-dump",
+            type=str,
+            help="If set, lints the pages of this MediaWiki XML export (Special:Export or a dump) instead of fetching each page."
+            " With --apply, only pages needing changes are fetched and saved",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            help="Number of processes linting the XML dump. Defaults to the number of CPUs",
+        )
+        parser.add_argument(
+            "--edits-file",
+            type=str,
+            help="If set, writes the lint results of the XML dump to this jsonl file, with the content to save for changed pages",
+        )
+
+    @override
+    def process_args(self, args: argparse.Namespace):
+        super().process_args(args)
+        self.xml_dump = Path(args.xml_dump) if args.xml_dump else None
+        self.workers = args.workers
+        self.edits_file = Path(args.edits_file) if args.edits_file else None
+
+    def lint_dump(self, xml_dump: Path):
+        """Lints the human pages of our data found in the dump, in a process pool"""
+        categories: dict[str, DataCategory] = {}
+        for category, title, _ in iter_output_pages(
+            self.output, self.args.only_categories, self.options.page_mode, self.args.shard, self.args.changes
+        ):
+            categories[title] = category
+
+        tasks = ((categories[page.title], page) for page in iter_dump_pages(xml_dump) if page.title in categories)
+        lints: list[PageLint] = []
+        workers = self.workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for lint in bounded_map(executor, _lint_dump_page, tasks, max_pending=workers * 8):
+                self.cleanup.report_lint(lint)
+                lints.append(lint)
+        logger.info(f"Linted {len(lints)} pages of {xml_dump}, {len(categories)} expected")
+
+        if self.edits_file:
+            with open(self.edits_file, "w", encoding="utf-8") as f:
+                for lint in lints:
+                    f.write(json.dumps(asdict(lint), ensure_ascii=False) + "\n")
+            logger.info(f"Wrote lint results to {self.edits_file}")
+
+        if not self.args.apply:
+            return
+        changed = [lint for lint in lints if lint.updated_content is not None]
+        if self.args.resume:
+            done = [lint for lint in changed if self.resume.is_done(lint.title)]
+            if done:
+                logger.info(f"Resumed: skipped {len(done)} pages already saved")
+            changed = [lint for lint in changed if not self.resume.is_done(lint.title)]
+        try:
+            self.save_lints(changed)
+        finally:
+            self.resume.flush()
+
+    def save_lints(self, changed: list[PageLint]):
+        """Saves the changed pages, fetched by batches to check they were not edited since the dump."""
+        if self.mirror is not None and self.args.mirror_sync:
+            MirrorSync(self.mirror, self.wiki).sync_recent_changes()
+
+        for batch in batched(changed, PREFETCH_BATCH_SIZE):
+            pages = [self.wiki.page(lint.title) for lint in batch]
+            self.prefetch_pages(pages)
+
+            for lint, page in zip(batch, pages):
+                if lint.revision_id and page.latest_revision_id != lint.revision_id:
+                    logger.warning(f"Page '{lint.title}' changed since the dump, skipping it -> {WikiUrl.get_page_history(lint.title)}")
+                    self.resume.update_progress(page.title())
+                    continue
+
+                page.text = lint.updated_content
+                page.save(summary=self.cleanup.summary)
+                if self.mirror is not None:
+                    self.mirror.mark_stale([page.title()])
+                self.resume.update_progress(page.title())
+                if self.args.only_one_change:
+                    logger.info("Stopping after processing only one change, as requested from cli args.")
+                    return
+
+    def main(self):
+        if self.xml_dump:
+            self.lint_dump(self.xml_dump)
+            self.cleanup.report()
+        else:
+            super().main()
+
+
 def main():
-    cli = CleanupPageTemplates(description="Cleanup page templates, checking for missing templates for given category or wrong arg count.")
+    cli = CleanupPageTemplatesTools(
+        description="Cleanup page templates, checking for missing templates for given category or wrong arg count.",
+        processors=[CleanupPageTemplates()],
+    )
     cli.run()
 
 
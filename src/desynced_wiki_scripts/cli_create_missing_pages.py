@@ -1,15 +1,22 @@
-from typing import override
-from .cli_tools.common import CliTools, Page
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, override
+from .cli_tools.common import PageProcessor, ProcessorTools
 from .wiki.data_categories import DataCategory
 from .wiki.page_template import get_category_page_blueprint
 from .util.logger import get_logger
 
+if TYPE_CHECKING:
+    from .cli_tools.common import Page
 
 logger = get_logger()
 
 
-class CreateMissingPages(CliTools):
-    missing_pages = []
+class CreateMissingPages(PageProcessor):
+    summary = "Create missing page"
+
+    def __init__(self):
+        self.missing_pages: list[str] = []
 
     @override
     def process_page(
@@ -21,17 +28,14 @@ class CreateMissingPages(CliTools):
         if not page.exists():
             logger.info(f"Creating page: {page.title()}")
             self.missing_pages.append(page.title())
-
-            if self.args.apply:
-                page.text = get_category_page_blueprint(DataCategory(category))
-                page.save()
-                return True
+            page.text = get_category_page_blueprint(DataCategory(category))
+            # Saved by the pass, only with --apply
+            return self.cli.args.apply
 
         return False
 
-    def main(self):
-        self.process_all_pages()
-
+    @override
+    def report(self):
         if self.missing_pages:
             logger.info("Found missing pages:")
             for title in self.missing_pages:
@@ -43,7 +47,10 @@ class CreateMissingPages(CliTools):
 
 
 def main():
-    cli = CreateMissingPages(description="For all previously generated cargo data pages, find if their the non-data counterpart exists.")
+    cli = ProcessorTools(
+        description="For all previously generated cargo data pages, find if their the non-data counterpart exists.",
+        processors=[CreateMissingPages()],
+    )
     cli.run()
 
 
@@ -0,0 +1,67 @@
+"""Serves a local stand-in of the wiki API, to run the other tools end to end without the real wiki.
+
+Example:
+    fake_wiki_server --port 8080 --latency 0.05 --seed-mirror .wiki_mirror.sqlite
+    upload_wiki --wiki-url http://127.0.0.1:8080/w/api.php --apply
+"""
+
+import argparse
+import logging
+from pathlib import Path
+import pprint
+import time
+
+from .util.logger import get_logger
+from .wiki.fake_wiki_server import FakeWikiConfig, FakeWikiServer
+
+logger = get_logger()
+
+
+def main_impl(args):
+    logger.info(f"Running with args:\n{pprint.pformat(vars(args))}")
+
+    config = FakeWikiConfig(
+        username=args.username,
+        password=args.password,
+        latency=args.latency,
+        maxlag_every=args.maxlag_every,
+    )
+    server = FakeWikiServer(config, port=args.port)
+    if args.seed_mirror:
+        server.state.seed_from_mirror(Path(args.seed_mirror))
+
+    start = time.perf_counter()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    elapsed = time.perf_counter() - start
+    server.report()
+    logger.info(f"{sum(server.state.counts.values()) / elapsed:.2f} requests/s over {elapsed:.1f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Serve a fake MediaWiki API locally, point the tools at it with --wiki-url",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument("--port", type=int, help="Port to listen on, on 127.0.0.1", default=8080)
+    parser.add_argument("--latency", type=float, help="Seconds added to every request, to simulate the network", default=0.0)
+    parser.add_argument("--maxlag-every", type=int, help="If set, every Nth request with maxlag fails with a maxlag error", default=0)
+    parser.add_argument("--seed-mirror", type=str, help="If set, starts with the pages of this page mirror file (see --mirror-file)")
+    parser.add_argument("--username", type=str, help="If set, the only username accepted. Any login succeeds otherwise")
+    parser.add_argument("--password", type=str, help="If set, the only password accepted")
+    parser.add_argument(
+        "--debug",
+        action="store_true",
+        help="Enable debug output (sets logging level to DEBUG)",
+        default=False,
+    )
+
+    parsed_args = parser.parse_args()
+    logger.setLevel(logging.DEBUG if parsed_args.debug else logging.INFO)
+    main_impl(parsed_args)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,21 +7,20 @@ If 2FA is enabled, you will be prompted to provide a code.
 import argparse
 import os
 from zipfile import ZipFile
-from steam.client.cdn import CDNClient
-from steam.client import SteamClient
-
-# Apply patches before importing.
-import steam.monkey
 
 from .util.constants import DESYNCED_APP_ID, FETCHED_GAME_DATA_DIR
 
-steam.monkey.patch_minimal()
-
 CONFIG_SECTION = "steam"
 
 
 def fetch_main(output_zip_file: str, output_game_data_dir: str, branch: str = "public"):
     """Fetch main mod from steam server."""
+    # Imported when used, not to slow down --help. Apply patches before importing the client.
+    import steam.monkey
+
+    steam.monkey.patch_minimal()
+    from steam.client import SteamClient
+    from steam.client.cdn import CDNClient
 
     # Validate we won't run into any existing files.
     assert not os.path.isfile(output_zip_file), "output file already exists"
@@ -0,0 +1,108 @@
+"""Saves a snapshot of the game data, and compares it to the previous game version.
+
+Writes the data files that changed, for generate_wiki and the wiki tools to only handle those (--changes-file).
+
+Example: game_snapshot --changes-file changes.json
+         game_snapshot --version 0.9.1 --compare-to 0.9.0 --changes-file changes.json
+"""
+
+import argparse
+import logging
+from pathlib import Path
+import pprint
+
+import desynced_wiki_scripts.lua.lua_util as lua_util
+from .analysis.game_snapshot import SnapshotStore, diff_snapshots, take_snapshot
+from .cli_tools.change_set import ChangeSet
+from .lua.game_data import GameData
+from .util.constants import FETCHED_GAME_DATA_DIR
+from .util.logger import get_logger
+from .wiki.data_tables import get_data_tables
+from .wiki.titles import get_data_file_name
+
+logger = get_logger()
+
+DEFAULT_SNAPSHOT_STORE = ".game_snapshots.sqlite"
+
+
+def main_impl(args):
+    logger.info(f"Running with args:\n{pprint.pformat(vars(args))}")
+    store = SnapshotStore(Path(args.store))
+    if args.list:
+        logger.info(f"Saved versions: {store.versions()}")
+        return
+
+    version = args.version or lua_util.game_files_digest(args.game_data_directory)
+    game = GameData(lua_util.load_lua_runtime(args.game_data_directory))
+    store.save(version, take_snapshot(get_data_tables(game)))
+
+    compare_to = args.compare_to or store.previous_version(version)
+    if not compare_to:
+        logger.info(f"No version saved before {version}, nothing to compare to")
+        return
+
+    logger.info(f"Changes from {compare_to} to {version}:")
+    diff = diff_snapshots(store.load(compare_to), store.load(version))
+    diff.log()
+
+    if args.changes_file:
+        changes = ChangeSet()
+        for table_name, table_diff in diff.tables.items():
+            for name in table_diff.updated_names():
+                changes.add(table_name, get_data_file_name(name))
+        changes.write(Path(args.changes_file))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Saves a snapshot of the game data and compares it to a previous version",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument(
+        "game_data_directory",
+        nargs="?",
+        type=str,
+        help="Path to the directory containing the lua game data files (= root of main mod)",
+        default=FETCHED_GAME_DATA_DIR,
+    )
+    parser.add_argument(
+        "--store",
+        type=str,
+        help="SQLite file keeping the snapshots",
+        default=DEFAULT_SNAPSHOT_STORE,
+    )
+    parser.add_argument(
+        "--version",
+        type=str,
+        help="Game version of the snapshot, ex. the build id. Defaults to a digest of the game files",
+    )
+    parser.add_argument(
+        "--compare-to",
+        type=str,
+        help="Version to compare to. Defaults to the version saved before",
+    )
+    parser.add_argument(
+        "--changes-file",
+        type=str,
+        help="If set, writes the data files added, renamed or changed since the compared version to this json file",
+    )
+    parser.add_argument(
+        "--list",
+        action="store_true",
+        help="Only lists the saved versions",
+        default=False,
+    )
+    parser.add_argument(
+        "--debug",
+        action="store_true",
+        help="Enable debug output (sets logging level to DEBUG)",
+        default=False,
+    )
+
+    parsed_args = parser.parse_args()
+    logger.setLevel(logging.DEBUG if parsed_args.debug else logging.INFO)
+    main_impl(parsed_args)
+
+
+if __name__ == "__main__":
+    main()
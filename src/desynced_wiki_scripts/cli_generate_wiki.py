@@ -5,13 +5,12 @@ On game update, the `lua` library may require changes.
 
 """
 
-from dataclasses import dataclass
 import pprint
 import argparse
 import logging
 import os
 from pathlib import Path
-from typing import Collection, Dict, Type
+from typing import Collection, Type
 
 import desynced_wiki_scripts.lua.lua_util as lua_util
 from .util.constants import (
@@ -19,7 +18,10 @@ from .util.constants import (
     DEFAULT_WIKI_OUTPUT_DIR,
 )
 from .util.logger import get_logger
-from .wiki.data_categories import DataCategory
+from .wiki.data_categories import DataCategory, category_has_lua_module
+from .wiki.lua_data import render_data_module, to_rows
+from .wiki.navboxes import NAVBOX_TYPES, categorize, render_navbox
+from .wiki.titles import get_data_file_name, get_data_module_title, get_template_title
 from .wiki.wiki_name_overrides import get_name_collisions
 from .wiki.cargo.analyze_type import (
     DataClassTypeInfo,
@@ -27,19 +29,15 @@ from .wiki.cargo.analyze_type import (
 )
 from .wiki.cargo.cargo_printer import CargoPrinter
 from .wiki.templates.templater import WikiTemplate, render_template
+from .wiki.data_tables import TableData, get_data_tables
+from .analysis.game_snapshot import object_key
 
 from .lua.game_data import GameData
-from .models.category_filters import CategoryFilter
-from .models.component import Component
+from .cli_tools.output_files import OutputFiles
+from .cli_tools.change_set import ChangeSet
+from .cli_tools.manifest import MANIFEST_PATH, Manifest
+from .cli_tools.shard import Shard
 from .models.decorators import DesyncedObject
-from .models.entity import Entity
-from .models.instructions import Instruction
-from .models.item import Item
-from .models.tech import (
-    Technology,
-    TechnologyCategory,
-    TechnologyUnlock,
-)
 
 logger = get_logger()
 
@@ -53,14 +51,43 @@ class GenerateWiki:
         overwrite: bool,
         only_templates: bool,
         only_categories: list[DataCategory],
+        normalized_lists: bool = False,
+        game: GameData | None = None,
+        output_files: OutputFiles | None = None,
+        shard: Shard | None = None,
+        changes: ChangeSet | None = None,
     ):
+        """
+        Args:
+            shard (Shard, optional): Only writes the data files of this shard, the other files are written by the first shard.
+            changes (ChangeSet, optional): Only writes these data files, ex. the objects changed since the last game version.
+            game (GameData, optional): Already loaded game data, else loaded from `game_data_directory`.
+            output_files (OutputFiles, optional): Also keeps the written files there, for the next steps of the same process.
+        """
         self.wiki_output_directory = wiki_output_dir
         self.confirmed_overwrite: bool = overwrite
         self.only_templates = only_templates
         self.only_categories = only_categories
-
-        lua = lua_util.load_lua_runtime(game_data_directory)
-        self.game: GameData = GameData(lua)
+        # If set, list fields go to their own child cargo tables instead of numbered columns.
+        self.normalized_lists = normalized_lists
+
+        self.output_files = output_files
+        self.shard = shard
+        self.changes = changes
+        if game is None:
+            lua = lua_util.load_lua_runtime(game_data_directory)
+            game = GameData(lua)
+        self.game: GameData = game
+
+    @property
+    def writes_shared_files(self) -> bool:
+        """Files not related to one object: cargo declarations, data modules and navboxes."""
+        return not self.shard or self.shard.is_first
+
+    def record_output(self, file_path: str | Path, content: str):
+        """Keeps a written file in `output_files`, if set."""
+        if self.output_files:
+            self.output_files.record(Path(file_path).relative_to(self.wiki_output_directory).as_posix(), content)
 
     def clean_output_dir(self, output_dir: Path):
         """Recursively deletes all files in `dir`. Doesn't touch directories.
@@ -75,25 +102,47 @@ class GenerateWiki:
                 os.remove(file_path)
 
     def write_declaration(self, output_dir: Path, table_name: str, template_type: Type[DesyncedObject]):
+        object_type = analyze_type(template_type)
+        if not isinstance(object_type, DataClassTypeInfo):
+            logger.error(f"Trying to process table template {table_name} of wrong type {object_type}. Expected DataClassTypeInfo.")
+            return
+
+        declarations = CargoPrinter(CargoPrinter.Mode.DECLARATIONS, self.normalized_lists)
+        templates = CargoPrinter(CargoPrinter.Mode.TEMPLATE, self.normalized_lists)
+        self.write_declaration_file(
+            output_dir,
+            table_name,
+            declarations.print_dataclass(dc_obj=None, type_info=object_type),
+            templates.print_dataclass(dc_obj=None, type_info=object_type),
+        )
+
+        if self.normalized_lists:
+            # Child tables can be shared by several owners (ex. recipeItem), they are identical each time.
+            for child in declarations.child_tables(object_type):
+                self.write_declaration_file(
+                    output_dir,
+                    child.name,
+                    declarations.print_child_declaration(child),
+                    templates.print_child_declaration(child),
+                )
+
+    def write_declaration_file(self, output_dir: Path, table_name: str, declare_args: list[str], store_args: list[str]):
         template_dir: str = os.path.join(output_dir, "Template")
         Path(template_dir).mkdir(parents=True, exist_ok=True)
-        with open(os.path.join(template_dir, f"{table_name}"), "w", encoding="utf-8") as tabledef_file:
-            object_type = analyze_type(template_type)
-            if not isinstance(object_type, DataClassTypeInfo):
-                logger.error(f"Trying to process table template {table_name} of wrong type {object_type}. Expected DataClassTypeInfo.")
-                return
-
+        template_path = os.path.join(template_dir, f"{table_name}")
+        with open(template_path, "w", encoding="utf-8") as tabledef_file:
             content: str = render_template(
                 WikiTemplate.CARGO_DECLARE,
                 {
                     "table_name": table_name,
-                    "declare_args": "\n".join(CargoPrinter(CargoPrinter.Mode.DECLARATIONS).print_dataclass(dc_obj=None, type_info=object_type)),
-                    "store_args": "\n".join(CargoPrinter(CargoPrinter.Mode.TEMPLATE).print_dataclass(dc_obj=None, type_info=object_type)),
+                    "declare_args": "\n".join(declare_args),
+                    "store_args": "\n".join(store_args),
                 },
             )
 
             logger.debug(f"File: {table_name}. Content: {content}\n")
             tabledef_file.write(content)
+            self.record_output(template_path, content)
 
     def fill_templates(
         self,
@@ -113,7 +162,8 @@ class GenerateWiki:
         """
 
         # First write out the table definition.
-        self.write_declaration(output_dir, table_name, desynced_object_type)
+        if self.writes_shared_files:
+            self.write_declaration(output_dir, table_name, desynced_object_type)
 
         if self.only_templates:
             return
@@ -134,7 +184,12 @@ class GenerateWiki:
             self.clean_output_dir(output_path)
 
         for desynced_object in objects:
-            output_file_path = os.path.join(output_path, desynced_object.name.replace("/", "_").replace("*", ""))
+            file_name = get_data_file_name(desynced_object.name)
+            if self.shard and not self.shard.owns(file_name):
+                continue
+            if self.changes is not None and not self.changes.contains(table_name, file_name):
+                continue
+            output_file_path = os.path.join(output_path, file_name)
 
             # File should not exist, otherwise we have a name conflict, or some data generated twice.
             # In any case it's good to have, instead of overwriting silently.
@@ -152,6 +207,15 @@ class GenerateWiki:
                     logger.error(f"Trying to process object {desynced_object.name} of wrong type {object_type}. Expected DataClassTypeInfo.")
                     continue
 
+                printer = CargoPrinter(normalize_lists=self.normalized_lists)
+                child_rows = []
+                if self.normalized_lists:
+                    # One storage call per list element, each in its child table.
+                    child_rows = [
+                        {"template_name": get_template_title(child.name), "args": "\n".join(lines)}
+                        for child, lines in printer.print_child_rows(desynced_object, object_type, desynced_object.name, table_name)
+                    ]
+
                 content: str = render_template(
                     WikiTemplate.CARGO_STORE,
                     {
@@ -159,12 +223,72 @@ class GenerateWiki:
                         "template_name": f"Data{table_name[0].upper() + table_name[1:]}",
                         "template_table_index": "DataTableIndex",
                         "name": desynced_object.name,
-                        "args": "\n".join(CargoPrinter().print_dataclass(desynced_object, object_type)),
+                        "args": "\n".join(printer.print_dataclass(desynced_object, object_type)),
+                        "child_rows": child_rows,
                     },
                 )
 
                 logger.debug(f"File: {desynced_object.name}. Content: {content}\n")
                 storage_file.write(content)
+                self.record_output(output_file_path, content)
+
+    def write_data_module(self, output_dir: Path, table_name: str, desynced_object_type: Type[DesyncedObject], objects: Collection):
+        """Writes the rows of a table as a Lua data module, so wiki modules can read them without cargo queries."""
+        module_path = Path(os.path.join(output_dir, "Module", get_data_module_title(table_name)))
+        module_path.parent.mkdir(parents=True, exist_ok=True)
+        content = render_data_module(table_name, to_rows(desynced_object_type, objects))
+        logger.debug(f"Module: {module_path}. Content: {content}\n")
+        module_path.write_text(content, encoding="utf-8")
+        self.record_output(module_path, content)
+
+    def write_navboxes(self, output_dir: Path, tables_by_name: dict):
+        """Pre-renders the navboxes of Navboxes.lua, for the types whose tables are being generated.
+
+        Written every time: upload_wiki only uploads the changed navboxes, see UploadWiki.update_navboxes.
+        """
+        if DataCategory.categoryFilter not in tables_by_name:
+            return
+
+        filter_table = tables_by_name[DataCategory.categoryFilter]
+        category_filters = to_rows(filter_table.type, filter_table.objects)
+        rows_by_table: dict[DataCategory, list] = {}
+        for navbox_type, type_data in NAVBOX_TYPES.items():
+            if type_data.table not in tables_by_name:
+                continue
+            if type_data.table not in rows_by_table:
+                table = tables_by_name[type_data.table]
+                rows_by_table[type_data.table] = to_rows(table.type, table.objects)
+
+            content = render_navbox(navbox_type, categorize(navbox_type, category_filters, rows_by_table[type_data.table]))
+            # Not under Template/: those are all cargo table declarations.
+            navbox_path = Path(os.path.join(output_dir, "Navbox", navbox_type))
+            self.record_output(navbox_path, content)
+            navbox_path.parent.mkdir(parents=True, exist_ok=True)
+            navbox_path.write_text(content, encoding="utf-8")
+
+    def read_manifest(self, output_dir: Path) -> Manifest:
+        """Manifest of the previous generation, empty if none."""
+        manifest_path = output_dir / MANIFEST_PATH
+        if not manifest_path.is_file():
+            return Manifest()
+        return Manifest.from_json(manifest_path.read_text(encoding="utf-8"))
+
+    def write_manifest(self, output_dir: Path, previous: Manifest, tables_by_name: dict[DataCategory, TableData]):
+        """Lists the data file of every object, not only the ones written with --shard or --changes-file, and the renamed ones."""
+        files = {
+            table_name: {object_key(obj): get_data_file_name(obj.name) for obj in table.objects} for table_name, table in tables_by_name.items()
+        }
+        manifest = previous.update(files)
+        for table_name, renames in sorted(manifest.renames.items()):
+            for old_name, new_name in sorted(renames.items()):
+                logger.info(f"{table_name}: renamed {old_name} -> {new_name}")
+        if manifest.renames:
+            logger.info(f"{manifest.rename_count()} data files renamed, see move_renamed_pages to move their pages before uploading")
+
+        manifest_path = output_dir / MANIFEST_PATH
+        content = manifest.to_json()
+        manifest_path.write_text(content, encoding="utf-8")
+        self.record_output(manifest_path, content)
 
     def check_name_collisions(self, tables_by_name: dict) -> bool:
         """Returns wheter a name collision was found in any of the tables. Logs the collisions if found."""
@@ -179,9 +303,12 @@ class GenerateWiki:
                 has_error = True
         return has_error
 
-    def build(self):
+    def build(self) -> bool:
+        """Returns if the files were written."""
         output_directory = Path(self.wiki_output_directory)
 
+        previous_manifest = self.read_manifest(output_directory)
+
         # Delete outdated wiki files.
         output_directory.mkdir(parents=True, exist_ok=True)
         if output_directory.exists() and not self.only_categories:
@@ -190,44 +317,23 @@ class GenerateWiki:
                 confirm = input(f"Output directory {output_directory} already exists. Do you want to overwrite it? (y/n): ")
                 if confirm.lower() != "y":
                     logger.info("Exiting without deleting output directory.")
-                    return
+                    return False
 
             self.clean_output_dir(output_directory)
 
-        @dataclass
-        class TableData:
-            type: Type[DesyncedObject]  # object type from models
-            objects: Collection
-            should_filter: bool = False  # if set, consider objects for should_skip_upload filtering when uploading
-
-        # Mapping of cargo table name to the type and list of actual game data objects
-        tables_by_name: Dict[DataCategory, TableData] = {
-            DataCategory.entity: TableData(Entity, self.game.entities, True),
-            DataCategory.component: TableData(Component, self.game.components, True),
-            DataCategory.item: TableData(Item, self.game.items, True),
-            DataCategory.instruction: TableData(Instruction, self.game.instructions),
-            DataCategory.tech: TableData(Technology, self.game.technologies),
-            DataCategory.techUnlock: TableData(TechnologyUnlock, self.game.tech_unlocks),
-            DataCategory.techCategory: TableData(TechnologyCategory, self.game.technology_categories),
-            DataCategory.categoryFilter: TableData(CategoryFilter, self.game.category_filters),
-        }
-
-        # Apply filtering
-        for table_name, td in tables_by_name.items():
-            if td.should_filter:
-                td.objects = [obj for obj in td.objects if not self.game.should_skip_upload(obj)]
+        tables_by_name = get_data_tables(self.game)
 
         if self.only_categories:
             filtered_tables = {k: tables_by_name[k] for k in self.only_categories if k in tables_by_name}
             if len(filtered_tables) == 0:
                 logger.error("--table-filter filtered all tables.")
-                return
+                return False
             tables_by_name = filtered_tables
 
         # Check for name collisions before writing any files
         if not self.only_templates and self.check_name_collisions(tables_by_name):
             logger.error("Name collisions found. Please resolve them before proceeding. (search WIKI_NAME_OVERRIDES)")
-            return
+            return False
 
         for table_name, table_def in tables_by_name.items():
             self.fill_templates(
@@ -236,8 +342,17 @@ class GenerateWiki:
                 desynced_object_type=table_def.type,
                 objects=table_def.objects,
             )
+            if not self.only_templates and self.writes_shared_files and category_has_lua_module(table_name):
+                self.write_data_module(output_directory, table_name, table_def.type, table_def.objects)
+
+        if not self.only_templates and self.writes_shared_files:
+            self.write_navboxes(output_directory, tables_by_name)
+
+        if not self.only_templates:
+            self.write_manifest(output_directory, previous_manifest, tables_by_name)
 
         logger.info(f"Finished writing wiki files to {output_directory} directory")
+        return True
 
 
 def main_impl(args):
@@ -255,6 +370,9 @@ def main_impl(args):
         args.overwrite,
         args.template_only,
         only_categories,
+        args.normalized_lists,
+        shard=Shard.parse(args.shard) if args.shard else None,
+        changes=ChangeSet.read(Path(args.changes_file)) if args.changes_file else None,
     ).build()
 
 
@@ -294,6 +412,23 @@ def main():
         help="If True, only produces templates and no data",
         default=False,
     )
+    parser.add_argument(
+        "--normalized-lists",
+        action=argparse.BooleanOptionalAction,
+        help="If True, list fields are stored in their own child cargo tables (ex. recipeItem) instead of numbered columns",
+        default=False,
+    )
+    parser.add_argument(
+        "--shard",
+        type=str,
+        help="If set, only writes the data files of this shard, as i/n (ex. 1/4), see upload_wiki --shard."
+        " Other files are written by the first shard. Use one output directory per shard",
+    )
+    parser.add_argument(
+        "--changes-file",
+        type=str,
+        help="If set, only writes the data files listed in this file, see game_snapshot. Other files are written as usual",
+    )
     parser.add_argument(
         "--debug",
         action="store_true",
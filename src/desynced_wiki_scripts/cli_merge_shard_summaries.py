@@ -0,0 +1,45 @@
+"""Merges the summaries written by the shards of a run (--shard i/n --summary-file ...), see cli_tools/shard.py."""
+
+import argparse
+import logging
+from pathlib import Path
+
+from .cli_tools.shard import log_counts, merge_summaries
+from .util.logger import get_logger
+
+logger = get_logger()
+
+
+def main_impl(args):
+    paths = [Path(path) for path in args.summary_files]
+    for tool, counts in merge_summaries(paths).items():
+        logger.info(f"{tool}, {len(paths)} summaries:")
+        for table, table_counts in counts.items():
+            log_counts(table, table_counts)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Merges the summaries of the shards of a run, and prints the totals",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument(
+        "summary_files",
+        nargs="+",
+        type=str,
+        help="Summary files written with --summary-file",
+    )
+    parser.add_argument(
+        "--debug",
+        action="store_true",
+        help="Enable debug output (sets logging level to DEBUG)",
+        default=False,
+    )
+
+    parsed_args = parser.parse_args()
+    logger.setLevel(logging.DEBUG if parsed_args.debug else logging.INFO)
+    main_impl(parsed_args)
+
+
+if __name__ == "__main__":
+    main()
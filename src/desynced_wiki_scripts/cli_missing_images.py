@@ -1,14 +1,14 @@
+from __future__ import annotations
+
 import argparse
 from pathlib import Path
 import re
-from typing import override
-from pywikibot import FilePage
-from pywikibot.exceptions import APIError
+from typing import TYPE_CHECKING, override
 from .cli_tools.common import (
-    CliTools,
     CliToolsOptions,
     PageMode,
-    Page,
+    PageProcessor,
+    ProcessorTools,
 )
 from .lua import lua_util
 from .lua.game_data import GameData
@@ -18,12 +18,24 @@ from .wiki.data_categories import DataCategory
 from .wiki.page_template import page_has_template
 from .wiki.titles import get_sub_pagename
 
+if TYPE_CHECKING:
+    from pywikibot import FilePage
+
+    from .cli_tools.common import Page
+
 logger = get_logger()
 
 
-class MissingImages(CliTools):
+class MissingImages(PageProcessor):
     _game_data_directory: Path
 
+    def __init__(self, game_data: GameData | None = None):
+        """
+        Args:
+            game_data (GameData, optional): Already loaded game data, else loaded from the game data directory arg when needed.
+        """
+        self._game_data = game_data
+
     @override
     def should_process_page(
         self,
@@ -47,7 +59,7 @@ class MissingImages(CliTools):
         # We process only pages having an infobox as a shortcut to whatever has missing images. Infobox has a fixed image format.
         if page.exists() and page_has_template(page.text, "Infobox"):
 
-            image_page = self.wiki.filepage(f"File:{get_sub_pagename(page.title())}.png")
+            image_page = self.cli.wiki.filepage(f"File:{get_sub_pagename(page.title())}.png")
             logger.debug(f"Checking image: {image_page.title()}")
 
             # this does not actually check if there is an image on the file page
@@ -134,9 +146,11 @@ class MissingImages(CliTools):
             return False
 
         logger.info(f"Uploading image {file_path} to {image_page.title()}, for page {page.title()}")
-        if not self.args.apply:
+        if not self.cli.args.apply:
             return True
 
+        from pywikibot.exceptions import APIError
+
         ignored_codes = ["was-deleted", "duplicate-archive"]
 
         # code adapted from https://github.com/wikimedia/pywikibot/blob/master/pywikibot/specialbots/_upload.py#L26
@@ -217,14 +231,12 @@ class MissingImages(CliTools):
 
         return self._game_data
 
-    def main(self):
-        self.process_all_pages()
-
 
 def main():
-    MissingImages(
+    ProcessorTools(
         description="Try to find missing images & upload them. Doesn't check mismatched images. Script might prompt you in some error cases",
         options=CliToolsOptions(page_mode=PageMode.HUMAN),
+        processors=[MissingImages()],
     ).run()
 
 
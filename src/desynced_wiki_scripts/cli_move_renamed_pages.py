@@ -0,0 +1,135 @@
+"""Moves the pages of the objects whose data file was renamed, see the renames of the manifest written by generate_wiki.
+
+Run it after generate_wiki and before upload_wiki: the upload then edits the moved pages, keeping their history,
+instead of creating new ones next to the old ones.
+Data pages are moved without a redirect, they are only read through cargo. Human pages keep a redirect for the
+links to their old title.
+
+Example: move_renamed_pages --apply
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from itertools import batched
+from pathlib import Path
+from typing import TYPE_CHECKING, override
+
+from .cli_tools.common import (
+    PREFETCH_BATCH_SIZE,
+    CliTools,
+    CliToolsOptions,
+    PageMode,
+)
+from .cli_tools.manifest import MANIFEST_PATH, Manifest
+from .util.logger import get_logger
+from .wiki.data_categories import DataCategory, category_has_human_pages
+from .wiki.titles import get_data_page_title, get_human_page_title
+
+if TYPE_CHECKING:
+    from .cli_tools.common import Page
+
+logger = get_logger()
+
+MOVES = "Moves"
+
+
+@dataclass
+class PageMove:
+    category: DataCategory
+    old_title: str
+    new_title: str
+    # Data pages are only read through cargo, nothing links to them.
+    noredirect: bool
+
+
+class MoveRenamedPages(CliTools):
+
+    @override
+    def process_page(self, category: DataCategory, page: Page, file_content: str) -> bool:
+        # Pages are listed from the manifest renames, not from the data files.
+        return False
+
+    def list_moves(self, manifest: Manifest) -> list[PageMove]:
+        moves = []
+        for table_name, renames in sorted(manifest.renames.items()):
+            try:
+                category = DataCategory(table_name)
+            except ValueError:
+                logger.warning(f"Unknown category in manifest renames: {table_name}, skipping.")
+                continue
+            if self.args.only_categories and category not in self.args.only_categories:
+                continue
+
+            for old_name, new_name in sorted(renames.items()):
+                if self.args.shard and not self.args.shard.owns(new_name):
+                    continue
+                old_subpage, new_subpage = Path(old_name).stem, Path(new_name).stem
+                if category_has_human_pages(category) and self.options.page_mode & PageMode.HUMAN:
+                    old_title, new_title = get_human_page_title(category, old_subpage), get_human_page_title(category, new_subpage)
+                    moves.append(PageMove(category, old_title, new_title, noredirect=False))
+                if self.options.page_mode & PageMode.DATA:
+                    old_title, new_title = get_data_page_title(category, old_subpage), get_data_page_title(category, new_subpage)
+                    moves.append(PageMove(category, old_title, new_title, noredirect=True))
+        return moves
+
+    def move_pages(self, moves: list[PageMove]):
+        # Both titles of a move are fetched in the same request.
+        for batch in batched(moves, PREFETCH_BATCH_SIZE // 2):
+            pages = [(move, self.wiki.page(move.old_title), self.wiki.page(move.new_title)) for move in batch]
+            self.prefetch_pages([page for _, source, target in pages for page in (source, target)])
+
+            for move, source, target in pages:
+                if not source.exists():
+                    logger.debug(f"Page {move.old_title} does not exist, already moved?")
+                elif target.exists():
+                    logger.warning(f"Not moving {move.old_title}: {move.new_title} already exists, merge them by hand")
+                    self.count(MOVES, "Target exists")
+                else:
+                    logger.info(f"Moving page {move.old_title} -> {move.new_title}")
+                    self.count(MOVES, move.category)
+                    if self.args.apply:
+                        source.move(move.new_title, summary="Renamed in game data", noredirect=move.noredirect)
+                        if self.mirror is not None:
+                            self.mirror.mark_stale([move.old_title, move.new_title])
+                self.resume.update_progress(move.old_title)
+
+    def main(self):
+        if not self.output.exists(MANIFEST_PATH):
+            logger.error(f"No manifest found in: {self.output.root}, run generate_wiki first")
+            return
+
+        manifest = Manifest.from_json(self.output.read(MANIFEST_PATH))
+        moves = self.list_moves(manifest)
+        if self.args.resume:
+            done = [move for move in moves if self.resume.is_done(move.old_title)]
+            if len(done) == len(moves):
+                logger.info("Resume found last run finished execution. Starting over.")
+                self.resume.restart()
+            else:
+                logger.info(f"Resumed: skipped {len(done)} pages already moved")
+                moves = [move for move in moves if move not in done]
+
+        if not moves:
+            logger.info("No renamed pages to move.")
+            return
+
+        try:
+            self.move_pages(moves)
+        finally:
+            self.resume.flush()
+
+        if not self.args.apply:
+            logger.info("Dry run, use --apply to move the pages")
+
+
+def main():
+    MoveRenamedPages(
+        description="Moves the wiki pages of the objects renamed since the previous generate_wiki run"
+        " (see the manifest of the output directory).",
+        options=CliToolsOptions(page_mode=PageMode.HUMAN | PageMode.DATA),
+    ).run()
+
+
+if __name__ == "__main__":
+    main()
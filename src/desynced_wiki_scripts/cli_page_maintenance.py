@@ -0,0 +1,63 @@
+import argparse
+from dataclasses import dataclass
+from typing import Callable, override
+from .cli_cleanup_page_templates import CleanupPageTemplates
+from .cli_create_missing_pages import CreateMissingPages
+from .cli_missing_images import MissingImages
+from .cli_tools.common import CliToolsOptions, PageMode, PageProcessor, ProcessorTools
+from .util.logger import get_logger
+
+
+logger = get_logger()
+
+
+# In the order they run on each page: pages are created before being cleaned up.
+PROCESSORS: dict[str, Callable[[], PageProcessor]] = {
+    "create_missing_pages": CreateMissingPages,
+    "cleanup_page_templates": CleanupPageTemplates,
+    "missing_images": MissingImages,
+}
+
+
+def _processors_arg(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        "--processors",
+        type=str,
+        help=f"Comma separated list of the processors to run on each page. Possible values: {list(PROCESSORS)}",
+        default=",".join(PROCESSORS),
+    )
+
+
+def parse_processor_names(value: str) -> list[str]:
+    names = [name.strip() for name in value.split(",") if name.strip()]
+    if unknown := [name for name in names if name not in PROCESSORS]:
+        raise ValueError(f"Unknown processors {unknown}, possible values: {list(PROCESSORS)}")
+    # Registry order, whatever the order given.
+    return [name for name in PROCESSORS if name in names]
+
+
+@dataclass
+class PageMaintenance(ProcessorTools):
+    @override
+    def add_args(self, parser: argparse.ArgumentParser):
+        _processors_arg(parser)
+        super().add_args(parser)
+
+
+def main():
+    # Processors add their own args: they must be known before the full parsing.
+    pre_parser = argparse.ArgumentParser(add_help=False)
+    _processors_arg(pre_parser)
+    known_args, _ = pre_parser.parse_known_args()
+    names = parse_processor_names(known_args.processors)
+    logger.info(f"Running processors: {', '.join(names)}")
+
+    PageMaintenance(
+        description="Routine post-patch maintenance: runs several page processors in one pass, fetching and saving each page once.",
+        options=CliToolsOptions(page_mode=PageMode.HUMAN),
+        processors=[PROCESSORS[name]() for name in names],
+    ).run()
+
+
+if __name__ == "__main__":
+    main()
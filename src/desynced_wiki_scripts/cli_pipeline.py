@@ -0,0 +1,242 @@
+"""Runs several tools in one process, ex. after a game update: generate the wiki files, move the pages of renamed
+objects, upload the files, then create the missing pages and upload the missing images.
+
+Stages share one GameData (the Lua game files are evaluated once), one logged in wiki session, and the generated
+files, kept in memory instead of being read again from the output directory. Consecutive page processor stages run
+in a single pass over the pages (see page_maintenance).
+
+Example: pipeline --overwrite --apply
+         pipeline --stages upload_wiki,create_missing_pages --wiki-url http://127.0.0.1:8080/w/api.php --apply
+"""
+
+import argparse
+from dataclasses import dataclass
+import logging
+from pathlib import Path
+import pprint
+import time
+
+import desynced_wiki_scripts.lua.lua_util as lua_util
+from .cli_generate_wiki import GenerateWiki
+from .cli_missing_images import MissingImages
+from .cli_move_renamed_pages import MoveRenamedPages
+from .cli_page_maintenance import PROCESSORS
+from .cli_tools.common import CliToolsOptions, PageMode, PageProcessor, ProcessorTools, SharedRun
+from .cli_tools.output_files import OutputFiles
+from .cli_upload_wiki import UploadWiki
+from .lua.game_data import GameData
+from .util.constants import DEFAULT_WIKI_OUTPUT_DIR, FETCHED_GAME_DATA_DIR
+from .util.logger import get_logger
+from .wiki.data_categories import DataCategory
+
+logger = get_logger()
+
+GENERATE_STAGE = "generate_wiki"
+MOVE_STAGE = "move_renamed_pages"
+UPLOAD_STAGE = "upload_wiki"
+STAGES = [GENERATE_STAGE, MOVE_STAGE, UPLOAD_STAGE, *PROCESSORS]
+DEFAULT_STAGES = [GENERATE_STAGE, MOVE_STAGE, UPLOAD_STAGE, "create_missing_pages", "missing_images"]
+
+
+@dataclass
+class StageTiming:
+    name: str
+    seconds: float
+
+
+def parse_stages(value: str) -> list[str]:
+    names = [name.strip() for name in value.split(",") if name.strip()]
+    if unknown := [name for name in names if name not in STAGES]:
+        raise ValueError(f"Unknown stages {unknown}, possible values: {STAGES}")
+    return names
+
+
+def group_stages(names: list[str]) -> list[list[str]]:
+    """Groups consecutive page processor stages, they run in one pass. Ex. [upload, create, images] -> [[upload], [create, images]]"""
+    groups: list[list[str]] = []
+    for name in names:
+        if groups and name in PROCESSORS and groups[-1][0] in PROCESSORS:
+            groups[-1].append(name)
+        else:
+            groups.append([name])
+    return groups
+
+
+class Pipeline:
+    def __init__(self, args: argparse.Namespace, tool_argv: list[str]):
+        """
+        Args:
+            args: The pipeline args.
+            tool_argv: Other command-line args, passed to each wiki tool (ex. --apply, --wiki-url).
+        """
+        self.args = args
+        self.tool_argv = tool_argv
+        self.shared = SharedRun()
+        self.timings: list[StageTiming] = []
+        self._game: GameData | None = None
+
+    @property
+    def game(self) -> GameData:
+        """Loaded by the first stage needing it."""
+        if not self._game:
+            lua = lua_util.load_lua_runtime(self.args.game_data_directory)
+            self._game = GameData(lua)
+            self.shared.game = self._game
+        return self._game
+
+    def tool_args(self) -> list[str]:
+        args = [*self.tool_argv, "--wiki-output-directory", self.args.wiki_output_directory]
+        if self.args.only_categories:
+            args += ["--only-categories", self.args.only_categories]
+        if self.args.debug:
+            args.append("--debug")
+        return args
+
+    def generate(self) -> bool:
+        only_categories = [DataCategory[name.strip()] for name in (self.args.only_categories.split(",") if self.args.only_categories else [])]
+        self.shared.output = OutputFiles(Path(self.args.wiki_output_directory), in_memory=True)
+        return GenerateWiki(
+            self.args.wiki_output_directory,
+            self.args.game_data_directory,
+            self.args.overwrite,
+            False,
+            only_categories,
+            self.args.normalized_lists,
+            game=self.game,
+            output_files=self.shared.output,
+        ).build()
+
+    def move_renamed_pages(self):
+        MoveRenamedPages(
+            description="Move the renamed pages",
+            options=CliToolsOptions(page_mode=PageMode.HUMAN | PageMode.DATA),
+            argv=self.tool_args(),
+            shared=self.shared,
+        ).run()
+
+    def upload(self):
+        UploadWiki(
+            description="Upload the generated files",
+            options=CliToolsOptions(page_mode=PageMode.DATA),
+            argv=[*self.tool_args(), "--game-data-directory", self.args.game_data_directory] + (["--purge"] if self.args.purge else []),
+            shared=self.shared,
+        ).run()
+
+    def process_pages(self, names: list[str]):
+        # Game data is only loaded by missing_images when an image is missing, unless a previous stage already did.
+        processors: list[PageProcessor] = [
+            MissingImages(self.shared.game) if name == "missing_images" else PROCESSORS[name]() for name in names
+        ]
+        argv = self.tool_args()
+        if "missing_images" in names:
+            # Images are read from the game files.
+            argv.append(self.args.game_data_directory)
+        ProcessorTools(
+            description="Page processors",
+            options=CliToolsOptions(page_mode=PageMode.HUMAN),
+            argv=argv,
+            shared=self.shared,
+            processors=processors,
+        ).run()
+
+    def run(self):
+        for group in group_stages(parse_stages(self.args.stages)):
+            stage_name = "+".join(group)
+            logger.info(f"Stage {stage_name}")
+            start = time.perf_counter()
+
+            if group == [GENERATE_STAGE]:
+                success = self.generate()
+            elif group == [MOVE_STAGE]:
+                self.move_renamed_pages()
+                success = True
+            elif group == [UPLOAD_STAGE]:
+                self.upload()
+                success = True
+            else:
+                self.process_pages(group)
+                success = True
+
+            self.timings.append(StageTiming(stage_name, time.perf_counter() - start))
+            if not success:
+                logger.error(f"Stage {stage_name} failed, stopping.")
+                break
+
+        self.report()
+
+    def report(self):
+        logger.info(f"{'Stage':<50} | {'Seconds':>8}")
+        logger.info("-" * 61)
+        for timing in self.timings:
+            logger.info(f"{timing.name:<50} | {timing.seconds:>8.1f}")
+        logger.info(f"{'Total':<50} | {sum(timing.seconds for timing in self.timings):>8.1f}")
+
+
+def main_impl(args: argparse.Namespace, tool_argv: list[str]):
+    logger.info(f"Running with args:\n{pprint.pformat(vars(args))}\nTools args: {tool_argv}")
+    Pipeline(args, tool_argv).run()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Runs several tools in one process, sharing the game data, the wiki session and the generated files."
+        " Other arguments (ex. --apply, --wiki-url, --mirror-file) are passed to the wiki tools, see upload_wiki --help",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    # Not positional like in generate_wiki: a positional could take the value of an option passed to the tools.
+    parser.add_argument(
+        "--game-data-directory",
+        type=str,
+        help="Path to the directory containing the lua game data files (= root of main mod)",
+        default=FETCHED_GAME_DATA_DIR,
+    )
+    parser.add_argument(
+        "--stages",
+        type=str,
+        help=f"Comma separated list of the stages to run, in order. Possible values: {STAGES}",
+        default=",".join(DEFAULT_STAGES),
+    )
+    parser.add_argument(
+        "--wiki-output-directory",
+        type=str,
+        help="Path to the directory containing the output wiki files for gamedata",
+        default=DEFAULT_WIKI_OUTPUT_DIR,
+    )
+    data_categories = {e.value for e in DataCategory}
+    parser.add_argument(
+        "--only-categories",
+        type=str,
+        help=f"If set, only produces and uploads data for categories specified. Comma separated list. Possible values: {data_categories}",
+    )
+    parser.add_argument(
+        "--overwrite",
+        action=argparse.BooleanOptionalAction,
+        help="If True, will clean the output directory without prompting",
+        default=False,
+    )
+    parser.add_argument(
+        "--normalized-lists",
+        action=argparse.BooleanOptionalAction,
+        help="If True, list fields are stored in their own child cargo tables (ex. recipeItem) instead of numbered columns",
+        default=False,
+    )
+    parser.add_argument(
+        "--purge",
+        action=argparse.BooleanOptionalAction,
+        help="If True, purges the pages showing the data updated by upload_wiki, see upload_wiki --purge",
+        default=True,
+    )
+    parser.add_argument(
+        "--debug",
+        action="store_true",
+        help="Enable debug output (sets logging level to DEBUG)",
+        default=False,
+    )
+
+    parsed_args, tool_argv = parser.parse_known_args()
+    logger.setLevel(logging.DEBUG if parsed_args.debug else logging.INFO)
+    main_impl(parsed_args, tool_argv)
+
+
+if __name__ == "__main__":
+    main()
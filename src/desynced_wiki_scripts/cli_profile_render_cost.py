@@ -0,0 +1,218 @@
+"""Ranks the wiki pages related to the generated files by render cost, from the parser limit report.
+
+Renders every page with action=parse, or reads responses saved by a previous run (--saved-responses) to work offline.
+
+Example: profile_render_cost --save-responses responses --csv-report render_cost.csv
+         profile_render_cost --saved-responses responses --sort-by expensive_functions
+"""
+
+import argparse
+from itertools import batched
+import logging
+from pathlib import Path
+import pprint
+import time
+
+from .cli_tools.common import PageMode, iter_output_pages
+from .cli_tools.output_files import OutputFiles
+from .util.constants import DEFAULT_WIKI_OUTPUT_DIR
+from .util.logger import get_logger
+from .wiki.data_categories import DataCategory
+from .wiki.desynced_wiki_wrapper import DESYNCED_WIKI_URL, DesyncedWiki
+from .wiki.navboxes import NavboxType
+from .wiki.render_cost import (
+    RANK_KEYS,
+    RenderCost,
+    load_saved_responses,
+    parse_limit_report,
+    rank,
+    save_response,
+    write_csv,
+    write_json,
+)
+from .wiki.titles import get_navbox_template_title, get_template_page, get_template_title
+
+logger = get_logger()
+
+
+def collect_titles(output_directory: Path, only_categories: list[DataCategory], page_mode: PageMode) -> list[str]:
+    """Human and data pages of the generated files, the cargo declaration templates and the navboxes."""
+    output = OutputFiles(output_directory)
+    titles = [title for _, title, _ in iter_output_pages(output, only_categories, page_mode)]
+    titles += [get_template_page(get_template_title(Path(path).name)) for path in output.paths("Template")]
+    if (output_directory / "Navbox").is_dir():
+        titles += [get_template_page(get_navbox_template_title(navbox_type.value)) for navbox_type in NavboxType]
+    # Keeps the order, pages can be both human and data pages of different categories.
+    return list(dict.fromkeys(titles))
+
+
+def profile_online(wiki_url: str, titles: list[str], batch_size: int, pause: float, save_dir: Path | None) -> list[RenderCost]:
+    # Logs in, only done when rendering: --saved-responses works without wiki credentials.
+    wiki = DesyncedWiki(url=wiki_url)
+    costs = []
+    for index, batch in enumerate(batched(titles, batch_size)):
+        if index and pause:
+            time.sleep(pause)
+        logger.info(f"Rendering {batch[0]} .. {batch[-1]} ({index * batch_size + len(batch)}/{len(titles)})")
+        for title in batch:
+            # action=parse renders a single page per request.
+            response = wiki.parse_page(title)
+            if save_dir:
+                save_response(save_dir, title, response)
+            costs.append(parse_limit_report(title, response))
+    return costs
+
+
+def profile_offline(titles: list[str], saved_dir: Path) -> list[RenderCost]:
+    responses = load_saved_responses(saved_dir)
+    if not titles:
+        titles = list(responses)
+    costs = []
+    for title in titles:
+        if title not in responses:
+            logger.warning(f"No saved response for {title}, skipping.")
+            continue
+        costs.append(parse_limit_report(title, responses[title]))
+    return costs
+
+
+def report(costs: list[RenderCost], sort_by: str, top: int):
+    logger.info(f"{'Page':<50} | {'Lua s':>6} | {'CPU s':>6} | {'Expensive':>9} | {'Post-expand':>11} | {'Cargo':>5}")
+    logger.info("-" * 102)
+    for cost in costs[:top]:
+        cargo = "?" if cost.cargo_queries is None else cost.cargo_queries
+        logger.info(
+            f"{cost.title:<50} | {cost.lua_seconds:>6.3f} | {cost.cpu_seconds:>6.3f} | {cost.expensive_functions:>9} |"
+            f" {cost.post_expand_include_size:>11} | {cargo:>5}"
+        )
+    for cost in costs:
+        if cost.error:
+            logger.error(f"{cost.title}: {cost.error}")
+    logger.info(f"{len(costs)} pages, sorted by {sort_by}")
+
+
+def main_impl(args):
+    logger.info(f"Running with args:\n{pprint.pformat(vars(args))}")
+
+    output_directory = Path(args.wiki_output_directory)
+    only_categories = [DataCategory[name.strip()] for name in (args.only_categories.split(",") if args.only_categories else [])]
+    page_mode = PageMode.HUMAN | PageMode.DATA if args.data_pages else PageMode.HUMAN
+
+    if args.titles:
+        titles = [title.strip() for title in args.titles.split(",") if title.strip()]
+    elif args.saved_responses:
+        # Every saved response.
+        titles = []
+    else:
+        titles = collect_titles(output_directory, only_categories, page_mode)
+
+    if args.saved_responses:
+        costs = profile_offline(titles, Path(args.saved_responses))
+    else:
+        save_dir = Path(args.save_responses) if args.save_responses else None
+        costs = profile_online(args.wiki_url, titles, args.batch_size, args.pause, save_dir)
+
+    costs = rank(costs, args.sort_by)
+    report(costs, args.sort_by, args.top)
+
+    if args.json_report:
+        write_json(costs, Path(args.json_report))
+        logger.info(f"Wrote {len(costs)} pages to {args.json_report}")
+    if args.csv_report:
+        write_csv(costs, Path(args.csv_report))
+        logger.info(f"Wrote {len(costs)} pages to {args.csv_report}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Render the wiki pages of the generated data and rank them by Lua time, expensive calls and include size",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument(
+        "--wiki-output-directory",
+        type=str,
+        help="Path to the directory containing the output wiki files for gamedata",
+        default=DEFAULT_WIKI_OUTPUT_DIR,
+    )
+    parser.add_argument(
+        "--wiki-url",
+        type=str,
+        help="API endpoint of the wiki, ex. a local fake_wiki_server for offline runs",
+        default=DESYNCED_WIKI_URL,
+    )
+    data_categories = {e.value for e in DataCategory}
+    parser.add_argument(
+        "--only-categories",
+        type=str,
+        help=f"If set, only profiles pages of these categories. Comma separated list. Possible values: {data_categories}",
+    )
+    parser.add_argument(
+        "--data-pages",
+        action=argparse.BooleanOptionalAction,
+        help="If True, also profiles the Data: storage pages",
+        default=True,
+    )
+    parser.add_argument(
+        "--titles",
+        type=str,
+        help="Comma separated page titles to profile, instead of the pages of the output directory",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        help="Number of pages rendered between pauses",
+        default=20,
+    )
+    parser.add_argument(
+        "--pause",
+        type=float,
+        help="Seconds to wait between batches, to go easy on the wiki",
+        default=1.0,
+    )
+    parser.add_argument(
+        "--save-responses",
+        type=str,
+        help="If set, saves every action=parse response in this directory, for --saved-responses",
+    )
+    parser.add_argument(
+        "--saved-responses",
+        type=str,
+        help="If set, reads the responses from this directory instead of the wiki",
+    )
+    parser.add_argument(
+        "--sort-by",
+        type=str,
+        choices=RANK_KEYS,
+        help="Cost to rank pages by, most expensive first",
+        default="lua_seconds",
+    )
+    parser.add_argument(
+        "--top",
+        type=int,
+        help="Number of pages to list",
+        default=20,
+    )
+    parser.add_argument(
+        "--json-report",
+        type=str,
+        help="If set, writes the ranked costs to this json file",
+    )
+    parser.add_argument(
+        "--csv-report",
+        type=str,
+        help="If set, writes the ranked costs to this csv file",
+    )
+    parser.add_argument(
+        "--debug",
+        action="store_true",
+        help="Enable debug output (sets logging level to DEBUG)",
+        default=False,
+    )
+
+    parsed_args = parser.parse_args()
+    logger.setLevel(logging.DEBUG if parsed_args.debug else logging.INFO)
+    main_impl(parsed_args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,46 +1,98 @@
+"""Removes generated data pages: the ones matching a regex, or with --orphans the ones of objects no longer generated.
+
+Orphans are listed from the wiki, not from the output directory: the pages of the Data namespace, in the storage
+categories of the tables (Category:Data:Storage:<table>, see cargo_storage.jinja) or with a table prefix (Data:Item:),
+a few listing requests for all of them. Those with no data file in the manifest of the last generate_wiki run are removed: their cargo rows
+would stay in the tables otherwise.
+
+Example: remove_data_pages "Data:Item:Old .*" --apply
+         remove_data_pages --orphans --apply
+"""
+
+from __future__ import annotations
+
 import argparse
+from itertools import batched
+from pathlib import Path
 import re
-from typing import override
+from typing import TYPE_CHECKING, override
 from .cli_tools.common import (
+    PREFETCH_BATCH_SIZE,
     CliTools,
     CliToolsOptions,
     PageMode,
-    Page,
 )
+from .cli_tools.manifest import MANIFEST_PATH, Manifest
 from .wiki.data_categories import DataCategory
+from .wiki.titles import get_data_page_title, normalize_title
 from .util.logger import get_logger
 
+if TYPE_CHECKING:
+    from .cli_tools.common import Page
 
 logger = get_logger()
 
+DATA_NAMESPACE = 3000
+REMOVED_PAGES = "Removed pages"
+
+
+def get_storage_category_title(category: DataCategory) -> str:
+    """Category of the data pages of a table, see cargo_storage.jinja."""
+    return f"Category:Data:Storage:{category}"
+
 
 class RemoveDataPages(CliTools):
-    _match_pattern: str
+    _match_pattern: str | None
+    _orphans: bool
+    _yes: bool
 
-    _to_remove: list[Page] = []
+    def __post_init__(self):
+        self._to_remove: list[Page] = []
+        super().__post_init__()
 
     @override
     def should_process_page(self, _category: DataCategory, page: Page) -> bool:
-        title = page.title()
+        return self.matches(page.title())
+
+    def matches(self, title: str) -> bool:
+        if self._match_pattern is None:
+            return True
         matched = bool(re.search(self._match_pattern, title))
         if matched:
             logger.debug(f"Page {title} did match filter")
         else:
             logger.debug(f"Page {title} did not match filter")
-
         return matched
 
     @override
-    def add_args(self, parser: argparse.ArgumentParser):  # pylint: disable=unused-argument
+    def add_args(self, parser: argparse.ArgumentParser):
         parser.add_argument(
             "match_pattern",
+            nargs="?",
             type=str,
-            help="Regex match of files to remove",
+            help="Regex match of files to remove. With --orphans, only removes the orphans matching it",
+        )
+        parser.add_argument(
+            "--orphans",
+            action="store_true",
+            help="Removes the data pages listed on the wiki with no data file in the manifest of the output directory"
+            " (objects removed from the game), instead of the pages of the data files",
+            default=False,
+        )
+        parser.add_argument(
+            "--yes",
+            action="store_true",
+            help="With --apply, removes the pages without asking for confirmation",
+            default=False,
         )
 
     @override
     def process_args(self, args: argparse.Namespace):
+        if args.match_pattern is None and not args.orphans:
+            self.parser.error("a match_pattern or --orphans is required")
         self._match_pattern = args.match_pattern
+        self._orphans = args.orphans
+        self._yes = args.yes
 
     @override
     def process_page(
@@ -56,25 +108,96 @@ class RemoveDataPages(CliTools):
 
         return False
 
-    def main(self):
-        self.process_all_pages()
+    def find_orphans(self, manifest: Manifest) -> list[str]:
+        """Titles of the data pages on the wiki with no data file in the manifest, for the tables of the manifest."""
+        # Tables without objects are left alone: more likely a generation issue than every object removed from the game.
+        table_names = {category.value for category in DataCategory}
+        categories = [DataCategory(name) for name, files in manifest.files.items() if name in table_names and files]
+        if self.args.only_categories:
+            categories = [category for category in categories if category in self.args.only_categories]
+
+        # Titles as normalized by the wiki, ex. "Data:item:Metal_Ore" -> "Data:Item:Metal Ore".
+        expected: set[str] = set()
+        for category in categories:
+            titles = [get_data_page_title(category, Path(file_name).stem) for file_name in manifest.files[category].values()]
+            expected |= {normalize_title(title) for title in titles}
+
+        listed: set[str] = set()
+        for category in categories:
+            # Data namespace only: pages including a data page are in its category too.
+            listed |= set(self.wiki.category_members(get_storage_category_title(category), DATA_NAMESPACE))
+
+        # Table part of the titles in the Data namespace, with its first letter in upper case like the wiki titles.
+        tables = {category[:1].upper() + category[1:] for category in categories}
+        for title in self.wiki.all_pages(DATA_NAMESPACE):
+            parts = title.split(":", 2)
+            if len(parts) == 3 and parts[1] in tables:
+                listed.add(title)
+            else:
+                logger.debug(f"Page {title} is not in a generated table, skipping.")
+
+        orphans = sorted(title for title in listed - expected if self.matches(title))
+        logger.info(f"Found {len(listed)} data pages on the wiki, {len(orphans)} orphans")
+        return orphans
+
+    def confirm(self, count: int) -> bool:
+        if not self.args.apply or self._yes:
+            return True
+        confirm = input(f"Remove {count} pages? (y/n): ")
+        return confirm.lower() == "y"
+
+    def remove_pages(self, titles: list[str]):
+        """Removes the pages, checking they still exist by batches. One delete request per page, there is no batch delete."""
+        if self.args.resume:
+            done = [title for title in titles if self.resume.is_done(title)]
+            if done:
+                logger.info(f"Resumed: skipped {len(done)} pages already removed")
+            titles = [title for title in titles if not self.resume.is_done(title)]
+
+        try:
+            for batch in batched(titles, PREFETCH_BATCH_SIZE):
+                pages = [self.wiki.page(title) for title in batch]
+                self.prefetch_pages(pages)
+                for page in pages:
+                    if page.exists():
+                        logger.info(f"Removing page {page.title()}")
+                        self.count(REMOVED_PAGES, "Data pages")
+                        if self.args.apply:
+                            page.delete(f"Scripted batch remove from {__class__.__name__}", prompt=False)
+                            if self.mirror is not None:
+                                self.mirror.mark_stale([page.title()])
+                    self.resume.update_progress(page.title())
+        finally:
+            self.resume.flush()
 
-        if self._to_remove:
-            logger.info("Pages to remove:")
-            for page in self._to_remove:
-                print(f"- {page.title}")
+    def main(self):
+        if self._orphans:
+            if not self.output.exists(MANIFEST_PATH):
+                logger.error(f"No manifest found in: {self.output.root}, run generate_wiki first")
+                return
+            titles = self.find_orphans(Manifest.from_json(self.output.read(MANIFEST_PATH)))
         else:
+            self.process_all_pages()
+            titles = [page.title() for page in self._to_remove]
+
+        if not titles:
             logger.info("No pages removed.")
+            return
+
+        logger.info("Pages to remove:")
+        for title in titles:
+            print(f"- {title}")
 
-        if self.args.apply:
-            for page in self._to_remove:
-                logger.info(f"Removing page {page.title}")
-                page.delete(f"Scripted batch remove from {__class__}")
+        if not self.confirm(len(titles)):
+            logger.info("Exiting without removing pages.")
+            return
+        self.remove_pages(titles)
 
 
 def main():
     RemoveDataPages(
-        description="For all currently existing generated cargo data pages, remove the ones with wiki title regex-matching given param.",
+        description="For all currently existing generated cargo data pages, remove the ones with wiki title regex-matching given param,"
+        " or with --orphans the ones of objects no longer generated.",
         options=CliToolsOptions(page_mode=PageMode.DATA),
     ).run()
 
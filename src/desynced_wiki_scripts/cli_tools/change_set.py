@@ -0,0 +1,44 @@
+"""The data files that changed between two game versions, to only generate and upload those (see game_snapshot).
+
+Stored as json, the data file names by table:
+
+    {"item": ["Metal Ore", "Metal Plate"], "tech": ["Robotics"]}
+
+Example Usage:
+
+    game_snapshot diff --changes-file changes.json
+    generate_wiki --changes-file changes.json --overwrite && upload_wiki --changes-file changes.json --apply
+"""
+
+from dataclasses import dataclass, field
+import json
+from pathlib import Path
+
+from desynced_wiki_scripts.util.logger import get_logger
+
+logger = get_logger()
+
+
+@dataclass
+class ChangeSet:
+    # Table name -> data file names, see get_data_file_name.
+    files: dict[str, set[str]] = field(default_factory=dict)
+
+    def add(self, table: str, file_name: str):
+        self.files.setdefault(table, set()).add(file_name)
+
+    def contains(self, table: str, file_name: str) -> bool:
+        return file_name in self.files.get(table, ())
+
+    def __len__(self) -> int:
+        return sum(len(files) for files in self.files.values())
+
+    def write(self, path: Path):
+        content = {table: sorted(files) for table, files in sorted(self.files.items())}
+        path.write_text(json.dumps(content, indent=2, ensure_ascii=False), encoding="utf-8")
+        logger.info(f"Wrote {len(self)} changed data files to {path}")
+
+    @staticmethod
+    def read(path: Path) -> "ChangeSet":
+        content = json.loads(path.read_text(encoding="utf-8"))
+        return ChangeSet({table: set(files) for table, files in content.items()})
@@ -1,14 +1,15 @@
+from __future__ import annotations
+
 import argparse
+from collections import Counter
 from dataclasses import dataclass, field
 from enum import Flag, auto
 import logging
-import os
 from pathlib import Path
-from typing import final
+from itertools import batched
+from typing import TYPE_CHECKING, Iterator, final, override
 from abc import ABC, abstractmethod
 
-from pywikibot import Page
-
 from desynced_wiki_scripts.util.constants import DEFAULT_WIKI_OUTPUT_DIR
 from desynced_wiki_scripts.util.logger import get_logger
 from desynced_wiki_scripts.wiki.data_categories import (
@@ -16,12 +17,25 @@ from desynced_wiki_scripts.wiki.data_categories import (
     DataCategory,
 )
 from desynced_wiki_scripts.wiki.titles import get_data_page_title, get_human_page_title
-from desynced_wiki_scripts.wiki.desynced_wiki_wrapper import DesyncedWiki
+from desynced_wiki_scripts.wiki.desynced_wiki_wrapper import DESYNCED_WIKI_URL, DesyncedWiki
+from desynced_wiki_scripts.wiki.page_mirror import MirrorSync, PageMirror
+
+from .output_files import OutputFiles
+from .processor import PageProcessor, run_processors
+from .resume import ResumeHelper
+from .change_set import ChangeSet
+from .shard import Counts, Shard, write_summary
+
+if TYPE_CHECKING:
+    from pywikibot import Page
 
-from .resume import Resumable, ResumeHelper
+    from desynced_wiki_scripts.lua.game_data import GameData
 
 logger = get_logger()
 
+# Pages fetched in one request (the max for normal users), and held at once by process_all_pages.
+PREFETCH_BATCH_SIZE = 50
+
 
 @dataclass
 class CliCommonArgs:
@@ -34,6 +48,12 @@ class CliCommonArgs:
     only_one_change: bool
     only_categories: list[DataCategory]
     debug: bool
+    mirror_file: Path | None = None
+    mirror_sync: bool = True
+    wiki_url: str = DESYNCED_WIKI_URL
+    shard: Shard | None = None
+    changes: ChangeSet | None = None
+    summary_file: Path | None = None
 
 
 class CliToolsArgs:
@@ -83,6 +103,39 @@ class CliToolsArgs:
             type=str,
             help=f"If set, only produces data for categories specified. Comma separated list. Possible values: {data_categories}",
         )
+        parser.add_argument(
+            "--wiki-url",
+            type=str,
+            help="API endpoint of the wiki, ex. a local fake_wiki_server for offline runs",
+            default=DESYNCED_WIKI_URL,
+        )
+        parser.add_argument(
+            "--shard",
+            type=str,
+            help="If set, only processes this shard of the pages, as i/n (ex. 1/4), to run several workers in parallel."
+            " Each shard has its own resume file",
+        )
+        parser.add_argument(
+            "--changes-file",
+            type=str,
+            help="If set, only processes the pages of the data files listed in this file, see game_snapshot",
+        )
+        parser.add_argument(
+            "--summary-file",
+            type=str,
+            help="If set, writes the counts of this run to this json file, see merge_shard_summaries",
+        )
+        parser.add_argument(
+            "--mirror-file",
+            type=str,
+            help="If set, reads pages from this local SQLite mirror of the wiki, only fetching new or changed pages",
+        )
+        parser.add_argument(
+            "--mirror-sync",
+            action=argparse.BooleanOptionalAction,
+            help="If True, checks the wiki recent changes before using the mirror. Without it, the mirror is used as is",
+            default=True,
+        )
 
     @staticmethod
     def process_common_args(args) -> CliCommonArgs:
@@ -94,14 +147,23 @@ class CliToolsArgs:
             logger.exception(f"Invalid category name in {args.only_categories}")
             raise e
 
+        shard = Shard.parse(args.shard) if args.shard else None
+        resume_file = Path(f"{args.resume_file}.shard{shard.index}-{shard.count}") if shard else Path(args.resume_file)
+
         return CliCommonArgs(
             Path(args.wiki_output_directory),
-            Path(args.resume_file),
+            resume_file,
             resume=args.resume,
             apply=args.apply,
             only_one_change=args.one,
             only_categories=only_categories,
             debug=args.debug,
+            mirror_file=Path(args.mirror_file) if args.mirror_file else None,
+            mirror_sync=args.mirror_sync,
+            wiki_url=args.wiki_url,
+            shard=shard,
+            changes=ChangeSet.read(Path(args.changes_file)) if args.changes_file else None,
+            summary_file=Path(args.summary_file) if args.summary_file else None,
         )
 
 
@@ -110,11 +172,70 @@ class PageMode(Flag):
     DATA = auto()
 
 
+def iter_output_pages(
+    output: OutputFiles,
+    only_categories: list[DataCategory],
+    page_mode: PageMode,
+    shard: Shard | None = None,
+    changes: ChangeSet | None = None,
+) -> Iterator[tuple[DataCategory, str, str]]:
+    """Yields (category, page title, data file path) for the wiki pages related to the generated data files.
+
+    Does not need the wiki: titles only. Read the data file with `output.read(path)`.
+    If `shard` is set, only yields the pages of this shard. If `changes` is set, only the pages of the changed data files.
+    """
+    data_paths = output.paths("Data")
+    if not data_paths:
+        logger.error(f"No data files found in: {output.root / 'Data'}")
+        return
+
+    unknown_categories = set()
+    for data_path in data_paths:
+        category_name, sep, file_name = data_path.partition("/")
+        if not sep or "/" in file_name:
+            continue
+        try:
+            category = DataCategory(category_name)
+        except ValueError:
+            if category_name not in unknown_categories:
+                logger.exception(f"Unknown category directory: {category_name}, skipping.")
+                unknown_categories.add(category_name)
+            continue
+
+        if only_categories and category not in only_categories:
+            continue
+
+        if shard and not shard.owns(file_name):
+            continue
+
+        if changes is not None and not changes.contains(category, file_name):
+            continue
+
+        subpagename = Path(file_name).stem
+        path = f"Data/{data_path}"
+        if category_has_human_pages(category) and page_mode & PageMode.HUMAN:
+            yield category, get_human_page_title(category, subpagename), path
+
+        if page_mode & PageMode.DATA:
+            yield category, get_data_page_title(category, subpagename), path
+
+
 @dataclass
 class CliToolsOptions:
     page_mode: PageMode = PageMode.HUMAN
 
 
+@dataclass
+class SharedRun:
+    """What the tools run in one process share (see pipeline), set by the first tool needing it."""
+
+    wiki: DesyncedWiki | None = None
+    # Generated files kept in memory, None to read them from the output directory.
+    output: OutputFiles | None = None
+    # Loaded game data, None until a tool loads it.
+    game: GameData | None = None
+
+
 @dataclass
 class CliTools(ABC):
     """Common asbtract class for cli tools to inherit from
@@ -129,11 +250,20 @@ class CliTools(ABC):
 
     description: str
     options: CliToolsOptions = field(default_factory=CliToolsOptions)
+    # Command-line arguments to parse, None for the process ones.
+    argv: list[str] | None = None
+    shared: SharedRun = field(default_factory=SharedRun)
 
     parser: argparse.ArgumentParser = field(init=False)  # excluded from __init__
     args: CliCommonArgs = field(init=False)  # excluded from __init__
     resume: ResumeHelper = field(init=False)  # excluded from __init__
     wiki: DesyncedWiki = field(init=False)  # excluded from __init__
+    mirror: PageMirror | None = field(init=False, default=None)  # excluded from __init__
+    output: OutputFiles = field(init=False)  # excluded from __init__
+    # What the run did, see write_summary.
+    counts: Counts = field(init=False, default_factory=dict)  # excluded from __init__
+    # Pages skipped by the last process_all_pages, already processed by a previous run.
+    resume_skipped: int = field(init=False, default=0)  # excluded from __init__
 
     def __post_init__(self):
         self.parser = argparse.ArgumentParser(
@@ -144,13 +274,22 @@ class CliTools(ABC):
         CliToolsArgs.add_common_args(self.parser)
         self.add_args(self.parser)
 
-        parsed_args = self.parser.parse_args()
+        parsed_args = self.parser.parse_args(self.argv)
         self.args = CliToolsArgs.process_common_args(parsed_args)
         logger.setLevel(logging.DEBUG if self.args.debug else logging.INFO)
         self.process_args(parsed_args)
-        source_id = str(hash(self.description))  # simple unique id for tools
-        self.resume = ResumeHelper(source_id, self.args.resume_file, self.args.resume)
-        self.wiki = DesyncedWiki()
+        self.resume = ResumeHelper(self.tool_id, self.args.resume_file, self.args.resume)
+        if not self.shared.wiki:
+            self.shared.wiki = DesyncedWiki(url=self.args.wiki_url, read_only=not self.args.apply)
+        self.wiki = self.shared.wiki
+        self.output = self.shared.output or OutputFiles(self.args.output_directory)
+        if self.args.mirror_file:
+            self.mirror = PageMirror(self.args.mirror_file)
+
+    @property
+    def tool_id(self) -> str:
+        """Stable id of the tool, for its resume records."""
+        return type(self).__name__
 
     def add_args(self, _parser: argparse.ArgumentParser):
         """(To override) Add tool-specific command-line arguments to the parser."""
@@ -164,7 +303,7 @@ class CliTools(ABC):
         _category: DataCategory,
         _page: Page,
     ) -> bool:
-        """Should given page be processed by process_all_pages?"""
+        """Should given page be processed by process_all_pages? Called before the page is fetched: use its title, not its content."""
         return True
 
     @abstractmethod
@@ -178,69 +317,132 @@ class CliTools(ABC):
 
     @final
     def run(self):
+        if self.args.shard:
+            logger.info(f"Running shard {self.args.shard}")
         self.main()
+        if self.args.summary_file:
+            write_summary(self.args.summary_file, self.tool_id, self.args.shard, self.counts)
+
+    @final
+    def count(self, table: str, name: str):
+        """Counts something done, for the summary of the run."""
+        self.counts.setdefault(table, Counter())[name] += 1
+
+    @final
+    def prefetch_pages(self, pages: list[Page]):
+        """Fetches the pages in one request, or from the mirror: reading them needs no more requests"""
+        if self.mirror is not None:
+            MirrorSync(self.mirror, self.wiki).refresh([page.title() for page in pages])
+            for page in pages:
+                self.mirror.load_into(page)
+        else:
+            self.wiki.preload(pages)
+
+    @final
+    def iter_pages_to_process(self) -> Iterator[tuple[DataCategory, Page, str]]:
+        """Yields (category, page, data file path) of the pages to process, not fetched. Makes no request.
+
+        Skips the pages refused by should_process_page, and the ones already processed when resuming.
+        """
+        pages = iter_output_pages(self.output, self.args.only_categories, self.options.page_mode, self.args.shard, self.args.changes)
+        for category, title, data_path in pages:
+            page = self.wiki.page(title)
+            if self.args.resume and self.resume.is_done(page.title()):
+                self.resume_skipped += 1
+                continue
+            if self.should_process_page(category, page):
+                yield category, page, data_path
 
     @final
     def process_all_pages(self):
-        """Helper to iterate on every non-data wiki page related to our data and apply given function"""
+        """Helper to iterate on every non-data wiki page related to our data and apply given function
+
+        Pages are enumerated, fetched and processed by batches: the first ones are processed without waiting for the
+        others, and only one batch of pages is held at once.
+        """
+        if self.mirror is not None and self.args.mirror_sync:
+            MirrorSync(self.mirror, self.wiki).sync_recent_changes()
+
+        self.resume_skipped = 0
+        processed = self._process_pages()
+        if self.resume_skipped:
+            if processed:
+                logger.info(f"Resumed: skipped {self.resume_skipped} pages already processed")
+            else:
+                logger.info("Resume found last run finished execution. Starting over.")
+                self.resume.restart()
+                self._process_pages()
+
+    def _process_pages(self) -> int:
+        """Returns the number of pages processed."""
+        processed = 0
+        try:
+            for batch in batched(self.iter_pages_to_process(), PREFETCH_BATCH_SIZE):
+                self.prefetch_pages([page for _, page, _ in batch])
 
-        data_root_dir: Path = self.args.output_directory / "Data"
-        if not os.path.isdir(data_root_dir):
-            logger.error(f"Data directory not found: {data_root_dir}")
-            return
+                for category, page, data_path in batch:
+                    logger.debug(f"Processing page {page.title()} ({category})")
 
-        @dataclass
-        class ToProcess:
-            category: DataCategory
-            page: Page
-            filepath: Path
+                    made_change = self.process_page(category, page, self.output.read(data_path))
+                    processed += 1
 
-        to_process: list[Resumable] = []
+                    self.resume.update_progress(page.title())
+                    if made_change and self.mirror is not None:
+                        self.mirror.mark_stale([page.title()])
 
-        for category_dir in data_root_dir.iterdir():
-            if not category_dir.is_dir():
-                continue
-            try:
-                category = DataCategory(category_dir.name)
-            except ValueError:
-                logger.exception(f"Unknown category directory: {category_dir.name}, skipping.")
-                continue
+                    if made_change and self.args.only_one_change:
+                        logger.info("Stopping after processing only one change, as requested from cli args.")
+                        return processed
+        finally:
+            self.resume.flush()
+        return processed
 
-            if self.args.only_categories and category not in self.args.only_categories:
-                continue
 
-            for file_path in category_dir.iterdir():
-                if not file_path.is_file():
-                    continue
+@dataclass
+class ProcessorTools(CliTools):
+    """Runs page processors in a single pass over the pages.
 
-                subpagename = file_path.stem
+    Pages are listed, fetched (or read from the mirror) and resumed once for all processors, and each page is
+    saved at most once with the edits of all processors. Parsed templates are shared too, see parse_wikitext.
+    """
 
-                if category_has_human_pages(category) and self.options.page_mode & PageMode.HUMAN:
-                    page = self.wiki.page(get_human_page_title(category, subpagename))
-                    if self.should_process_page(category, page):
-                        to_process.append(Resumable(page.title(), ToProcess(category, page, file_path)))
+    processors: list[PageProcessor] = field(default_factory=list)
 
-                if self.options.page_mode & PageMode.DATA:
-                    data_page = self.wiki.page(get_data_page_title(category, subpagename))
-                    if self.should_process_page(category, data_page):
-                        to_process.append(
-                            Resumable(
-                                data_page.title(),
-                                ToProcess(category, data_page, file_path),
-                            )
-                        )
+    @property
+    @override
+    def tool_id(self) -> str:
+        return "+".join(type(processor).__name__ for processor in self.processors)
 
-        current_index = self.resume.init_resume_index(to_process) if self.args.resume else 0
+    def __post_init__(self):
+        for processor in self.processors:
+            processor.cli = self
+        super().__post_init__()
 
-        for idx in range(current_index, len(to_process)):
-            obj: ToProcess = to_process[idx].obj
+    @override
+    def add_args(self, parser: argparse.ArgumentParser):
+        for processor in self.processors:
+            processor.add_args(parser)
 
-            logger.debug(f"Processing page {obj.page.title()} ({obj.category})")
+    @override
+    def process_args(self, args: argparse.Namespace):
+        for processor in self.processors:
+            processor.process_args(args)
 
-            made_change = self.process_page(obj.category, obj.page, obj.filepath.read_text())
+    @override
+    def should_process_page(self, category: DataCategory, page: Page) -> bool:
+        return any(processor.should_process_page(category, page) for processor in self.processors)
 
-            self.resume.update_progress(obj.page.title())
+    @override
+    def process_page(self, category: DataCategory, page: Page, file_content: str) -> bool:
+        original_text = page.text
+        made_change, summaries = run_processors(self.processors, category, page, file_content)
+        for summary in summaries:
+            self.count("Page edits", summary)
+        if page.text != original_text and self.args.apply:
+            page.save(summary="; ".join(summaries) or None)
+        return made_change
 
-            if made_change and self.args.only_one_change:
-                logger.info("Stopping after processing only one change, as requested from cli args.")
-                break
+    def main(self):
+        self.process_all_pages()
+        for processor in self.processors:
+            processor.report()
@@ -0,0 +1,71 @@
+"""The data file of each generated object, by lua id, and the data files renamed since the previous generation.
+
+Written by generate_wiki at the root of the output directory. When an object gets another data file name (renamed in
+the game, or a new WIKI_NAME_OVERRIDES entry), its pages are moved by move_renamed_pages instead of being created again.
+
+    {"files": {"item": {"metalore": "Metal Ore"}}, "renames": {"item": {"Metal Ore": "Raw Metal Ore"}}}
+
+Renames are kept by the next generations until the object is renamed again (then they point to its last name), or the
+old name is taken by another object: generating twice before moving the pages loses none.
+
+Example Usage:
+
+    previous = Manifest.from_json(output.read(MANIFEST_PATH))
+    manifest = previous.update({"item": {"metalore": "Raw Metal Ore"}})
+"""
+
+from dataclasses import dataclass, field
+import json
+
+# Relative to the output directory, see OutputFiles.
+MANIFEST_PATH = "manifest.json"
+
+# Table name -> object key (see game_snapshot.object_key) -> data file name
+ManifestFiles = dict[str, dict[str, str]]
+# Table name -> old data file name -> new data file name
+Renames = dict[str, dict[str, str]]
+
+
+@dataclass
+class Manifest:
+    files: ManifestFiles = field(default_factory=dict)
+    renames: Renames = field(default_factory=dict)
+
+    def update(self, files: ManifestFiles) -> "Manifest":
+        """Next manifest, with the tables of `files` replaced. Other tables are kept as is (ex. with --only-categories)."""
+        manifest = Manifest({**self.files, **files}, {table: renames for table, renames in self.renames.items() if table not in files})
+        for table, new_files in files.items():
+            old_files = self.files.get(table, {})
+            old_keys = {file_name: key for key, file_name in old_files.items()}
+            current_names = set(new_files.values())
+            renames: dict[str, str] = {}
+
+            # Pending renames, to the last name of the object.
+            for old_name, previous_name in self.renames.get(table, {}).items():
+                new_name = new_files.get(old_keys.get(previous_name, ""))
+                if new_name and new_name != old_name and old_name not in current_names:
+                    renames[old_name] = new_name
+
+            for key, new_name in new_files.items():
+                old_name = old_files.get(key)
+                if old_name and old_name != new_name and old_name not in current_names:
+                    renames[old_name] = new_name
+
+            if renames:
+                manifest.renames[table] = renames
+        return manifest
+
+    def rename_count(self) -> int:
+        return sum(len(renames) for renames in self.renames.values())
+
+    def to_json(self) -> str:
+        content = {
+            "files": {table: dict(sorted(files.items())) for table, files in sorted(self.files.items())},
+            "renames": {table: dict(sorted(renames.items())) for table, renames in sorted(self.renames.items())},
+        }
+        return json.dumps(content, indent=2, ensure_ascii=False)
+
+    @staticmethod
+    def from_json(content: str) -> "Manifest":
+        data = json.loads(content)
+        return Manifest(data.get("files", {}), data.get("renames", {}))
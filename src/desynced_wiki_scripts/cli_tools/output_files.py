@@ -0,0 +1,53 @@
+"""The generated wiki files (see generate_wiki), read from the output directory or kept in memory.
+
+Paths are relative to the output directory, with "/" separators, ex. "Data/item/Metal Ore".
+When the generation runs in the same process (see pipeline), it records the files it writes: later steps use them
+without reading the directory again.
+
+Example Usage:
+
+    output = OutputFiles(Path("wiki"))
+    for path in output.paths("Template"):
+        content = output.read(f"Template/{path}")
+"""
+
+import os
+from pathlib import Path
+
+
+class OutputFiles:
+    def __init__(self, root: Path, in_memory: bool = False):
+        self.root = root
+        # Relative path -> content, None when reading the directory.
+        self._files: dict[str, str] | None = {} if in_memory else None
+
+    @property
+    def in_memory(self) -> bool:
+        return self._files is not None
+
+    def record(self, path: str, content: str):
+        """Keeps a written file. Does not write it, nor does anything when reading from the directory."""
+        if self._files is not None:
+            self._files[path] = content
+
+    def paths(self, directory: str) -> list[str]:
+        """Paths of every file under `directory`, nested ones included, relative to it. Sorted."""
+        if self._files is not None:
+            prefix = f"{directory}/"
+            return sorted(path[len(prefix) :] for path in self._files if path.startswith(prefix))
+
+        directory_path = self.root / directory
+        paths = []
+        for root, _, files in os.walk(directory_path):
+            paths += [(Path(root) / file).relative_to(directory_path).as_posix() for file in files]
+        return sorted(paths)
+
+    def read(self, path: str) -> str:
+        if self._files is not None:
+            return self._files[path]
+        return (self.root / path).read_text(encoding="utf-8")
+
+    def exists(self, path: str) -> bool:
+        if self._files is not None:
+            return path in self._files
+        return (self.root / path).is_file()
@@ -0,0 +1,62 @@
+"""Page processors: checks or fixes on pages, that can run together in one pass over the pages (see ProcessorTools)."""
+
+from __future__ import annotations
+
+import argparse
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING
+
+from desynced_wiki_scripts.wiki.data_categories import DataCategory
+
+if TYPE_CHECKING:
+    from pywikibot import Page
+
+    from .common import CliTools
+
+
+class PageProcessor(ABC):
+    """One check or fix on pages, runnable alone or with others in one pass over the pages (see ProcessorTools).
+
+    Processors don't save pages: they change `page.text` and the pass saves once per page, with every processor
+    change merged. Other changes (ex. image uploads) are done by the processor.
+    """
+
+    # Part of the edit summary when this processor changed the text.
+    summary: str = ""
+    # Set by ProcessorTools, for its args and wiki.
+    cli: "CliTools"
+
+    def add_args(self, _parser: argparse.ArgumentParser):
+        """(To override) Add processor-specific command-line arguments to the parser."""
+
+    def process_args(self, _args: argparse.Namespace):
+        """(To override) Process processor-specific command-line arguments."""
+
+    def should_process_page(self, _category: DataCategory, _page: Page) -> bool:
+        return True
+
+    @abstractmethod
+    def process_page(self, category: DataCategory, page: Page, file_content: str) -> bool:
+        """(To override) Process one page, editing `page.text` in place. Must returns true if a change was made."""
+        return False
+
+    def report(self):
+        """(To override) Called after all pages were processed."""
+
+
+def run_processors(processors: list[PageProcessor], category: DataCategory, page: Page, file_content: str) -> tuple[bool, list[str]]:
+    """Runs every processor wanting this page, in order: each one sees the text edited by the previous ones.
+
+    Returns if a change was made, and the summaries of the processors that changed the text.
+    """
+    made_change = False
+    summaries: list[str] = []
+    for processor in processors:
+        if not processor.should_process_page(category, page):
+            continue
+        text_before = page.text
+        if processor.process_page(category, page, file_content):
+            made_change = True
+            if page.text != text_before and processor.summary:
+                summaries.append(processor.summary)
+    return made_change, summaries
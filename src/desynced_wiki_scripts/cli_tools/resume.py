@@ -1,108 +1,132 @@
-from dataclasses import asdict, dataclass
+"""Resume journal: the ids of the processed items, appended to a jsonl file, one record per line.
+
+Resuming skips the ids found in the journal, whatever their position in the list to process: the list can change
+order, and several workers can append to the same journal (each batch is written with one append).
+Records are written by batches, with one fsync per batch: a crash redoes at most one batch.
+
+The file is rewritten (compacted) only when opening the journal: to start over, or when it grew too much with
+duplicate records. Don't open it while other workers are appending.
+
+    {"source": "CleanupPageTemplates", "id": "Metal Ore"}
+"""
+
 import json
+import os
 from pathlib import Path
 
-from typing import Any, TypeAlias
+from typing import TypeAlias
 
 from desynced_wiki_scripts.util.logger import get_logger
 
 logger = get_logger()
 
-
-@dataclass
-class Resumable:
-    id: str
-    obj: Any  # Any way to use type safety later?
+# Records written at once, and the most redone after a crash.
+SYNC_EVERY = 20
+# Compact the journal when opening it if it has that many lines per distinct record.
+COMPACT_RATIO = 2
 
 
 ResumableId: TypeAlias = str
 
 
-@dataclass
-class ResumeData:
-    source: str  # anything that can be used as script id
-    last_processed: str = ""  # can be whatever
-    total_processed: int = 0  # minimal consistency check
-
-
 class ResumeHelper:
-    _resume_data: ResumeData
     _resume_file_path: Path
     _source_id: str
+    # Ids already processed by this source, from the journal and this run.
+    _done: set[ResumableId]
+    # Records not written yet.
+    _pending_records: list[ResumableId]
 
-    def __init__(self, source_id: str, resume_file_path: Path, resume: bool):
-        self._resume_file_path = resume_file_path
-        self._source_id = source_id
-        self._resume_data = self._init_resume_data(source_id, resume)
-
-    def init_resume_index(self, to_process: list[Resumable]) -> int:
+    def __init__(self, source_id: str, resume_file_path: Path, resume: bool, sync_every: int = SYNC_EVERY):
         """
-        Looks in the list at the saved totalProcessed index and checks if the text there matches our last_processed.
-        If so, we can return the index, else, warn and reset resume at 0.
-
-        Returns at which index to start
+        Args:
+            source_id (str): Stable id of the tool, the journal can hold records of several tools.
+            resume (bool): If False, starts over: records of this tool are removed from the journal.
         """
-
-        if self._resume_data.total_processed > 0:
-            last_processed_index = self._resume_data.total_processed - 1
-            if self._resume_data.total_processed == len(to_process):
-                logger.info("Resume found last run finished execution. Starting over.")
-            elif last_processed_index >= len(to_process):
-                logger.warning("Resume mismatch: last_processed_index is bigger than our dataset. Reseting resume to 0.")
-            elif to_process[last_processed_index].id == self._resume_data.last_processed:
-                logger.info(f"Resuming at index {last_processed_index} ({self._resume_data.last_processed})")
-                self._resume_data = ResumeData(
-                    self._source_id,
-                    to_process[last_processed_index].id,
-                    self._resume_data.total_processed,
-                )
-                return last_processed_index + 1  # start on the next one
-            else:
-                logger.warning(
-                    f"Resume mismatch: expected '{self._resume_data.last_processed}' at index {last_processed_index}, "
-                    f"but found '{to_process[last_processed_index]}'. Resetting resume to 0."
-                )
-                # Reset resume if mismatch or out of bounds
+        self._resume_file_path = resume_file_path
+        self._source_id = source_id
+        self._sync_every = sync_every
+        self._done = set()
+        self._pending_records = []
+
+        records, line_count = self._read_records()
+        own_records = {record_id for source, record_id in records if source == source_id}
+        if resume:
+            self._done = own_records
+            logger.debug(f"Loaded resume journal: {self._resume_file_path}, {len(own_records)} done")
+            if line_count > COMPACT_RATIO * len(set(records)):
+                self._compact(keep_own=True)
         else:
-            logger.info("No valid resume index found, starting from 0.")
-
-        self._resume_data = ResumeData(self._source_id)
-        self._write_resume_file(self._resume_data)
-        return 0
-
-    def update_progress(self, finished_id: str):
-        """Update resume file with last file and increase totalProcessed by 1, then write it immediately."""
-        self._resume_data.last_processed = finished_id
-        self._resume_data.total_processed += 1
-        self._write_resume_file(self._resume_data)
-
-    def _write_resume_file(self, resume: ResumeData):
-        """Write resume data to file. Raise on error."""
+            logger.debug(f"Resuming not requested, progress in resume journal ({self._resume_file_path}) is reset")
+            if own_records:
+                self._compact(keep_own=False)
+
+    def is_done(self, resumable_id: ResumableId) -> bool:
+        """If the item was processed, by a previous run or this one."""
+        return resumable_id in self._done
+
+    def restart(self):
+        """Forgets the processed items, ex. when the last run finished execution."""
+        self._done = set()
+        self._pending_records = []
+        self._compact(keep_own=False)
+
+    def update_progress(self, finished_id: ResumableId):
+        """Records an item as processed. Written to the journal by batches, see `flush`."""
+        self._done.add(finished_id)
+        self._pending_records.append(finished_id)
+        if len(self._pending_records) >= self._sync_every:
+            self.flush()
+
+    def flush(self):
+        """Appends the records not written yet to the journal, in one write, then fsyncs it. Raise on error."""
+        if not self._pending_records:
+            return
+        lines = "".join(self._record_line(self._source_id, record_id) for record_id in self._pending_records)
         try:
-            with open(self._resume_file_path, "w", encoding="utf-8") as f:
-                json.dump(asdict(resume), f, indent=2)
-            # logger.debug(f"Resume file updated: {self._resume_file_path}")
+            with open(self._resume_file_path, "a", encoding="utf-8") as f:
+                f.write(lines)
+                f.flush()
+                os.fsync(f.fileno())
         except Exception as e:
-            logger.error(f"Failed to write resume file: {e}")
+            logger.error(f"Failed to write resume journal: {e}")
             raise
-
-    def _init_resume_data(self, source_id: str, resume: bool) -> ResumeData:
-        if self._resume_file_path.exists() and resume:
-            try:
-                with open(self._resume_file_path, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                    return ResumeData(**data)
-                logger.debug(f"Loaded resume file: {self._resume_file_path}")
-            except FileNotFoundError as e:
-                logger.warning(f"Resume file not found, starting fresh: {e}")
-                return ResumeData(source_id)
-            except json.JSONDecodeError as e:
-                logger.warning(f"Invalid JSON in resume file, starting fresh: {e}")
-                return ResumeData(source_id)
-            except TypeError as e:
-                logger.warning(f"Invalid data in resume file, starting fresh: {e}")
-                return ResumeData(source_id)
-        else:
-            if not resume:
-                logger.debug(f"Resuming not requested, resume file ({self._resume_file_path}) will be overwritten")
-            return ResumeData(source_id)
+        self._pending_records = []
+
+    @staticmethod
+    def _record_line(source_id: str, record_id: ResumableId) -> str:
+        return json.dumps({"source": source_id, "id": record_id}, ensure_ascii=False) + "\n"
+
+    def _read_records(self) -> tuple[list[tuple[str, ResumableId]], int]:
+        """(source, id) records of the journal, and its number of lines."""
+        if not self._resume_file_path.exists():
+            return [], 0
+
+        records = []
+        line_count = 0
+        with open(self._resume_file_path, "r", encoding="utf-8") as f:
+            for line in f:
+                line_count += 1
+                try:
+                    record = json.loads(line)
+                    records.append((record["source"], record["id"]))
+                except (json.JSONDecodeError, KeyError, TypeError):
+                    # Ex. a line cut by a crash, or a resume file of an older version.
+                    logger.warning(f"Invalid record in resume journal {self._resume_file_path}, ignoring it: {line.strip()[:80]}")
+        return records, line_count
+
+    def _compact(self, keep_own: bool):
+        """Rewrites the journal with one line per record, without the records of this source unless `keep_own`."""
+        records, _ = self._read_records()
+        kept = [(source, record_id) for source, record_id in dict.fromkeys(records) if keep_own or source != self._source_id]
+        temp_path = self._resume_file_path.with_name(self._resume_file_path.name + ".tmp")
+        try:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                f.writelines(self._record_line(source, record_id) for source, record_id in kept)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self._resume_file_path)
+        except Exception as e:
+            logger.error(f"Failed to compact resume journal: {e}")
+            raise
+        logger.debug(f"Compacted resume journal {self._resume_file_path}: {len(records)} -> {len(kept)} records")
@@ -0,0 +1,81 @@
+"""Deterministic split of a run in shards, to run them in parallel (other processes, other hosts).
+
+An object belongs to one shard by a stable hash of its file name in the output directory (ex. "Metal Ore"): its data
+page, its human page and its generated file are in the same shard, for every tool and every host.
+Each shard writes its counts to a summary file, merged afterwards with merge_shard_summaries.
+
+Example Usage:
+
+    generate_wiki --shard 1/4 && upload_wiki --shard 1/4 --summary-file upload-1.json --apply
+    ...
+    merge_shard_summaries upload-*.json
+"""
+
+from collections import Counter
+from dataclasses import dataclass
+import json
+from pathlib import Path
+import zlib
+
+from desynced_wiki_scripts.util.logger import get_logger
+
+logger = get_logger()
+
+
+@dataclass(frozen=True)
+class Shard:
+    # From 1 to count.
+    index: int
+    count: int
+
+    @staticmethod
+    def parse(value: str) -> "Shard":
+        """From "i/n", ex. "1/4" for the first of 4 shards."""
+        try:
+            index, count = (int(part) for part in value.split("/"))
+        except ValueError as e:
+            raise ValueError(f"Invalid shard '{value}', expected i/n, ex. 1/4") from e
+        if not 1 <= index <= count:
+            raise ValueError(f"Invalid shard '{value}', expected 1 <= i <= n")
+        return Shard(index, count)
+
+    def __str__(self) -> str:
+        return f"{self.index}/{self.count}"
+
+    @property
+    def is_first(self) -> bool:
+        """The first shard also does the work that can't be split, ex. uploading cargo declarations."""
+        return self.index == 1
+
+    def owns(self, file_name: str) -> bool:
+        # crc32: stable across processes and hosts, unlike hash().
+        return zlib.crc32(file_name.encode("utf-8")) % self.count == self.index - 1
+
+
+# Counts of a tool run, by table: {"Updated data files": {"item": 12}}
+Counts = dict[str, Counter[str]]
+
+
+def write_summary(path: Path, tool_id: str, shard: Shard | None, counts: Counts):
+    summary = {"tool": tool_id, "shard": str(shard) if shard else None, "counts": counts}
+    path.write_text(json.dumps(summary, indent=2, ensure_ascii=False), encoding="utf-8")
+    logger.info(f"Wrote run summary to {path}")
+
+
+def merge_summaries(paths: list[Path]) -> dict[str, Counts]:
+    """Sums the counts of the summaries, by tool."""
+    merged: dict[str, Counts] = {}
+    for path in paths:
+        summary = json.loads(path.read_text(encoding="utf-8"))
+        tool_counts = merged.setdefault(summary["tool"], {})
+        for table, counts in summary["counts"].items():
+            tool_counts.setdefault(table, Counter()).update(counts)
+    return merged
+
+
+def log_counts(table: str, counts: Counter[str]):
+    logger.info(f"{table}: {counts.total()}")
+    logger.info(f"{'':<4}{'Name':<30} | {'Count':>8}")
+    logger.info(f"{'':<4}" + "-" * 41)
+    for name in sorted(counts):
+        logger.info(f"{'':<4}{name:<30} | {counts[name]:>8}")
@@ -1,21 +1,35 @@
-from collections import defaultdict
+from __future__ import annotations
+
+import argparse
+from collections import Counter
 from dataclasses import dataclass
-import os
+from itertools import batched
 from pathlib import Path
-from typing import override
+from typing import TYPE_CHECKING, override
 
 from .cli_tools.common import (
     CliTools,
     CliToolsOptions,
     PageMode,
-    Page,
 )
+from .cli_tools.shard import log_counts
+from .util.constants import FETCHED_GAME_DATA_DIR
 from .util.logger import get_logger
 from .wiki.data_categories import DataCategory
-from .wiki.titles import get_template_page, get_template_title
+from .wiki.titles import get_module_page, get_navbox_template_title, get_template_page, get_template_title, normalize_title
+
+if TYPE_CHECKING:
+    from .analysis.impact_graph import ImpactGraph
+    from .cli_tools.common import Page
+    from .lua.game_data import GameData
 
 logger = get_logger()
 
+UPDATED_DATA_FILES = "Updated data files"
+PURGED_PAGES = "Purged pages"
+# Titles per purge request, the max for normal users.
+PURGE_BATCH_SIZE = 50
+
 
 @dataclass(frozen=True)
 class CargoTable:
@@ -24,9 +38,47 @@ class CargoTable:
 
 
 class UploadWiki(CliTools):
-    _updated_category_templates: set[DataCategory] = set()
+    # Cargo table names, child tables of normalized lists included (they have no DataCategory).
+    _updated_category_templates: set[str] = set()
     _updated_category_data: set[DataCategory] = set()
-    _updated_data_files: dict[DataCategory, list] = defaultdict(list)
+    _purge: bool
+    _game_data_directory: Path
+
+    def __post_init__(self):
+        # Data page titles, as updated.
+        self._updated_data_pages: list[str] = []
+        super().__post_init__()
+
+    @override
+    def add_args(self, parser: argparse.ArgumentParser):
+        parser.add_argument(
+            "--purge",
+            action=argparse.BooleanOptionalAction,
+            help="If True, purges the human pages showing the updated data (their own, and the ones of related objects: recipes, techs)."
+            " Needs the game data",
+            default=False,
+        )
+        parser.add_argument(
+            "--game-data-directory",
+            type=str,
+            help="Path to the directory containing the lua game data files (= root of main mod), for --purge",
+            default=FETCHED_GAME_DATA_DIR,
+        )
+
+    @override
+    def process_args(self, args: argparse.Namespace):
+        self._purge = args.purge
+        self._game_data_directory = Path(args.game_data_directory)
+
+    @property
+    def game(self) -> GameData:
+        """Shared with the other tools of the process, loaded on first use."""
+        if not self.shared.game:
+            from .lua import lua_util
+            from .lua.game_data import GameData
+
+            self.shared.game = GameData(lua_util.load_lua_runtime(self._game_data_directory))
+        return self.shared.game
 
     @override
     def process_page(
@@ -38,6 +90,8 @@ class UploadWiki(CliTools):
         if not page.exists() or page.text != file_content:
             logger.info(f"Updating page {page.title()}")
             self._updated_category_data.add(category)
+            self._updated_data_pages.append(page.title())
+            self.count(UPDATED_DATA_FILES, category)
 
             if self.args.apply:
                 page.text = file_content
@@ -47,31 +101,103 @@ class UploadWiki(CliTools):
         return False
 
     def update_templates(self):
-        templates_root_dir: Path = self.args.output_directory / "Template"
-        for root, _, files in os.walk(templates_root_dir):
-            for file in files:
-                with open(os.path.join(root, file), "r", encoding="utf-8") as f:
-                    template_title = get_template_title(file)
-                    page_title = get_template_page(template_title)
-                    content: str = f.read()
+        for path in self.output.paths("Template"):
+            file = Path(path).name
+            template_title = get_template_title(file)
+            page_title = get_template_page(template_title)
+            content: str = self.output.read(f"Template/{path}")
+
+            # Upload the file.
+            page = self.wiki.page(page_title)
+
+            # Bail if there's no change.
+            if content == page.text:
+                continue
+
+            self._updated_category_templates.add(file)
+            self.count("Updated templates", file)
+            logger.info(f"Updating {page_title} because content changed")
+            if not self.args.apply:
+                continue
 
-                    # Upload the file.
-                    page = self.wiki.page(page_title)
+            page.text = content
+            page.save()
 
-                    # Bail if there's no change.
-                    if content == page.text:
-                        continue
+    def update_modules(self):
+        """Uploads the generated Lua data modules, ex. Module/GameData/item -> Module:GameData/item."""
+        for path in self.output.paths("Module"):
+            page_title = get_module_page(path)
+            content: str = self.output.read(f"Module/{path}")
 
-                    self._updated_category_templates.add(DataCategory(file))
-                    logger.info(f"Updating {page_title} because content changed")
-                    if not self.args.apply:
-                        continue
+            page = self.wiki.page(page_title)
+            if page.exists() and content == page.text:
+                continue
+
+            logger.info(f"Updating {page_title} because content changed")
+            if not self.args.apply:
+                continue
+
+            page.text = content
+            page.save()
+
+    def update_navboxes(self):
+        """Uploads the pre-rendered navboxes, ex. Navbox/Item -> Template:Navbox/Item.
+
+        Only changed navboxes are uploaded: every page showing a navbox is re-rendered when it is edited.
+        """
+        for path in self.output.paths("Navbox"):
+            page_title = get_template_page(get_navbox_template_title(path))
+            content: str = self.output.read(f"Navbox/{path}")
+
+            page = self.wiki.page(page_title)
+            # The wiki strips trailing whitespace on save.
+            if page.exists() and content.strip() == page.text.strip():
+                continue
 
-                    page.text = content
-                    page.save()
+            logger.info(f"Updating {page_title} because content changed")
+            if not self.args.apply:
+                continue
+
+            page.text = content
+            page.save()
+
+    def purge_affected_pages(self):
+        """Purges the human pages showing the data of the updated data pages, see ImpactGraph."""
+        from .analysis.impact_graph import ImpactGraph
+        from .wiki.data_tables import get_data_tables
+
+        titles = self.affected_pages(ImpactGraph.from_tables(get_data_tables(self.game)))
+        logger.info(f"Purging {len(titles)} pages showing the {len(self._updated_data_pages)} updated data pages")
+        self.purge_pages(titles)
+
+    def affected_pages(self, graph: ImpactGraph) -> list[str]:
+        """Titles of the human pages showing the data of the updated data pages."""
+        # Titles as normalized by the wiki, like the updated pages.
+        nodes_by_title = {normalize_title(title): node for title, node in graph.data_page_titles().items()}
+        return sorted(graph.affected_pages(nodes_by_title[title] for title in self._updated_data_pages if title in nodes_by_title))
+
+    def purge_pages(self, titles: list[str]):
+        """Purges the pages by batches. Counts the pages purged, all of them in a dry run."""
+        for batch in batched(titles, PURGE_BATCH_SIZE):
+            if not self.args.apply:
+                for _ in batch:
+                    self.count(PURGED_PAGES, "Pages")
+                continue
+            for result in self.wiki.purge(list(batch)):
+                if "missing" in result:
+                    logger.debug(f"Page {result['title']} does not exist, not purged")
+                else:
+                    self.count(PURGED_PAGES, "Pages")
 
     def main(self):
-        self.update_templates()
+        # Pages not related to one object are all uploaded by the first shard.
+        upload_shared_pages = not self.args.shard or self.args.shard.is_first
+        if upload_shared_pages:
+            self.update_templates()
+            self.update_modules()
+            self.update_navboxes()
+        else:
+            logger.info(f"Shard {self.args.shard}: templates, modules and navboxes are uploaded by the first shard")
         self.process_all_pages()
 
         # Recreate cargo tables here.
@@ -100,13 +226,10 @@ class UploadWiki(CliTools):
         #     ), f"Failed to recreate data for {table}"
         # logger.info(f"Regenerated data for tables: {self._updated_category_data}")
 
-        logger.info(f"Updated {len(self._updated_data_files)} data files:")
+        if self._purge and self._updated_data_pages:
+            self.purge_affected_pages()
 
-        logger.info(f"{'Category':<20} | {'Updated Files':>13}")
-        logger.info("-" * 36)
-        for category in sorted(self._updated_data_files):
-            count = len(self._updated_data_files[category])
-            logger.info(f"{category:<20} | {count:>13}")
+        log_counts(UPDATED_DATA_FILES, self.counts.get(UPDATED_DATA_FILES, Counter()))
 
         if not self.args.apply:
             logger.info("(Not applied, this is a dry run)")
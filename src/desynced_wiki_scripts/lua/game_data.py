@@ -2,10 +2,11 @@ import collections
 from dataclasses import dataclass
 import logging
 import os
-from typing import Any, Optional
+from typing import Any, Iterator, Optional
 
 from lupa import LuaRuntime  # pylint: disable=no-name-in-module
 
+from desynced_wiki_scripts.analysis.tech_tree import TechTree
 from desynced_wiki_scripts.models.category_filters import CategoryFilter
 from desynced_wiki_scripts.models.component import Component, PowerStats, Register, WeaponStats
 from desynced_wiki_scripts.models.entity import Entity, EntityType, SlotType
@@ -18,15 +19,18 @@ from desynced_wiki_scripts.models.recipe import (
     RecipeTypeGame,
     RecipeType,
 )
+from desynced_wiki_scripts.models.recipe_usage import RecipeUsage, UsageRelation
 from desynced_wiki_scripts.models.sockets import Sockets, SocketSize
 from desynced_wiki_scripts.models.tech import (
     Technology,
     TechnologyCategory,
     TechnologyUnlock,
 )
+from desynced_wiki_scripts.models.throughput import Throughput
 from desynced_wiki_scripts.models.types import Race
 from desynced_wiki_scripts.util.constants import FORCE_IGNORE_NAMES, WIKI_OVERRIDES, IGNORED_TECHS
 from desynced_wiki_scripts.wiki.cargo.cargo_printer import CargoPrinter
+from desynced_wiki_scripts.wiki.data_categories import DataCategory
 from desynced_wiki_scripts.wiki.wiki_name_overrides import get_name_override
 
 from .lua_util import tick_duration_to_seconds, per_tick_to_per_second
@@ -65,15 +69,23 @@ class GameData:
     instructions: list[Instruction]
     tech_unlocks: set[TechnologyUnlock]
     technologies: list[Technology]
+    # Requirement graph of `technologies`.
+    tech_tree: TechTree
     technology_categories: list[TechnologyCategory]
     category_filters: list[CategoryFilter]
+    # Reverse recipe indexes, keyed by the name of the ingredient, producer or miner.
+    ingredient_to_consumers: dict[str, list[RecipeUsage]]
+    producer_to_products: dict[str, list[RecipeUsage]]
+    miner_to_resources: dict[str, list[RecipeUsage]]
 
-    # Names we consider for uploading to wiki cargo tables
-    _upload_names: set[str] = set()
-    _unlockable_names_from_tech: set[str] = set()
+    # Names we consider for uploading to wiki cargo tables. Per instance: several versions can be loaded at once.
+    _upload_names: set[str]
+    _unlockable_names_from_tech: set[str]
 
     def __init__(self, lua: LuaRuntime):
         self.lua: LuaRuntime = lua
+        self._upload_names = set()
+        self._unlockable_names_from_tech = set()
         self.data = self.globals().data  # type: ignore
         self._apply_renames()  # before everything else
         self.frames = self.data.frames
@@ -83,9 +95,11 @@ class GameData:
         self.instructions = self._parse_instructions()
         self.tech_unlocks = set()
         self.technologies = self._parse_technologies()
+        self.tech_tree = TechTree(self.technologies)
         self.technology_categories = self._parse_technology_categories()
         self.category_filters = self._parse_category_filters()
         self._compute_wiki_metadata()
+        self._build_recipe_indexes()
 
     def _apply_renames(self):
         def apply_overrides(collection):
@@ -100,7 +114,7 @@ class GameData:
 
     def _compute_wiki_metadata(self):
         # Start from unlocked names from tech
-        self._upload_names = self._unlockable_names_from_tech
+        self._upload_names = set(self._unlockable_names_from_tech)
         # Merge the names manually added
         self._upload_names.update({name for name in WIKI_OVERRIDES.keys()})
         # Unlock other components/items referenced from unlocked frames
@@ -138,8 +152,101 @@ class GameData:
             item.metadata.unlockable = is_unlockable(item)
 
     def should_skip_upload(self, desynced_object: Any) -> bool:
+        if isinstance(desynced_object, RecipeUsage):
+            # Techs are never filtered, only consider the objects on both ends of the edge.
+            return desynced_object.subject not in self._upload_names or (
+                desynced_object.target_table != DataCategory.tech and desynced_object.target not in self._upload_names
+            )
+        if isinstance(desynced_object, Throughput):
+            return desynced_object.product not in self._upload_names or desynced_object.producer not in self._upload_names
         return desynced_object.name not in self._upload_names
 
+    def iter_recipes(self) -> Iterator[tuple[DataCategory, Any, Recipe]]:
+        """Yields (category, object, recipe) for every parsed object owning a recipe."""
+        for entity in self.entities:
+            yield DataCategory.entity, entity, entity.recipe
+        for component in self.components:
+            yield DataCategory.component, component, component.production_recipe
+        for item in self.items:
+            yield DataCategory.item, item, item.production_recipe
+        for tech in self.technologies:
+            yield DataCategory.tech, tech, tech.recipe
+
+    @property
+    def recipe_usages(self) -> list[RecipeUsage]:
+        """All reverse recipe edges, for export."""
+        return [
+            usage
+            for index in (self.ingredient_to_consumers, self.producer_to_products, self.miner_to_resources)
+            for usages in index.values()
+            for usage in usages
+        ]
+
+    def _build_recipe_indexes(self):
+        """Builds the reverse edges of recipes: ingredient -> consumers, producer -> products, miner -> mined resources."""
+        self.ingredient_to_consumers = {}
+        self.producer_to_products = {}
+        self.miner_to_resources = {}
+
+        def add(
+            index: dict[str, list[RecipeUsage]],
+            subject: str,
+            relation: UsageRelation,
+            target: Any,
+            category: DataCategory,
+            recipe_type: RecipeType = RecipeType.NONE,
+            amount: int = 0,
+            time: float = 0.0,
+        ):
+            index.setdefault(subject, []).append(
+                RecipeUsage(
+                    name=f"{subject}_{relation.value}_{target.name}",
+                    subject=subject,
+                    relation=relation,
+                    target=target.name,
+                    target_table=category,
+                    recipe_type=recipe_type,
+                    amount=amount,
+                    time=time,
+                )
+            )
+
+        for category, obj, recipe in self.iter_recipes():
+            for recipe_item in recipe.items:
+                add(
+                    self.ingredient_to_consumers,
+                    recipe_item.ingredient,
+                    UsageRelation.INGREDIENT,
+                    obj,
+                    category,
+                    recipe_type=recipe.recipe_type,
+                    amount=recipe_item.amount,
+                )
+            # Construction and uplink recipes have placeholder producers.
+            if recipe.recipe_type != RecipeType.PRODUCTION:
+                continue
+            for producer in recipe.producers:
+                add(
+                    self.producer_to_products,
+                    producer.producer,
+                    UsageRelation.PRODUCER,
+                    obj,
+                    category,
+                    recipe_type=recipe.recipe_type,
+                    time=producer.time,
+                )
+
+        for item in self.items:
+            for mining_recipe in item.mining_recipes:
+                add(
+                    self.miner_to_resources,
+                    mining_recipe.miner_component,
+                    UsageRelation.MINER,
+                    item,
+                    DataCategory.item,
+                    time=mining_recipe.mining_seconds,
+                )
+
     def _parse_category_filters(self) -> list[CategoryFilter]:
         categories = []
 
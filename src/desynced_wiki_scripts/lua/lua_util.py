@@ -1,3 +1,4 @@
+import hashlib
 import os
 from typing import Optional
 
@@ -19,6 +20,15 @@ def tick_duration_to_seconds(ticks: int) -> Optional[float]:
     return ticks / 5 if ticks else None
 
 
+def per_second_to_per_minute(rate: float) -> float:
+    return rate * 60
+
+
+def duration_to_per_minute(seconds: float, amount: float = 1) -> Optional[float]:
+    """Rate per minute of something producing `amount` every `seconds`."""
+    return per_second_to_per_minute(amount / seconds) if seconds else None
+
+
 # Set of lua files that are executed in the runtime for `load_lua_runtime`
 TARGET_FILES: list[str] = [
     "data/data.lua",
@@ -129,6 +139,15 @@ def load_lua_runtime(game_data_dir) -> LuaRuntime:
     return lua
 
 
+def game_files_digest(game_data_dir) -> str:
+    """Short digest of the files executed by `load_lua_runtime`: identifies a game version when its build id is unknown."""
+    digest = hashlib.sha1()
+    for file in TARGET_FILES:
+        with open(os.path.join(game_data_dir, file), "rb") as readfile:
+            digest.update(readfile.read())
+    return digest.hexdigest()[:12]
+
+
 def print_lua_table(table, filter_keys=None, prefix=""):
     """Recursively prints the table at `table`.
 
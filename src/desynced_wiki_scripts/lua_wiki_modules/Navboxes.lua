@@ -10,6 +10,22 @@ mw = mw
 
 local cargo = mw.ext.cargo
 
+-- Static game data generated by generate_wiki, see Module:GameData/<table>.
+-- mw.loadData parses each module once per page render, where every cargo query hits the database.
+local GAME_DATA_MODULE = "Module:GameData/"
+
+---@param table_name string
+local function loadGameData(table_name)
+  return mw.loadData(GAME_DATA_MODULE .. table_name)
+end
+
+-- Case-insensitive comparison, like the cargo where clauses this replaces
+---@param a string|nil
+---@param b string
+local function sameText(a, b)
+  return a ~= nil and mw.ustring.lower(a) == mw.ustring.lower(b)
+end
+
 local function stripWhitespace(str)
     return str:match("^%s*(.-)%s*$")
 end
@@ -43,12 +59,11 @@ local USER_NAV_CATEGORIES_TABLE = "userNavCategories"
 
 ---@class TypeData
 ---@comment Contains categoryfilter selectors for given type
----@field cargo_table string
----@field extra_fields string|nil Fields to query, beside name
+---@field cargo_table string Also the name of its game data module
 ---@field tab string
 ---@field filterField string
 ---@field recipeType string|nil
----@field orderBy string|nil
+---@field orderBy string[]|nil Fields to sort by, before name
 
 ---@alias NavboxType "BOT" | "BUILDING" | "COMPONENT" | "ITEM"
 
@@ -58,7 +73,6 @@ local USER_NAV_CATEGORIES_TABLE = "userNavCategories"
 local TYPES = {
   BOT = {
     cargo_table = "entity",
-    extra_fields = "race, slotType",
     tab = "frame",
     filterField = "size",
     recipeType = "Production"
@@ -76,10 +90,9 @@ local TYPES = {
   },
   ITEM = {
     cargo_table = "item",
-    extra_fields = "type, race",
     tab = "item",
     filterField = "tag",
-    orderBy = "type, race"
+    orderBy = { "type", "race" }
   }
 }
 
@@ -149,18 +162,18 @@ m.addBugsBots = function(categories)
     return
   end
 
-  local typeData = TYPES["BOT"]
-  local query_objects = cargo.query(
-    typeData.cargo_table,
-    'name',
-    {
-      where = 'size = "Unit" AND race = "Virus"'
-    }
-  )
+  local objectData = loadGameData(TYPES["BOT"].cargo_table)
+  local bugs = {}
+  for _, name in ipairs(objectData.names) do
+    local row = objectData.byName[name]
+    if sameText(row.size, "Unit") and sameText(row.race, "Virus") then
+      table.insert(bugs, { name = name })
+    end
+  end
 
-  _cache.bugs = query_objects
+  _cache.bugs = bugs
 
-  for _, row in ipairs(query_objects) do
+  for _, row in ipairs(bugs) do
     m.createOrAppendToCategory(categories, "Bugs", row.name, 999)
   end
 end
@@ -174,50 +187,48 @@ m.queryBaseCategories = function (type)
 
   local typeData = TYPES[type]
 
-  -- STEP 1: get category metadata
-  local categoriesMeta = cargo.query(
-    CATEGORY_FILTER_TABLE .. "=cat",
-    'name, filterVal, ordering',
-    {
-      where = string.format('tab="%s" AND filterField="%s"', typeData.tab, typeData.filterField),
-      groupBy = 'cat.filterVal'
-    }
-  )
-
-  -- build lookup table
+  -- STEP 1: get category metadata, one category per filter value
+  local filterData = loadGameData(CATEGORY_FILTER_TABLE)
   local filterToCategory = {}
   local categories = {}
 
-  for _, cat in ipairs(categoriesMeta) do
-    filterToCategory[cat.filterVal] = {
-      name = cat.name,
-      ordering = tonumber(cat.ordering) or 0
-    }
+  for _, catName in ipairs(filterData.names) do
+    local cat = filterData.byName[catName]
+    -- Empty fields are left out of the game data modules, a filter on the empty value has no filterVal.
+    local filterVal = cat.filterVal or ""
+    if cat.tab == typeData.tab and cat.filterField == typeData.filterField and not filterToCategory[filterVal] then
+      filterToCategory[filterVal] = {
+        name = cat.name,
+        ordering = tonumber(cat.ordering) or 0
+      }
+    end
   end
 
-  -- STEP 2: single bulk object query
-  local fields = 'name, unlockable,' .. typeData.filterField
-  if typeData.extra_fields then
-    fields = fields .. ',' .. typeData.extra_fields
+  -- STEP 2: unlockable objects from the game data module
+  local objectData = loadGameData(typeData.cargo_table)
+  local allObjects = {}
+  for _, name in ipairs(objectData.names) do
+    local row = objectData.byName[name]
+    if row.unlockable and (not typeData.recipeType or sameText(row.recipeType, typeData.recipeType)) then
+      table.insert(allObjects, row)
+    end
   end
 
-  local wherePart = 'unlockable = TRUE'
-  if typeData.recipeType then
-    wherePart = wherePart .. string.format(' AND recipeType="%s"', typeData.recipeType)
+  if typeData.orderBy then
+    table.sort(allObjects, function(a, b)
+      for _, field in ipairs(typeData.orderBy) do
+        local valueA, valueB = a[field] or "", b[field] or ""
+        if valueA ~= valueB then
+          return valueA < valueB
+        end
+      end
+      return a.name < b.name
+    end)
   end
 
-  local allObjects = cargo.query(
-    typeData.cargo_table,
-    fields,
-    {
-      where = wherePart,
-      orderBy = typeData.orderBy
-    }
-  )
-
   -- STEP 3: assign objects to categories in Lua
   for _, row in ipairs(allObjects) do
-    local filterVal = row[typeData.filterField]
+    local filterVal = row[typeData.filterField] or ""
     local meta = filterToCategory[filterVal]
 
     if meta then
@@ -7,6 +7,27 @@ local m = {} -- Use for internal function. You can use this one for debugging wi
 ---@diagnostic disable-next-line: lowercase-global
 mw = mw
 
+-- Static game data generated by generate_wiki, see Module:GameData/<table>.
+local GAME_DATA_MODULE = "Module:GameData/"
+
+--- Copy of a game data row: tables from mw.loadData are read-only.
+---@param table_name string
+---@param name string
+---@return table|nil
+function m.get_game_data_row(table_name, name)
+    local data = mw.loadData(GAME_DATA_MODULE .. table_name)
+    local row = data.byName[name]
+    if not row then
+        return nil
+    end
+
+    local copy = {}
+    for k, v in pairs(row) do
+        copy[k] = v
+    end
+    return copy
+end
+
 -- Mirror tech cargo table
 ---@class TechCargo
 ---@field name string
@@ -39,31 +60,11 @@ mw = mw
 
 ---@param name string
 function m.get_tech_cargo_data(name)
-    local fields = "name, luaId, description, category, texture, " ..
-                   "requiredTech1, requiredTech2, requiredTech3, " ..
-                   "progressCount, " ..
-                   "ingredient1, amount1, " ..
-                   "ingredient2, amount2, " ..
-                   "ingredient3, amount3, " ..
-                   "ingredient4, amount4, " ..
-                   "producer1, time1, " ..
-                   "producer2, time2, " ..
-                   "producer3, time3, " ..
-                   "producer4, time4, " ..
-                   "recipeType, numProduced"
-
-    local results = mw.ext.cargo.query(
-        "tech",
-        fields,
-        { where = string.format("name = '%s'", name) }
-    )
-
-    if not results or not results[1] then
+    local row = m.get_game_data_row("tech", name)
+    if not row then
         return nil
     end
 
-    local row = results[1]
-
     local numericFields = {
         "progressCount",
         "amount1", "amount2", "amount3", "amount4",
@@ -78,6 +79,49 @@ function m.get_tech_cargo_data(name)
     return row
 end
 
+-- Mirror techTree cargo table
+---@class TechTreeCargo
+---@field name string
+---@field depth integer
+---@field cumulativeProgressCount integer
+---@field allPrerequisites string Comma separated tech names, in research order
+---@field ingredient1 string
+---@field amount1 integer
+---@field ingredient2 string
+---@field amount2 integer
+---@field ingredient3 string
+---@field amount3 integer
+---@field ingredient4 string
+---@field amount4 integer
+---@field ingredient5 string
+---@field amount5 integer
+---@field ingredient6 string
+---@field amount6 integer
+---@field ingredient7 string
+---@field amount7 integer
+---@field ingredient8 string
+---@field amount8 integer
+
+local TECH_TREE_INGREDIENTS = 8
+
+-- Single row lookup: prerequisites and cumulative cost are computed when generating the data.
+---@param name string
+---@return TechTreeCargo|nil
+function m.get_tech_tree_cargo_data(name)
+    local row = m.get_game_data_row("techtree", name)
+    if not row then
+        return nil
+    end
+    row.depth = tonumber(row.depth) or 0
+    row.cumulativeProgressCount = tonumber(row.cumulativeProgressCount) or 0
+    for i = 1, TECH_TREE_INGREDIENTS do
+        row["amount" .. i] = tonumber(row["amount" .. i]) or 0
+    end
+
+    ---@cast row TechTreeCargo
+    return row
+end
+
 -- Inserts a table row cell for a single ingredient
 ---@param tech TechCargo The tech cargo object
 ---@param i integer Ingredient index (1–4)
@@ -164,15 +208,7 @@ end
 ---@param lua_id string
 ---@return string|nil
 m.get_frame_name = function(lua_id)
-    local results = mw.ext.cargo.query(
-        "entity",
-        "name", 
-        { where = string.format("luaId = '%s'", lua_id) }
-    )
-    if results and #results > 0 then
-        return results[1].name
-    end
-    return nil
+    return mw.loadData(GAME_DATA_MODULE .. "entity").nameByLuaId[lua_id]
 end
 
 --- Replace some components with their building (by lua id). Only supports frame
@@ -186,12 +222,21 @@ local UPLINK_REPLACEMENTS = {
 m.get_uplinks = function()
     local uplinks = {}
 
-    local results = mw.ext.cargo.query(
-        "component",
-        "name, luaId, uplinkRate",                    -- fields list
-        { where ="uplinkRate != 0",
-        orderBy = "uplinkRate DESC"} -- To try get the most basics first
-    )
+    local components = mw.loadData(GAME_DATA_MODULE .. "component")
+    local results = {}
+    for _, name in ipairs(components.names) do
+        local row = components.byName[name]
+        if (tonumber(row.uplinkRate) or 0) ~= 0 then
+            table.insert(results, { name = row.name, luaId = row.luaId, uplinkRate = row.uplinkRate })
+        end
+    end
+    -- To try get the most basics first
+    table.sort(results, function(a, b)
+        if a.uplinkRate ~= b.uplinkRate then
+            return a.uplinkRate > b.uplinkRate
+        end
+        return a.name < b.name
+    end)
 
     for _, obj in ipairs(results) do
         local replacement_id = UPLINK_REPLACEMENTS[obj.luaId]
@@ -264,6 +309,44 @@ m.total_requirements_table = function(tech)
     return tostring(elem)
 end
 
+---@param tree TechTreeCargo
+---@return string
+m.cumulative_requirements_table = function(tree)
+    if tree.allPrerequisites == nil or tree.allPrerequisites == "" then
+        return ""
+    end
+    local elem = mw.html.create("table")
+    elem
+        :addClass("wikitable")
+        :tag("caption"):wikitext("Total Requirements Including Prerequisites"):done()
+
+    local headerRow = elem:tag("tr")
+    local dataRow = elem:tag("tr")
+    local columns = 1
+    for i = 1, TECH_TREE_INGREDIENTS do
+        local ing = tree["ingredient" .. i]
+        if ing and ing ~= "" then
+            columns = columns + 1
+            headerRow:tag("th"):wikitext(string.format("[[%s]]", ing)):done()
+            m.ingredient_cell(dataRow, tree, i, 1)
+        end
+    end
+    headerRow:tag("th"):wikitext("Research progress"):done()
+    dataRow:tag("td"):wikitext(string.format("%i", tree.cumulativeProgressCount)):done()
+    headerRow:done()
+    dataRow:done()
+
+    local prerequisites = {}
+    for prerequisite in mw.text.gsplit(tree.allPrerequisites, ",", true) do
+        table.insert(prerequisites, string.format("[[Technology/%s|%s]]", prerequisite, prerequisite))
+    end
+    elem:tag("tr"):tag("td")
+        :attr("colspan", columns)
+        :wikitext("Prerequisites: " .. table.concat(prerequisites, ", "))
+        :done():done()
+    return tostring(elem)
+end
+
 --- Main function
 ---@param name string
 ---@return string
@@ -280,6 +363,11 @@ m.render = function(name)
       ..  m.researched_with_table(tech)
       ..  m.total_requirements_table(tech)
 
+    local tree = m.get_tech_tree_cargo_data(name)
+    if tree then
+        result = result .. m.cumulative_requirements_table(tree)
+    end
+
     return result
 end
 
@@ -0,0 +1,114 @@
+"""Runs the wiki Lua modules locally, with the stand-ins of mw_stub.lua, to test and benchmark them.
+
+Cargo queries are answered from the generated storage pages, mw.loadData from the generated data modules.
+
+Example Usage:
+
+    harness = WikiModuleHarness(Path("wiki_output"))
+    navboxes = harness.load_module("Navboxes")
+    stats = harness.invoke(navboxes, "create", {"title": "Bots", "type": "Bot"})
+"""
+
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import lupa
+from lupa import LuaRuntime  # pylint: disable=no-name-in-module
+
+from desynced_wiki_scripts.util.logger import get_logger
+from desynced_wiki_scripts.wiki.cargo.cargo_emulator import CargoEmulator, CargoQuery
+
+logger = get_logger()
+
+MODULES_DIR = Path(__file__).parent
+
+
+@dataclass
+class CallStats:
+    module: str
+    function: str
+    args: dict[str, str]
+    wall_time: float
+    # Number of calls to mw.ext.cargo.query, rows it returned, mw.loadData calls, etc...
+    counts: Counter[str] = field(default_factory=Counter)
+    output: str = ""
+    error: str = ""
+
+
+class WikiModuleHarness:
+    def __init__(self, output_dir: Path, cargo: CargoEmulator | None = None):
+        """
+        Args:
+            output_dir (Path): Output directory of generate_wiki.
+            cargo (CargoEmulator, optional): Answers cargo queries. Defaults to one built from `output_dir`.
+        """
+        self.output_dir = Path(output_dir)
+        self.cargo = cargo if cargo is not None else CargoEmulator.from_output_dir(self.output_dir)
+        self._counts: Counter[str] = Counter()
+
+        self.lua = LuaRuntime(unpack_returned_tuples=True)
+        host = self.lua.table_from(
+            {
+                "cargo_query": self._cargo_query,
+                "load_data": self._load_data,
+                "record": self._record,
+            }
+        )
+        stub = (MODULES_DIR / "mw_stub.lua").read_text(encoding="utf-8")
+        self.mw, self._hooks = self.lua.execute(stub, host)
+        self.lua.globals().mw = self.mw
+
+    def _record(self, kind: str, count: int):
+        self._counts[kind] += count
+
+    def _cargo_query(self, tables: str, fields: str, args: Any):
+        query = CargoQuery(
+            tables=tables,
+            fields=fields,
+            where=args["where"] or "",
+            join=args["join"] or "",
+            group_by=args["groupBy"] or "",
+            order_by=args["orderBy"] or "",
+            limit=args["limit"],
+        )
+        # Cargo returns every value as a string.
+        rows = [{k: str(v) for k, v in row.items() if v is not None} for row in self.cargo.query(query)]
+        return self.lua.table_from([self.lua.table_from(row) for row in rows])
+
+    def _load_data(self, title: str) -> str | None:
+        # "Module:GameData/item" -> <output_dir>/Module/GameData/item
+        namespace, _, name = title.partition(":")
+        path = self.output_dir / namespace / name
+        if not path.is_file():
+            return None
+        return path.read_text(encoding="utf-8")
+
+    def load_module(self, name: str) -> Any:
+        """Executes lua_wiki_modules/<name>.lua, returning its `p` table."""
+        source = (MODULES_DIR / f"{name}.lua").read_text(encoding="utf-8")
+        return self.lua.execute(source)
+
+    def invoke(self, module: Any, function: str, args: dict[str, str], module_name: str = "", new_page: bool = True) -> CallStats:
+        """Calls `module.function(frame)` like {{#invoke:}} does, timing it.
+
+        Args:
+            new_page (bool): If true, forgets mw.loadData results first, like a new page render.
+                Module level caches are kept, reload the module for a completely cold call.
+        """
+        if new_page:
+            self._hooks.new_page()
+        frame = self._hooks.new_frame(self.lua.table_from(args))
+        self._counts = Counter()
+
+        stats = CallStats(module=module_name, function=function, args=args, wall_time=0)
+        start = time.perf_counter()
+        try:
+            stats.output = str(module[function](frame))
+        except lupa.LuaError as e:
+            stats.error = str(e)
+        stats.wall_time = time.perf_counter() - start
+        stats.counts = self._counts
+        return stats
@@ -0,0 +1,239 @@
+-- Stand-ins for the Scribunto `mw` library, to run the wiki modules locally (see harness.py).
+-- Only what the modules in this directory use is implemented.
+-- The harness passes `host` with python callbacks: cargo_query(tables, fields, args), load_data(title), record(kind, count).
+
+local host = ...
+
+local mw = {
+  ext = { cargo = {} },
+  html = {},
+  text = {},
+  ustring = {
+    lower = string.lower,
+    upper = string.upper,
+    len = string.len,
+    sub = string.sub,
+    find = string.find,
+    match = string.match,
+    gmatch = string.gmatch,
+    gsub = string.gsub,
+    format = string.format,
+  },
+}
+
+-- mw.ext.cargo
+
+mw.ext.cargo.query = function(tables, fields, args)
+  local rows = host.cargo_query(tables, fields, args or {})
+  host.record("cargo_query", 1)
+  host.record("cargo_rows", #rows)
+  return rows
+end
+
+-- mw.loadData: loaded once per page render, read-only like on the wiki ("#" does not work either)
+
+local loaded = {}
+
+local function readOnly(tbl)
+  local proxy = {}
+  setmetatable(proxy, {
+    __index = function(_, k)
+      local v = tbl[k]
+      if type(v) == "table" then
+        return readOnly(v)
+      end
+      return v
+    end,
+    __newindex = function(_, k)
+      error(string.format("table from mw.loadData is read-only (assigning '%s')", tostring(k)), 2)
+    end,
+    __pairs = function()
+      return function(_, k)
+        local nk, nv = next(tbl, k)
+        if type(nv) == "table" then
+          nv = readOnly(nv)
+        end
+        return nk, nv
+      end, proxy, nil
+    end,
+    __len = function()
+      return 0
+    end,
+  })
+  return proxy
+end
+
+mw.loadData = function(title)
+  host.record("load_data", 1)
+  if loaded[title] == nil then
+    local source = host.load_data(title)
+    if source == nil then
+      error(string.format("module not found: %s", title), 2)
+    end
+    loaded[title] = readOnly(assert(load(source, "=" .. title))())
+  end
+  return loaded[title]
+end
+
+-- mw.text
+
+mw.text.trim = function(s)
+  return (s:gsub("^%s+", ""):gsub("%s+$", ""))
+end
+
+mw.text.gsplit = function(s, sep, plain)
+  local start = 1
+  local done = false
+  return function()
+    if done then
+      return nil
+    end
+    local first, last = string.find(s, sep, start, plain)
+    if not first then
+      done = true
+      return string.sub(s, start)
+    end
+    local part = string.sub(s, start, first - 1)
+    start = last + 1
+    return part
+  end
+end
+
+mw.text.split = function(s, sep, plain)
+  local parts = {}
+  for part in mw.text.gsplit(s, sep, plain) do
+    table.insert(parts, part)
+  end
+  return parts
+end
+
+-- mw.html
+
+local HtmlBuilder = {}
+HtmlBuilder.__index = HtmlBuilder
+
+HtmlBuilder.__tostring = function(node)
+  local parts = {}
+  if node.tagName then
+    local attrs = {}
+    if #node.classes > 0 then
+      table.insert(attrs, string.format(' class="%s"', table.concat(node.classes, " ")))
+    end
+    for _, attr in ipairs(node.attrs) do
+      table.insert(attrs, string.format(' %s="%s"', attr[1], tostring(attr[2])))
+    end
+    table.insert(parts, "<" .. node.tagName .. table.concat(attrs) .. ">")
+  end
+  for _, child in ipairs(node.children) do
+    table.insert(parts, tostring(child))
+  end
+  if node.tagName then
+    table.insert(parts, "</" .. node.tagName .. ">")
+  end
+  return table.concat(parts)
+end
+
+local function newNode(tagName, parent)
+  return setmetatable({ tagName = tagName, parent = parent, classes = {}, attrs = {}, children = {} }, HtmlBuilder)
+end
+
+function HtmlBuilder:tag(tagName)
+  local child = newNode(tagName, self)
+  table.insert(self.children, child)
+  return child
+end
+
+function HtmlBuilder:wikitext(...)
+  for _, text in ipairs({ ... }) do
+    table.insert(self.children, tostring(text))
+  end
+  return self
+end
+
+function HtmlBuilder:newline()
+  return self:wikitext("\n")
+end
+
+function HtmlBuilder:addClass(class)
+  if class then
+    table.insert(self.classes, class)
+  end
+  return self
+end
+
+function HtmlBuilder:attr(name, value)
+  table.insert(self.attrs, { name, value })
+  return self
+end
+
+function HtmlBuilder:css(name, value)
+  return self:attr("style", string.format("%s:%s", name, value))
+end
+
+function HtmlBuilder:done()
+  return self.parent or self
+end
+
+function HtmlBuilder:allDone()
+  local node = self
+  while node.parent do
+    node = node.parent
+  end
+  return node
+end
+
+mw.html.create = function(tagName)
+  host.record("html_create", 1)
+  return newNode(tagName, nil)
+end
+
+-- Frames: templates can't be expanded locally, expandTemplate returns the call it would make.
+
+local Frame = {}
+Frame.__index = Frame
+
+function Frame:expandTemplate(t)
+  host.record("expand_template", 1)
+  local keys = {}
+  for k in pairs(t.args or {}) do
+    table.insert(keys, tostring(k))
+  end
+  table.sort(keys)
+  local parts = { t.title }
+  for _, k in ipairs(keys) do
+    table.insert(parts, k .. "=" .. tostring(t.args[k]))
+  end
+  return "{{" .. table.concat(parts, "|") .. "}}"
+end
+
+function Frame:preprocess(text)
+  return text
+end
+
+function Frame:getParent()
+  return self
+end
+
+local currentFrame = setmetatable({ args = {} }, Frame)
+
+mw.getCurrentFrame = function()
+  return currentFrame
+end
+
+mw.log = function() end
+mw.logObject = function() end
+
+-- Harness hooks, not part of mw
+
+local hooks = {}
+
+hooks.new_frame = function(args)
+  currentFrame = setmetatable({ args = args }, Frame)
+  return currentFrame
+end
+
+hooks.new_page = function()
+  loaded = {}
+end
+
+return mw, hooks
@@ -24,6 +24,12 @@ class ListFieldOptions(FieldOptions):
     max_length: int = -1
     # If true, the items in this list will not be numbered.
     skip_suffix: bool = False
+    # Name of the child table storing this list when lists are normalized.
+    # If empty, derived from the element dataclass name (or owner + field name for scalars).
+    table_name: str = ""
+    # If not empty, the list is stored in a single `List (<delimiter>) of <type>` field instead of
+    # numbered fields. `max_length` is not needed then. Only lists of scalars can be delimited.
+    delimiter: str = ""
     # If the element in a list is a dataclass, should the name be prefixed.
     dataclass_options: DataClassFieldOptions = field(
         default_factory=DataClassFieldOptions
@@ -66,7 +72,7 @@ def get_field_options(
 def require_field_options(cls: Type) -> Type:
     """Requires that all lists in `cls` have options set.
 
-    This is necessary to have max_length available.
+    This is necessary to have max_length (or a delimiter) available.
 
     Args:
         cls (Type): Type to check.
@@ -87,6 +93,9 @@ def require_field_options(cls: Type) -> Type:
                     " has something else."
                 )
 
+            if f.metadata["desynced_field_options"].delimiter:
+                continue
+
             max_length: int = f.metadata["desynced_field_options"].max_length
             if max_length <= 0:
                 raise ValueError(
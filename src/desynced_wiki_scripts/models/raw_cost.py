@@ -0,0 +1,32 @@
+from typing import List
+
+from .decorators import desynced_object, length_check
+from .decorators_options import ListFieldOptions, annotate
+
+
+@desynced_object
+class RawResource:
+    # Name of the raw resource (no recipe, ex. mined ore).
+    resource: str
+    # Amount needed for one crafted unit. Can be fractional when recipes produce more than one unit.
+    amount: float
+
+
+@desynced_object
+class RawCostProducer:
+    # Name of producing component.
+    producer: str
+    # Seconds to craft one unit with this producer, ingredients being crafted with their fastest producer.
+    total_time: float
+
+
+@desynced_object
+@length_check
+class RawCost:
+    """Full crafting tree of an object, rolled up to raw resources."""
+
+    name: str
+    # Seconds to craft one unit, using the fastest producer at every step.
+    total_time: float
+    raw_resources: List[RawResource] = annotate(ListFieldOptions(max_length=10))
+    producers: List[RawCostProducer] = annotate(ListFieldOptions(max_length=6))
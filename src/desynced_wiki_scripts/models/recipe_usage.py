@@ -0,0 +1,33 @@
+from enum import Enum
+
+from .decorators import desynced_object
+from .decorators_options import FieldOptions, annotate
+from .recipe import RecipeType
+
+
+class UsageRelation(Enum):
+    # Subject is an ingredient of the target recipe.
+    INGREDIENT = "Ingredient"
+    # Subject is a component (or building) producing the target.
+    PRODUCER = "Producer"
+    # Subject is a component mining the target resource.
+    MINER = "Miner"
+
+
+@desynced_object
+class RecipeUsage:
+    """Reverse edge of a recipe, keyed on `subject` so item pages can look up "used in / produced by" directly."""
+
+    # Ingredient, producer or miner name.
+    subject: str
+    relation: UsageRelation
+    # Object whose recipe references the subject.
+    target: str
+    # Cargo table of the target.
+    target_table: str
+    recipe_type: RecipeType
+    # Number of subject consumed, for ingredients.
+    amount: int
+    # Time in seconds, for producers and miners.
+    time: float
+    name: str = annotate(FieldOptions(skip_field=True))
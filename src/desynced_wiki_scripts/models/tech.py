@@ -2,7 +2,7 @@ from typing import List
 
 from .decorators import desynced_object, length_check
 from .decorators_options import FieldOptions, ListFieldOptions, annotate
-from .recipe import Recipe
+from .recipe import Recipe, RecipeItem
 
 
 @desynced_object
@@ -20,6 +20,23 @@ class Technology:
     required_tech: List[str] = annotate(ListFieldOptions(max_length=3))
 
 
+@desynced_object
+@length_check
+class TechnologyTree:
+    """Position of a tech in the requirement graph and everything needed to research it."""
+
+    name: str
+    lua_id: str
+    # Longest chain of requirements leading to this tech, techs without requirements are at depth 0.
+    depth: int
+    # Recipe completions needed for this tech and all its prerequisites.
+    cumulative_progress_count: int
+    # Names of all techs to research first, direct requirements or not, in research order.
+    all_prerequisites: List[str] = annotate(ListFieldOptions(delimiter=","))
+    # Ingredients consumed by researching this tech and all its prerequisites.
+    cumulative_cost: List[RecipeItem] = annotate(ListFieldOptions(max_length=8))
+
+
 @desynced_object
 class TechnologyUnlock:
     tech_name: str
@@ -0,0 +1,29 @@
+from typing import List
+
+from .decorators import desynced_object, length_check
+from .decorators_options import FieldOptions, ListFieldOptions, annotate
+
+
+@desynced_object
+class UpstreamProducer:
+    ingredient: str
+    # Fastest producer (or miner, for raw resources) supplying the ingredient. Empty if it cannot be produced.
+    producer: str
+    # Number of such producers needed to keep one producer of the product busy.
+    producer_count: float
+
+
+@desynced_object
+@length_check
+class Throughput:
+    """Production rate of a product with one given producer, and what it takes to sustain it."""
+
+    product: str
+    producer: str
+    items_per_minute: float
+    # Power drawn by the producer alone.
+    power_usage_per_second: float
+    # Power drawn by the producer and all upstream producers needed to sustain it.
+    chain_power_per_second: float
+    upstream: List[UpstreamProducer] = annotate(ListFieldOptions(max_length=6))
+    name: str = annotate(FieldOptions(skip_field=True))
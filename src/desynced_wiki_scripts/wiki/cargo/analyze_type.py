@@ -68,7 +68,7 @@ def analyze_type(obj_type: Type) -> TypeInfo | DataClassTypeInfo:
     if not is_dataclass(obj_type):
         return TypeInfo(type=obj_type)
 
-    ret: DataClassTypeInfo = DataClassTypeInfo(type=None)
+    ret: DataClassTypeInfo = DataClassTypeInfo(type=obj_type)
     for field_info in fields(obj_type):
         field_type = field_info.type
 
@@ -76,7 +76,7 @@ def analyze_type(obj_type: Type) -> TypeInfo | DataClassTypeInfo:
             list_field = ListTypeInfo(analyze_type(field_type.__args__[0]))
             list_field.list_options = cast(ListFieldOptions, get_field_options(f=field_info))
             # TODO(maz): Set max_length metadata dynamically by looking at actual game objects.
-            assert list_field.list_options.max_length, f"{field_info.name} in {obj_type} is missing max_length"
+            assert list_field.list_options.max_length or list_field.list_options.delimiter, f"{field_info.name} in {obj_type} is missing max_length"
             ret.fields[field_info.name] = list_field
         elif is_dataclass(field_type):
             field_type = cast(Type[DesyncedObject], field_type)
@@ -0,0 +1,239 @@
+"""Answers Cargo queries locally, from the declarations and storage pages written by `generate_wiki`.
+
+Tables are created from the `Template/<table>` declarations with SQLite types matching the cargo ones,
+then every `Data/<table>/*` storage page is loaded in a single transaction.
+"""
+
+import os
+import re
+import sqlite3
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from desynced_wiki_scripts.util.logger import get_logger
+
+logger = get_logger()
+
+_TEMPLATE_CALL = re.compile(r"\{\{Data(\w+)\n(.*?)\n\}\}", re.DOTALL)
+_DECLARATION = re.compile(r"\{\{#cargo_declare:\n_table=(\w+)\n(.*?)\n\}\}", re.DOTALL)
+_ARG_LINE = re.compile(r"^\|(\w+) = (.*)$")
+_LIST_TYPE = re.compile(r"^List \((.+)\) of (\w+)")
+_HOLDS = re.compile(r"([\w.]+)\s+HOLDS\s+('[^']*')", re.IGNORECASE)
+_DOUBLE_QUOTED = re.compile(r'"([^"]*)"')
+_TABLE_INDEX_TEMPLATE = "TableIndex"
+
+# Cargo's $wgCargoDefaultQueryLimit, applied when a query has no limit.
+DEFAULT_QUERY_LIMIT = 100
+# Columns most lookups filter on.
+INDEXED_COLUMNS = ("name", "luaId")
+
+_SQLITE_TYPES = {
+    "Integer": "INTEGER",
+    "Float": "REAL",
+    "Boolean": "INTEGER",
+    "String": "TEXT",
+}
+
+
+@dataclass
+class CargoColumn:
+    name: str
+    # Cargo type, ex. "Integer", or "String" for enums. For lists, the type of the elements.
+    cargo_type: str
+    # Set for "List (<delimiter>) of <type>" fields, stored as the delimited string.
+    delimiter: str = ""
+
+    @staticmethod
+    def from_declaration(name: str, declaration: str) -> "CargoColumn":
+        if match := _LIST_TYPE.match(declaration):
+            return CargoColumn(name, match.group(2), delimiter=match.group(1))
+        # "String (allowed values=...)" -> "String"
+        return CargoColumn(name, declaration.split(" ")[0])
+
+    def sqlite_type(self) -> str:
+        sqlite_type = "TEXT" if self.delimiter else _SQLITE_TYPES.get(self.cargo_type, "TEXT")
+        # The wiki database compares strings case insensitively.
+        return f"{sqlite_type} COLLATE NOCASE" if sqlite_type == "TEXT" else sqlite_type
+
+    def convert(self, value: str) -> Any:
+        if self.delimiter:
+            return value
+        if self.cargo_type == "Integer":
+            return int(value)
+        if self.cargo_type == "Float":
+            return float(value)
+        if self.cargo_type == "Boolean":
+            return 1 if value in ("True", "1", "true", "yes") else 0
+        return value
+
+
+def _parse_args(args: str) -> dict[str, str]:
+    """Template arguments, without the empty ones (Cargo stores them as NULL)."""
+    result = {}
+    for line in args.splitlines():
+        if (match := _ARG_LINE.match(line)) and match.group(2) != "":
+            result[match.group(1)] = match.group(2)
+    return result
+
+
+def parse_declaration(content: str) -> tuple[str, list[CargoColumn]] | None:
+    """(table, columns) of a `Template/<table>` declaration page, None if it has no cargo_declare."""
+    match = _DECLARATION.search(content)
+    if not match:
+        return None
+    return match.group(1), [CargoColumn.from_declaration(name, declaration) for name, declaration in _parse_args(match.group(2)).items()]
+
+
+def parse_storage_page(content: str) -> list[tuple[str, dict[str, str]]]:
+    """(table, row) for every cargo_store template call of a storage page, child rows included."""
+    rows = []
+    for template, args in _TEMPLATE_CALL.findall(content):
+        if template == _TABLE_INDEX_TEMPLATE:
+            continue
+        # Reverse of `get_template_title`: "DataRecipeItem" stores in "recipeItem".
+        rows.append((template[0].lower() + template[1:], _parse_args(args)))
+    return rows
+
+
+@dataclass
+class CargoQuery:
+    """Arguments of `mw.ext.cargo.query`, named like the Lua ones."""
+
+    tables: str
+    fields: str
+    where: str = ""
+    # Cargo "join on": comma separated "alias1.field=alias2.field", turned into LEFT OUTER JOINs.
+    join: str = ""
+    group_by: str = ""
+    order_by: str = ""
+    limit: int | None = None
+
+    def to_sql(self) -> str:
+        tables = [self._split_alias(table) for table in self.tables.split(",")]
+        conditions = [condition.strip() for condition in self.join.split(",") if condition.strip()]
+
+        first_table, first_alias = tables[0]
+        sql = f"SELECT {self._aliased(self.fields)} FROM {self._table_sql(first_table, first_alias)}"
+        joined = {first_alias or first_table}
+        for table, alias in tables[1:]:
+            name = alias or table
+            joined.add(name)
+            # Conditions between this table and the ones already joined.
+            on = [c for c in conditions if name in self._tables_in(c) and self._tables_in(c) <= joined]
+            for c in on:
+                conditions.remove(c)
+            sql += f" LEFT OUTER JOIN {self._table_sql(table, alias)} ON {' AND '.join(on)}" if on else f" CROSS JOIN {self._table_sql(table, alias)}"
+        if conditions:
+            raise ValueError(f"Join conditions {conditions} don't match the tables {self.tables}")
+
+        if self.where:
+            sql += f" WHERE {translate_where(self.where)}"
+        if self.group_by:
+            sql += f" GROUP BY {self.group_by}"
+        if self.order_by:
+            sql += f" ORDER BY {self.order_by}"
+        sql += f" LIMIT {int(self.limit if self.limit is not None else DEFAULT_QUERY_LIMIT)}"
+        return sql
+
+    @staticmethod
+    def _split_alias(item: str) -> tuple[str, str]:
+        name, _, alias = item.strip().partition("=")
+        return name.strip(), alias.strip()
+
+    @staticmethod
+    def _table_sql(table: str, alias: str) -> str:
+        return f'"{table}" AS {alias}' if alias else f'"{table}"'
+
+    @staticmethod
+    def _tables_in(condition: str) -> set[str]:
+        return set(re.findall(r"(\w+)\.\w+", condition))
+
+    @classmethod
+    def _aliased(cls, items: str) -> str:
+        """Cargo "name=alias" to SQL "name AS alias"."""
+        result = []
+        for item in items.split(","):
+            name, alias = cls._split_alias(item)
+            result.append(f"{name} AS {alias}" if alias else name)
+        return ", ".join(result)
+
+
+def translate_where(where: str) -> str:
+    """Cargo (MySQL) where clause to SQLite: double quoted strings are literals, `HOLDS` searches list fields."""
+    where = _DOUBLE_QUOTED.sub(lambda m: "'" + m.group(1).replace("'", "''") + "'", where)
+    # Lists are stored delimited, all list fields here use "," (see ListFieldOptions.delimiter).
+    return _HOLDS.sub(lambda m: f"(',' || {m.group(1)} || ',') LIKE '%,' || {m.group(2)} || ',%'", where)
+
+
+class CargoEmulator:
+    """In-memory SQLite copy of the cargo tables."""
+
+    def __init__(self):
+        self.connection = sqlite3.connect(":memory:")
+        self.connection.row_factory = sqlite3.Row
+        self.columns: dict[str, dict[str, CargoColumn]] = {}
+
+    def close(self):
+        self.connection.close()
+
+    @staticmethod
+    def from_output_dir(output_dir: Path) -> "CargoEmulator":
+        emulator = CargoEmulator()
+        output_dir = Path(output_dir)
+
+        for root, _, files in os.walk(output_dir / "Template"):
+            for file in files:
+                if declaration := parse_declaration((Path(root) / file).read_text(encoding="utf-8")):
+                    emulator.create_table(*declaration)
+
+        rows_by_table: dict[str, list[dict[str, str]]] = {}
+        for root, _, files in os.walk(output_dir / "Data"):
+            for file in files:
+                for table, row in parse_storage_page((Path(root) / file).read_text(encoding="utf-8")):
+                    rows_by_table.setdefault(table, []).append(row)
+
+        with emulator.connection:
+            for table, rows in rows_by_table.items():
+                emulator.insert_rows(table, rows)
+        return emulator
+
+    def create_table(self, table: str, columns: list[CargoColumn]):
+        self.columns[table] = {column.name: column for column in columns}
+        definitions = ", ".join(f'"{column.name}" {column.sqlite_type()}' for column in columns)
+        self.connection.execute(f'CREATE TABLE "{table}" (_ID INTEGER PRIMARY KEY, {definitions})')
+        for column in INDEXED_COLUMNS:
+            if column in self.columns[table]:
+                self.connection.execute(f'CREATE INDEX "{table}_{column}" ON "{table}" ("{column}")')
+
+    def insert_rows(self, table: str, rows: list[dict[str, str]]):
+        """Inserts storage rows, converted to the declared types. Does not commit."""
+        columns = self.columns.get(table)
+        if columns is None:
+            logger.warning(f"Cargo emulator: no declaration for table {table}, skipping its {len(rows)} rows.")
+            return
+
+        names = list(columns)
+        quoted = ", ".join(f'"{name}"' for name in names)
+        placeholders = ", ".join("?" for _ in names)
+        for row in rows:
+            if unknown := row.keys() - columns.keys():
+                logger.warning(f"Cargo emulator: {table} has no fields {sorted(unknown)}, ignoring them.")
+        self.connection.executemany(
+            f'INSERT INTO "{table}" ({quoted}) VALUES ({placeholders})',
+            ([columns[name].convert(row[name]) if name in row else None for name in names] for row in rows),
+        )
+
+    def tables(self) -> list[str]:
+        return sorted(self.columns)
+
+    def query(self, query: CargoQuery) -> list[dict[str, Any]]:
+        """Rows as dicts keyed by field (or alias), like `mw.ext.cargo.query` returns them."""
+        if any(CargoQuery._split_alias(table)[0] not in self.columns for table in query.tables.split(",")):
+            # Cargo errors on unknown tables, but tables can legitimately be missing locally (ex. filled in on the wiki).
+            return []
+        return [dict(row) for row in self.connection.execute(query.to_sql())]
+
+    def explain(self, query: CargoQuery) -> list[str]:
+        """SQLite query plan, shows which indexes a query shape uses."""
+        return [row["detail"] for row in self.connection.execute(f"EXPLAIN QUERY PLAN {query.to_sql()}")]
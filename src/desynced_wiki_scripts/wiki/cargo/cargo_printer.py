@@ -1,9 +1,31 @@
 import re
 from collections import Counter
+from dataclasses import dataclass, replace
 from enum import Enum
-from typing import Any, List, Type
+from typing import Any, Iterator, List, Type
 
-from desynced_wiki_scripts.wiki.cargo.analyze_type import DataClassTypeInfo, ListTypeInfo, TypeInfo
+from desynced_wiki_scripts.models.decorators_options import DataClassFieldOptions
+from desynced_wiki_scripts.wiki.cargo.analyze_type import DataClassTypeInfo, ListTypeInfo, TypeInfo, analyze_type
+
+
+@dataclass
+class ChildRowOwner:
+    """Columns prepended to every row of a child table, linking it back to its owner."""
+
+    owner: str
+    owner_table: str
+    # 1-based position of the element in the owner list.
+    list_index: int
+
+
+@dataclass
+class ChildTable:
+    """A list field stored in its own cargo table, one row per list element."""
+
+    name: str
+    # Column holding the element, for lists of scalars.
+    column: str
+    list_type: ListTypeInfo
 
 
 class CargoPrinter:
@@ -12,8 +34,15 @@ class CargoPrinter:
         DECLARATIONS = 1
         TEMPLATE = 2
 
-    def __init__(self, mode: Mode = Mode.DATA):
+    def __init__(self, mode: Mode = Mode.DATA, normalize_lists: bool = False):
+        """
+        Args:
+            mode (Mode): What to print.
+            normalize_lists (bool): If True, list fields are left out of the owner table
+                and printed as child tables instead (see `child_tables`).
+        """
         self.mode = mode
+        self.normalize_lists = normalize_lists
 
     def _print_list(
         self,
@@ -44,6 +73,27 @@ class CargoPrinter:
             )
         return result
 
+    def _print_delimited_list(
+        self,
+        value: list,
+        field_type: ListTypeInfo,
+        field_name: str,
+        suffix: str = "",
+    ) -> List[str]:
+        item_info = field_type.type
+        assert item_info.kind == TypeInfo.Kind.SCALAR, f"{field_type} only lists of scalars can be delimited"  # type: ignore
+        delimiter = field_type.list_options.delimiter
+
+        if self.mode == self.Mode.DECLARATIONS:
+            return [f"|{field_name}{suffix} = List ({delimiter}) of {self._transform_type(item_info.type)}"]  # type: ignore
+
+        if self.mode == self.Mode.TEMPLATE:
+            return [f"|{field_name}{suffix} = " + "{{{" + f"{self.to_camel_case(field_name + suffix)}" + "|}}}"]
+
+        for element in value or []:
+            assert delimiter not in str(element), f"{field_type} element '{element}' contains the delimiter"
+        return [f"|{field_name}{suffix} = {delimiter.join(str(element) for element in value or [])}"]
+
     def _print_field(
         self,
         field_name: str,
@@ -58,6 +108,10 @@ class CargoPrinter:
             field_name = field_type.options.name_override
 
         if field_type.kind == TypeInfo.Kind.LIST:
+            if field_type.list_options.delimiter:  # type: ignore
+                return self._print_delimited_list(value=obj, field_type=field_type, field_name=field_name, suffix=suffix)  # type: ignore
+            if self.normalize_lists:
+                return []
             return self._print_list(
                 value=obj,
                 field_type=field_type,  # type: ignore
@@ -135,6 +189,65 @@ class CargoPrinter:
         assert not duplicates, f"{result} for {type_info} found {duplicates}"
         return result
 
+    def child_tables(self, type_info: DataClassTypeInfo) -> List[ChildTable]:
+        """Returns the child tables needed to store all list fields of `type_info`, including nested dataclasses."""
+        return [child for child, _ in self._walk_lists(None, type_info)]
+
+    def print_child_declaration(self, child: ChildTable) -> List[str]:
+        """Declaration or template lines of a child table, depending on the mode."""
+        return self._print_child_row(child, element=None, owner=None)
+
+    def print_child_rows(self, dc_obj: Any, type_info: DataClassTypeInfo, owner: str, owner_table: str) -> List[tuple[ChildTable, List[str]]]:
+        """Returns one (child table, lines) entry per element of every list field in `dc_obj`."""
+        rows = []
+        for child, value in self._walk_lists(dc_obj, type_info):
+            for idx, element in enumerate(value or []):
+                rows.append((child, self._print_child_row(child, element, ChildRowOwner(owner, owner_table, idx + 1))))
+        return rows
+
+    def _walk_lists(self, dc_obj: Any, type_info: DataClassTypeInfo) -> Iterator[tuple[ChildTable, Any]]:
+        for field_name, field_type in type_info.fields.items():
+            if field_type.options.skip_field:
+                continue
+
+            value = getattr(dc_obj, field_name, None)
+            if field_type.kind == TypeInfo.Kind.LIST:
+                # Delimited lists already fit in a single field of the owner table.
+                if field_type.list_options.delimiter:  # type: ignore
+                    continue
+                yield self._child_table(type_info, field_name, field_type), value  # type: ignore
+            elif field_type.kind == TypeInfo.Kind.DATACLASS:
+                yield from self._walk_lists(value, field_type)  # type: ignore
+
+    def _child_table(self, container: DataClassTypeInfo, field_name: str, list_type: ListTypeInfo) -> ChildTable:
+        column = self.to_camel_case(list_type.list_options.name_override or field_name)
+        item_info = list_type.type
+        if list_type.list_options.table_name:
+            name = list_type.list_options.table_name
+        elif item_info.kind == TypeInfo.Kind.DATACLASS and item_info.type:  # type: ignore
+            name = self._lower_first(item_info.type.__name__)  # type: ignore
+        else:
+            container_name = container.type.__name__ if container.type else ""  # type: ignore
+            name = self._lower_first(container_name) + column[0].upper() + column[1:]
+        return ChildTable(name=name, column=column, list_type=list_type)
+
+    def _print_child_row(self, child: ChildTable, element: Any, owner: ChildRowOwner | None) -> List[str]:
+        # Child rows are always flat: the table itself gives the context prefixes were needed for.
+        printer = CargoPrinter(self.mode)
+        result = printer.print_dataclass(owner, analyze_type(ChildRowOwner))  # type: ignore
+        item_info = child.list_type.type
+        if item_info.kind == TypeInfo.Kind.DATACLASS:  # type: ignore
+            item_info = replace(item_info, dataclass_options=DataClassFieldOptions())  # type: ignore
+            result.extend(printer.print_dataclass(element, item_info))  # type: ignore
+        else:
+            lines = printer._print_field(field_name=child.column, obj=element, field_type=item_info)  # type: ignore
+            result.extend(self.transform_line(line) for line in lines)
+        return result
+
+    @staticmethod
+    def _lower_first(name: str) -> str:
+        return name[0].lower() + name[1:] if name else name
+
     @staticmethod
     def to_camel_case(name: str) -> str:
         parts = name.split("_")
@@ -8,31 +8,46 @@ class DataCategory(StrEnum):
     entity = auto()  # pylint: disable=invalid-name
     item = auto()  # pylint: disable=invalid-name
     instruction = auto()  # pylint: disable=invalid-name
+    rawCost = auto()  # pylint: disable=invalid-name
+    recipeUsage = auto()  # pylint: disable=invalid-name
     tech = auto()  # pylint: disable=invalid-name
     techCategory = auto()  # pylint: disable=invalid-name
+    techTree = auto()  # pylint: disable=invalid-name
     techUnlock = auto()  # pylint: disable=invalid-name
+    throughput = auto()  # pylint: disable=invalid-name
 
 
 @dataclass
 class DataCategoryInfo:
     has_page: bool  # object in this category should have their own page
     subpage_of: str | None = None
+    # also exported as a `Module:GameData/<category>` Lua data module, for wiki modules to read with mw.loadData
+    has_lua_module: bool = False
 
 
 DATA_CATEGORY_INFO: dict[DataCategory, DataCategoryInfo] = {
-    DataCategory.entity: DataCategoryInfo(has_page=True),
-    DataCategory.component: DataCategoryInfo(has_page=True),
-    DataCategory.item: DataCategoryInfo(has_page=True),
+    DataCategory.entity: DataCategoryInfo(has_page=True, has_lua_module=True),
+    DataCategory.component: DataCategoryInfo(has_page=True, has_lua_module=True),
+    DataCategory.item: DataCategoryInfo(has_page=True, has_lua_module=True),
     DataCategory.instruction: DataCategoryInfo(
         has_page=True, subpage_of="Instructions"
     ),
-    DataCategory.tech: DataCategoryInfo(has_page=True, subpage_of="Technology"),
+    DataCategory.tech: DataCategoryInfo(has_page=True, subpage_of="Technology", has_lua_module=True),
     DataCategory.techUnlock: DataCategoryInfo(has_page=False),
-    DataCategory.techCategory: DataCategoryInfo(has_page=False),
-    DataCategory.categoryFilter: DataCategoryInfo(has_page=False),
+    DataCategory.techCategory: DataCategoryInfo(has_page=False, has_lua_module=True),
+    DataCategory.techTree: DataCategoryInfo(has_page=False, has_lua_module=True),
+    DataCategory.categoryFilter: DataCategoryInfo(has_page=False, has_lua_module=True),
+    DataCategory.recipeUsage: DataCategoryInfo(has_page=False),
+    DataCategory.rawCost: DataCategoryInfo(has_page=False),
+    DataCategory.throughput: DataCategoryInfo(has_page=False),
 }
 
 
+def category_has_lua_module(cat: DataCategory) -> bool:
+    info = DATA_CATEGORY_INFO.get(cat)
+    return info.has_lua_module if info is not None else False
+
+
 def category_has_human_pages(cat: DataCategory) -> bool:
     info = DATA_CATEGORY_INFO.get(cat)
     return info.has_page if info is not None else False
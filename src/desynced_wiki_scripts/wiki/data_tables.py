@@ -0,0 +1,56 @@
+"""The cargo tables generated from the game data: the model type of each table, and its objects to upload."""
+
+from dataclasses import dataclass
+from typing import Collection, Type
+
+from desynced_wiki_scripts.analysis.raw_cost import RawCostCalculator
+from desynced_wiki_scripts.analysis.recipe_graph import RecipeGraph
+from desynced_wiki_scripts.analysis.throughput import ThroughputCalculator
+from desynced_wiki_scripts.lua.game_data import GameData
+from desynced_wiki_scripts.models.category_filters import CategoryFilter
+from desynced_wiki_scripts.models.component import Component
+from desynced_wiki_scripts.models.decorators import DesyncedObject
+from desynced_wiki_scripts.models.entity import Entity
+from desynced_wiki_scripts.models.instructions import Instruction
+from desynced_wiki_scripts.models.item import Item
+from desynced_wiki_scripts.models.raw_cost import RawCost
+from desynced_wiki_scripts.models.recipe_usage import RecipeUsage
+from desynced_wiki_scripts.models.tech import (
+    Technology,
+    TechnologyCategory,
+    TechnologyTree,
+    TechnologyUnlock,
+)
+from desynced_wiki_scripts.models.throughput import Throughput
+from desynced_wiki_scripts.wiki.data_categories import DataCategory
+
+
+@dataclass
+class TableData:
+    type: Type[DesyncedObject]  # object type from models
+    objects: Collection
+    should_filter: bool = False  # if set, consider objects for should_skip_upload filtering when uploading
+
+
+def get_data_tables(game: GameData) -> dict[DataCategory, TableData]:
+    """Mapping of cargo table name to the type and list of actual game data objects, filtered for upload."""
+    tables_by_name: dict[DataCategory, TableData] = {
+        DataCategory.entity: TableData(Entity, game.entities, True),
+        DataCategory.component: TableData(Component, game.components, True),
+        DataCategory.item: TableData(Item, game.items, True),
+        DataCategory.instruction: TableData(Instruction, game.instructions),
+        DataCategory.tech: TableData(Technology, game.technologies),
+        DataCategory.techTree: TableData(TechnologyTree, game.tech_tree.rows()),
+        DataCategory.techUnlock: TableData(TechnologyUnlock, game.tech_unlocks),
+        DataCategory.techCategory: TableData(TechnologyCategory, game.technology_categories),
+        DataCategory.categoryFilter: TableData(CategoryFilter, game.category_filters),
+        DataCategory.recipeUsage: TableData(RecipeUsage, game.recipe_usages, True),
+        DataCategory.rawCost: TableData(RawCost, RawCostCalculator(RecipeGraph.from_game_data(game)).compute_all(), True),
+        DataCategory.throughput: TableData(Throughput, ThroughputCalculator.from_game_data(game).compute_all(), True),
+    }
+
+    # Apply filtering
+    for table_data in tables_by_name.values():
+        if table_data.should_filter:
+            table_data.objects = [obj for obj in table_data.objects if not game.should_skip_upload(obj)]
+    return tables_by_name
@@ -1,15 +1,19 @@
+from __future__ import annotations
+
+from datetime import datetime
 import pprint
-from typing import Dict
+from typing import TYPE_CHECKING, Dict
 from typing import cast
-import pywikibot
-import pywikibot.login
-from pywikibot.site import APISite
-from pywikibot.throttle import Throttle
-from pywikibot.data import api
 
 from desynced_wiki_scripts.util.config import GetCredentials
 from desynced_wiki_scripts.util.logger import get_logger
 
+if TYPE_CHECKING:
+    import pywikibot
+    from pywikibot.site import APISite
+    from pywikibot.throttle import Throttle
+    from pywikibot.data import api
+
 DESYNCED_WIKI_URL = "https://wiki.desyncedgame.com/api.php"
 
 logger = get_logger()
@@ -18,6 +22,13 @@ logger = get_logger()
 class DesyncedWiki:
     """pywikibot wrapper, handles auth and configuration
 
+    The login is made before the first request: creating the wrapper costs nothing. Pages are built on the site before
+    logging in, so dry runs reading every page from the mirror never log in (pywikibot still checks its saved session
+    and reads the site info, cached in its apicache directory, when creating the site).
+    pywikibot itself is only imported then: it is slow to import, and reads its configuration when imported.
+    The login session is saved by pywikibot in its cookie file (pywikibot-<user>.lwp, file mode 600), and reused by the
+    next runs while the wiki accepts it: logging in again is only needed when it expired.
+
     Usage:
         wiki = DesyncedWiki()
         page: Page = wiki.page(title)
@@ -26,72 +37,210 @@ class DesyncedWiki:
 
     CONFIG_SECTION_NAME = "wiki"
 
-    _site: APISite
+    _site: APISite | None
+    _logged_in: bool
 
     def __init__(
         self,
+        url: str = DESYNCED_WIKI_URL,
+        read_only: bool = False,
     ):
-        username, password = GetCredentials(self.CONFIG_SECTION_NAME)
-
-        self._site = cast(APISite, pywikibot.Site(url=DESYNCED_WIKI_URL, user=username))
-        login_manager = pywikibot.login.ClientLoginManager(site=self._site, user=username, password=password)
-        login_manager.login_to_site()
-        self._site.login(user=username)
-        throttle: Throttle = self._site.throttle
+        """
+        Args:
+            url (str, optional): API endpoint. Another wiki, ex. a local fake_wiki_server, for offline runs.
+            read_only (bool, optional): If true, pages are built without logging in, ex. for dry runs. Else the pages
+                can be saved: they log in when built.
+        """
+        self.url = url
+        self.read_only = read_only
+        self._site = None
+        self._logged_in = False
+
+    @property
+    def site(self) -> APISite:
+        """Logs in on first use, for the requests."""
+        site = self._get_site()
+        if not self._logged_in:
+            self._connect(site)
+            self._logged_in = True
+        return site
+
+    def _get_site(self) -> APISite:
+        """The site, not logged in yet."""
+        if not self._site:
+            self._site = self._create_site()
+        return self._site
+
+    def _create_site(self) -> APISite:
+        import pywikibot
+        from pywikibot.family import AutoFamily
+
+        username, _ = GetCredentials(self.CONFIG_SECTION_NAME)
+
+        # pywikibot tries the saved session when creating the site, with one userinfo request.
+        if self.url == DESYNCED_WIKI_URL:
+            site = cast("APISite", pywikibot.Site(url=self.url, user=username))
+        else:
+            # Not in the pywikibot families, its configuration is read from the wiki.
+            family = AutoFamily("desyncedlocal", self.url)
+            site = cast("APISite", pywikibot.Site(family.name, family, user=username))
+
+        throttle: Throttle = site.throttle
         throttle.writedelay = 1
         throttle.mindelay = 0
+        return site
+
+    def _connect(self, site: APISite):
+        import pywikibot.login
 
-        logged_user = self._site.user()
+        username, password = GetCredentials(self.CONFIG_SECTION_NAME)
+        if site.logged_in():
+            logger.debug("Reusing the saved wiki session")
+        else:
+            login_manager = pywikibot.login.ClientLoginManager(site=site, user=username, password=password)
+            login_manager.login_to_site()
+            # Saved for the next runs.
+            login_manager.storecookiedata()
+            site.login(user=username)
+
+        logged_user = site.user()
         if not logged_user:
             raise ValueError("Failed to login, logic error?")
 
         logger.info(f"Logged in to wiki as user {logged_user}")
 
     def recreate_cargo_table(self, template_name: str) -> bool:
+        from pywikibot.exceptions import APIError
+
         # https://all.docs.genesys.com/api.php?action=help&modules=cargorecreatetables
         try:
             form: Dict = {
                 "action": "cargorecreatetables",
                 "template": template_name,
                 "createReplacement": "true",
-                "token": self._site.tokens["csrf"],
+                "token": self.site.tokens["csrf"],
             }
-            request: api.Request = self._site.simple_request(**form, use_get=False)
+            request: api.Request = self.site.simple_request(**form, use_get=False)
             results = request.submit()
             print(
                 "Cargo table recreation triggered, with results:",
                 pprint.pformat(results),
             )
             return True
-        except pywikibot.exceptions.APIError as e:
+        except APIError as e:
             print("API error:", e)
             logger.error(f"recreate_cargo_table failed with: {e.info}")
 
         return False
 
     def recreate_cargo_data(self, template_name: str, table_name: str) -> bool:
+        from pywikibot.exceptions import APIError
+
         form: Dict = {
             "action": "cargorecreatedata",
             "template": template_name,
             "table": table_name,
-            "token": self._site.tokens["csrf"],
+            "token": self.site.tokens["csrf"],
         }
         try:
-            request: api.Request = self._site.simple_request(parameters=form, use_get=False)
+            request: api.Request = self.site.simple_request(parameters=form, use_get=False)
             results = request.submit()
             print(
                 "Cargo table data recreation triggered, with results:",
                 pprint.pformat(results),
             )
             return True
-        except pywikibot.exceptions.APIError as e:
+        except APIError as e:
             print("API error:", e)
             logger.error(f"recreate_cargo_data failed with: {e.info}")
 
         return False
 
+    def parse_page(self, title: str) -> dict:
+        """Renders `title` with action=parse, returning the raw response with its limit report data."""
+        request: api.Request = self.site.simple_request(
+            action="parse",
+            page=title,
+            prop="limitreportdata",
+            disablelimitreport=False,
+            formatversion=2,
+        )
+        return request.submit()
+
+    def _query_all(self, **parameters) -> list[dict]:
+        """Runs a query following its continuations, returning the "query" part of every response."""
+        results = []
+        continue_args: dict = {}
+        while True:
+            request: api.Request = self.site.simple_request(action="query", **parameters, **continue_args)
+            response = request.submit()
+            results.append(response.get("query", {}))
+            if "continue" not in response:
+                return results
+            continue_args = response["continue"]
+
+    def query_page_revisions(self, titles: list[str]) -> list[dict]:
+        """Latest revision of every page, with content, in one request (max 50 titles). Missing pages have a "missing" key."""
+        pages: dict[str, dict] = {}
+        for result in self._query_all(prop="revisions", rvprop="ids|sha1|timestamp|content", rvslots="main", titles="|".join(titles)):
+            # Big pages can be continued in another response, without their revisions.
+            for pagedict in result.get("pages", {}).values():
+                if "revisions" in pagedict or pagedict["title"] not in pages:
+                    pages[pagedict["title"]] = pagedict
+        return list(pages.values())
+
+    def recent_changes(self, since: datetime) -> list[dict]:
+        """Edits, page creations and log events (deletes, moves, uploads) since `since`, oldest first."""
+        changes = []
+        for result in self._query_all(
+            list="recentchanges",
+            rcstart=since.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            rcdir="newer",
+            rcprop="title|timestamp|ids|loginfo",
+            rctype="edit|new|log",
+            rclimit="max",
+        ):
+            changes += result.get("recentchanges", [])
+        return changes
+
+    def purge(self, titles: list[str]) -> list[dict]:
+        """Purges the parser cache of the pages in one request (max 50 titles), and updates their links tables.
+
+        Pages showing cargo data are not purged when the data changes: cargo queries are not tracked as dependencies.
+        """
+        request: api.Request = self.site.simple_request(action="purge", titles="|".join(titles), forcelinkupdate=True)
+        return request.submit().get("purge", [])
+
+    def category_members(self, category_title: str, namespace: int) -> list[str]:
+        """Titles of the pages of the namespace in the category, ex. "Category:Data:Storage:item", in as few requests as allowed."""
+        titles = []
+        for result in self._query_all(list="categorymembers", cmtitle=category_title, cmnamespace=namespace, cmprop="title", cmlimit="max"):
+            titles += [member["title"] for member in result.get("categorymembers", [])]
+        return titles
+
+    def all_pages(self, namespace: int, prefix: str = "") -> list[str]:
+        """Titles of the pages of the namespace, starting with `prefix` (without the namespace), in as few requests as allowed."""
+        titles = []
+        for result in self._query_all(list="allpages", apnamespace=namespace, apprefix=prefix, aplimit="max"):
+            titles += [page["title"] for page in result.get("allpages", [])]
+        return titles
+
     def page(self, title):
-        return pywikibot.Page(self._site, title)
+        import pywikibot
+
+        return pywikibot.Page(self._page_site, title)
+
+    @property
+    def _page_site(self) -> APISite:
+        """Site of the built pages: pages saved by the tools must be logged in first."""
+        return self._get_site() if self.read_only else self.site
+
+    def preload(self, pages: list[pywikibot.Page]):
+        """Fetches the content of the pages in one request (up to 50 pages). Pages are updated in place."""
+        for _ in self.site.preloadpages(pages, groupsize=len(pages)):
+            pass
 
     def filepage(self, title):
-        return pywikibot.FilePage(self._site, title)
+        import pywikibot
+
+        return pywikibot.FilePage(self._page_site, title)
@@ -0,0 +1,803 @@
+"""Local stand-in for the MediaWiki action API, to run the tools end to end without the real wiki.
+
+Supports what the tools and pywikibot use: login, siteinfo/userinfo/tokens, page info and revisions, recent changes,
+edit, delete, upload, the cargo recreate actions, and maxlag errors. Pages are kept in memory, optionally seeded from
+a page mirror file (see page_mirror.py). Every request can be delayed to simulate the network.
+
+Example Usage:
+
+    server = FakeWikiServer(FakeWikiConfig(latency=0.05))
+    server.start()
+    wiki = DesyncedWiki(url=server.api_url)
+    ...
+    print(server.state.counts)
+    server.stop()
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable
+from urllib.parse import parse_qs, urlparse
+
+from desynced_wiki_scripts.util.logger import get_logger
+
+logger = get_logger()
+
+API_PATH = "/w/api.php"
+FAKE_TOKEN = "fake+\\"
+MEDIAWIKI_VERSION = "MediaWiki 1.43.0"
+
+# Namespaces of the wiki, with the custom "Data" one: "Data:item:X" is stored as "Data:Item:X".
+NAMESPACES = {
+    -2: "Media",
+    -1: "Special",
+    0: "",
+    1: "Talk",
+    2: "User",
+    3: "User talk",
+    4: "Desynced Wiki",
+    5: "Desynced Wiki talk",
+    6: "File",
+    7: "File talk",
+    8: "MediaWiki",
+    9: "MediaWiki talk",
+    10: "Template",
+    11: "Template talk",
+    12: "Help",
+    13: "Help talk",
+    14: "Category",
+    15: "Category talk",
+    828: "Module",
+    829: "Module talk",
+    3000: "Data",
+    3001: "Data talk",
+}
+
+
+# Action modules, and if they must be POSTed.
+ACTION_MODULES = {
+    "query": False,
+    "parse": False,
+    "paraminfo": False,
+    "login": True,
+    "clientlogin": True,
+    "logout": True,
+    "edit": True,
+    "delete": True,
+    "move": True,
+    "upload": True,
+    "purge": True,
+    "cargorecreatetables": True,
+    "cargorecreatedata": True,
+}
+# Query submodules: (group, parameter prefix, usable as generator).
+QUERY_MODULES = {
+    "info": ("prop", "in", False),
+    "revisions": ("prop", "rv", False),
+    "imageinfo": ("prop", "ii", False),
+    "templates": ("prop", "tl", True),
+    "categories": ("prop", "cl", True),
+    "links": ("prop", "pl", True),
+    "langlinks": ("prop", "ll", False),
+    "pageprops": ("prop", "pp", False),
+    "categoryinfo": ("prop", "ci", False),
+    "recentchanges": ("list", "rc", True),
+    "allpages": ("list", "ap", True),
+    "allimages": ("list", "ai", True),
+    "categorymembers": ("list", "cm", True),
+    "embeddedin": ("list", "ei", True),
+    "logevents": ("list", "le", False),
+    "search": ("list", "sr", True),
+    "usercontribs": ("list", "uc", False),
+    "siteinfo": ("meta", "si", False),
+    "userinfo": ("meta", "ui", False),
+    "tokens": ("meta", "", False),
+    "filerepoinfo": ("meta", "fri", False),
+}
+TOKEN_TYPES = ["createaccount", "csrf", "login", "patrol", "rollback", "userrights", "watch"]
+
+
+def _now() -> str:
+    return datetime.now(UTC).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+@dataclass
+class FakeRevision:
+    revid: int
+    content: str
+    timestamp: str
+    user: str
+    comment: str = ""
+
+    @property
+    def sha1(self) -> str:
+        return hashlib.sha1(self.content.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class FakePage:
+    pageid: int
+    title: str
+    namespace: int
+    revisions: list[FakeRevision] = field(default_factory=list)
+
+    @property
+    def latest(self) -> FakeRevision:
+        return self.revisions[-1]
+
+
+@dataclass
+class FakeWikiConfig:
+    # If set, the only accepted credentials. Any login succeeds otherwise.
+    username: str | None = None
+    password: str | None = None
+    # Seconds added to every request.
+    latency: float = 0
+    # If set, every Nth request fails with a maxlag error.
+    maxlag_every: int = 0
+    # Lag reported by maxlag errors, in seconds.
+    maxlag_seconds: int = 1
+
+
+class FakeWikiState:
+    """Pages, files and counters of the fake wiki. Thread safe: the server handles requests in threads."""
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.pages: dict[str, FakePage] = {}
+        self.files: dict[str, bytes] = {}
+        self.recent_changes: list[dict] = []
+        self.cargo_calls: list[dict] = []
+        # Titles of the purged pages, in order.
+        self.purged: list[str] = []
+        # Requests by action, "query", "edit", ...
+        self.counts: Counter[str] = Counter()
+        self._next_pageid = 1
+        self._next_revid = 1
+        self._next_rcid = 1
+
+    @staticmethod
+    def normalize(title: str) -> str:
+        """Same normalization as MediaWiki for our titles: underscores are spaces, first letters are upper case."""
+        title = title.replace("_", " ").strip().removeprefix(":")
+        namespace, sep, rest = title.partition(":")
+        if sep and FakeWikiState.namespace_id(namespace) is not None:
+            namespace = NAMESPACES[FakeWikiState.namespace_id(namespace)]
+            return f"{namespace}:{rest[:1].upper()}{rest[1:]}"
+        return title[:1].upper() + title[1:]
+
+    @staticmethod
+    def namespace_id(title_or_prefix: str) -> int | None:
+        prefix = title_or_prefix.split(":")[0].replace("_", " ").strip().lower()
+        for ns_id, name in NAMESPACES.items():
+            if name and name.lower() == prefix:
+                return ns_id
+        return None
+
+    def title_namespace(self, title: str) -> int:
+        if ":" in title:
+            ns = self.namespace_id(title)
+            if ns is not None:
+                return ns
+        return 0
+
+    def save(self, title: str, content: str, user: str, comment: str = "") -> tuple[FakePage, FakeRevision, bool]:
+        """Returns (page, new revision, created)."""
+        with self.lock:
+            title = self.normalize(title)
+            page = self.pages.get(title)
+            created = page is None
+            if page is None:
+                page = FakePage(self._next_pageid, title, self.title_namespace(title))
+                self._next_pageid += 1
+                self.pages[title] = page
+            revision = FakeRevision(self._next_revid, content, _now(), user, comment)
+            self._next_revid += 1
+            page.revisions.append(revision)
+            self._record_change("new" if created else "edit", page.title, revision)
+            return page, revision, created
+
+    def delete(self, title: str, user: str) -> FakePage | None:
+        with self.lock:
+            page = self.pages.pop(self.normalize(title), None)
+            if page:
+                self._record_change("log", page.title, None, logtype="delete")
+            return page
+
+    def move(self, old_title: str, new_title: str, user: str, noredirect: bool) -> FakePage | None:
+        """Renames the page, history included. Leaves a redirect at the old title unless `noredirect`."""
+        with self.lock:
+            page = self.pages.pop(self.normalize(old_title), None)
+            if page is None:
+                return None
+            old_title = page.title
+            page.title = self.normalize(new_title)
+            page.namespace = self.title_namespace(page.title)
+            self.pages[page.title] = page
+            self._record_change("log", page.title, None, logtype="move")
+            if not noredirect:
+                self.save(old_title, f"#REDIRECT [[{page.title}]]", user, "Moved")
+            return page
+
+    def _record_change(self, change_type: str, title: str, revision: FakeRevision | None, logtype: str = ""):
+        change: dict[str, Any] = {
+            "type": change_type,
+            "title": title,
+            "rcid": self._next_rcid,
+            "timestamp": revision.timestamp if revision else _now(),
+        }
+        if revision:
+            change["revid"] = revision.revid
+        if logtype:
+            change["logtype"] = logtype
+        self._next_rcid += 1
+        self.recent_changes.append(change)
+
+    def seed_from_mirror(self, mirror_file: Path):
+        """Loads the existing pages of a page mirror file."""
+        connection = sqlite3.connect(mirror_file)
+        rows = connection.execute("SELECT title, content FROM page WHERE pageid > 0").fetchall()
+        connection.close()
+        for title, content in rows:
+            self.save(title, content, "Seed")
+        self.recent_changes.clear()
+        logger.info(f"Fake wiki seeded with {len(rows)} pages from {mirror_file}")
+
+
+class ApiError(Exception):
+    def __init__(self, code: str, info: str, **extra):
+        super().__init__(info)
+        self.code = code
+        self.info = info
+        self.extra = extra
+
+
+class FakeWikiApi:
+    """Answers API requests from a FakeWikiState, independently of HTTP."""
+
+    def __init__(self, state: FakeWikiState, config: FakeWikiConfig):
+        self.state = state
+        self.config = config
+        self.logged_in_user: str | None = None
+        self._request_count = 0
+        self._actions: dict[str, Callable[[dict[str, str]], dict]] = {
+            "query": self.query,
+            "login": self.login,
+            "clientlogin": self.clientlogin,
+            "logout": self.logout,
+            "edit": self.edit,
+            "delete": self.delete,
+            "move": self.move,
+            "purge": self.purge,
+            "upload": self.upload,
+            "parse": self.parse,
+            "cargorecreatetables": self.cargo_recreate,
+            "cargorecreatedata": self.cargo_recreate,
+            "paraminfo": self.paraminfo,
+        }
+
+    def handle(self, params: dict[str, str], files: dict[str, bytes] | None = None, method: str = "POST") -> dict:
+        action = params.get("action", "")
+        with self.state.lock:
+            self.state.counts[action] += 1
+            self._request_count += 1
+            request_count = self._request_count
+
+        try:
+            if self.config.maxlag_every and "maxlag" in params and request_count % self.config.maxlag_every == 0:
+                raise ApiError("maxlag", f"Waiting for a database server: {self.config.maxlag_seconds} seconds lagged.", lag=self.config.maxlag_seconds)
+            handler = self._actions.get(action)
+            if handler is None:
+                raise ApiError("badvalue", f'Unrecognized value for parameter "action": {action}.')
+            if action == "upload":
+                return self.upload(params, files or {})
+            if ACTION_MODULES.get(action) and method == "GET":
+                raise ApiError("mustbeposted", f'The "{action}" module requires a POST request.')
+            return handler(params)
+        except ApiError as e:
+            return {"error": {"code": e.code, "info": e.info, **e.extra}}
+
+    @staticmethod
+    def _fv2(params: dict[str, str]) -> bool:
+        return params.get("formatversion") in ("2", "latest")
+
+    @staticmethod
+    def _split(value: str | None) -> list[str]:
+        if not value:
+            return []
+        # Values containing "|" are sent with the \x1f separator.
+        if value.startswith("\x1f"):
+            return value[1:].split("\x1f")
+        return value.split("|")
+
+    def _user(self) -> str:
+        return self.logged_in_user or "127.0.0.1"
+
+    def _require_token(self, params: dict[str, str]):
+        if params.get("token") != FAKE_TOKEN:
+            raise ApiError("badtoken", "Invalid CSRF token.")
+
+    # Login
+
+    def login(self, params: dict[str, str]) -> dict:
+        if "lgpassword" not in params:
+            return {"login": {"result": "NeedToken", "token": FAKE_TOKEN}}
+        return self._check_credentials(params.get("lgname", ""), params.get("lgpassword", ""), "login", "Success", "Failed")
+
+    def clientlogin(self, params: dict[str, str]) -> dict:
+        return self._check_credentials(params.get("username", ""), params.get("password", ""), "clientlogin", "PASS", "FAIL")
+
+    def _check_credentials(self, username: str, password: str, key: str, success: str, failure: str) -> dict:
+        # Bot passwords are "User@botname". User names are normalized like titles: "myuser" logs in as "Myuser".
+        username = FakeWikiState.normalize(username.split("@")[0])
+        if self.config.username in (None, username) and self.config.password in (None, password):
+            self.logged_in_user = username
+            return {key: {"result": success, "status": success, "lgusername": username, "username": username}}
+        return {key: {"result": failure, "status": failure, "reason": "Incorrect username or password entered.", "message": "Incorrect password"}}
+
+    def logout(self, _params: dict[str, str]) -> dict:
+        self.logged_in_user = None
+        return {}
+
+    # Query
+
+    def query(self, params: dict[str, str]) -> dict:
+        fv2 = self._fv2(params)
+        result: dict[str, Any] = {}
+        meta = self._split(params.get("meta"))
+        if "siteinfo" in meta:
+            result.update(self._siteinfo(params, fv2))
+        if "userinfo" in meta:
+            result["userinfo"] = self._userinfo(fv2)
+        if "tokens" in meta:
+            types = self._split(params.get("type")) or ["csrf"]
+            result["tokens"] = {f"{token_type}token": FAKE_TOKEN for token_type in types}
+
+        continue_args: dict[str, str] = {}
+        if params.get("list") == "recentchanges":
+            result["recentchanges"] = self._recentchanges(params)
+        elif params.get("list") == "allpages":
+            result["allpages"], continue_args = self._paginate(self._allpages(params), params, "ap")
+        elif params.get("list") == "categorymembers":
+            result["categorymembers"], continue_args = self._paginate(self._categorymembers(params), params, "cm")
+
+        titles = self._split(params.get("titles"))
+        if titles:
+            result.update(self._pages(titles, params, fv2))
+
+        response: dict[str, Any] = {"batchcomplete": True if fv2 else "", "query": result}
+        if continue_args:
+            response["continue"] = continue_args
+        return response
+
+    def _siteinfo(self, params: dict[str, str], fv2: bool) -> dict:
+        props = self._split(params.get("siprop")) or ["general"]
+        result: dict[str, Any] = {}
+        if "general" in props:
+            result["general"] = {
+                "mainpage": "Main Page",
+                "base": "http://localhost/w/index.php/Main_Page",
+                "sitename": "Desynced Wiki",
+                "generator": MEDIAWIKI_VERSION,
+                "case": "first-letter",
+                "lang": "en",
+                "articlepath": "/w/index.php/$1",
+                "scriptpath": "/w",
+                "script": "/w/index.php",
+                "server": "http://localhost",
+                "servername": "localhost",
+                "wikiid": "desynced",
+                "time": _now(),
+                "maxuploadsize": 104857600,
+                "legaltitlechars": " %!\"$&'()*,\\-.\\/0-9:;=?@A-Z\\\\^_`a-z~\\x80-\\xFF+",
+                "invalidusernamechars": "@:>=",
+                "timezone": "UTC",
+                "timeoffset": 0,
+                "writeapi": True if fv2 else "",
+                "uploadsenabled": True if fv2 else "",
+                "thumblimits": {"0": 120, "1": 150, "2": 180, "3": 200, "4": 250, "5": 300},
+                "imagelimits": {"0": {"width": 320, "height": 240}, "1": {"width": 640, "height": 480}},
+                "magiclinks": {"ISBN": False, "PMID": False, "RFC": False},
+            }
+        if "namespaces" in props:
+            namespaces = {}
+            for ns_id, name in NAMESPACES.items():
+                namespace: dict[str, Any] = {"id": ns_id, "case": "first-letter", "canonical": name, "subpages": ns_id not in (0, 6, 14)}
+                namespace["name" if fv2 else "*"] = name
+                if not fv2:
+                    namespace["subpages"] = "" if namespace["subpages"] else None
+                    namespace = {k: v for k, v in namespace.items() if v is not None}
+                namespaces[str(ns_id)] = namespace
+            result["namespaces"] = namespaces
+        if "namespacealiases" in props:
+            result["namespacealiases"] = [{"id": 6, "alias": "Image"}]
+        if "extensions" in props:
+            result["extensions"] = [
+                {"type": "parserhook", "name": "Cargo", "version": "3.6"},
+                {"type": "parserhook", "name": "Scribunto", "version": "1.0"},
+            ]
+        if "fileextensions" in props:
+            result["fileextensions"] = [{"ext": ext} for ext in ("png", "gif", "jpg", "jpeg", "webp", "svg")]
+        if "interwikimap" in props:
+            result["interwikimap"] = []
+        for prop in props:
+            result.setdefault(prop, {} if prop in ("general", "statistics", "restrictions") else [])
+        return result
+
+    def _userinfo(self, fv2: bool) -> dict:
+        if self.logged_in_user:
+            return {
+                "id": 1,
+                "name": self.logged_in_user,
+                "groups": ["*", "user", "bot"],
+                "rights": ["read", "edit", "createpage", "delete", "move", "suppressredirect", "upload", "reupload", "bot", "writeapi", "apihighlimits"],
+            } | ({"messages": False} if fv2 else {})
+        return {"id": 0, "name": self._user(), "anon": True if fv2 else "", "groups": ["*"], "rights": ["read", "edit", "createpage", "writeapi"]}
+
+    def _page_json(self, page: FakePage, props: list[str], rvprops: list[str], fv2: bool) -> dict:
+        result: dict[str, Any] = {"pageid": page.pageid, "ns": page.namespace, "title": page.title}
+        latest = page.latest
+        if "info" in props:
+            result.update(
+                {
+                    "contentmodel": "Scribunto" if page.namespace == 828 else "wikitext",
+                    "pagelanguage": "en",
+                    "touched": latest.timestamp,
+                    "lastrevid": latest.revid,
+                    "length": len(latest.content.encode("utf-8")),
+                }
+            )
+        if "revisions" in props:
+            revision: dict[str, Any] = {"revid": latest.revid, "parentid": page.revisions[-2].revid if len(page.revisions) > 1 else 0}
+            if "timestamp" in rvprops:
+                revision["timestamp"] = latest.timestamp
+            if "user" in rvprops:
+                revision["user"] = latest.user
+            if "comment" in rvprops:
+                revision["comment"] = latest.comment
+            if "sha1" in rvprops:
+                revision["sha1"] = latest.sha1
+            if "size" in rvprops:
+                revision["size"] = len(latest.content.encode("utf-8"))
+            if "content" in rvprops:
+                slot = {"contentmodel": "wikitext", "contentformat": "text/x-wiki"}
+                slot["content" if fv2 else "*"] = latest.content
+                revision["slots"] = {"main": slot}
+            result["revisions"] = [revision]
+        if "imageinfo" in props and page.namespace == 6:
+            result["imageinfo"] = [self._imageinfo(page)]
+        return result
+
+    def _imageinfo(self, page: FakePage) -> dict:
+        name = page.title.split(":", 1)[1]
+        data = self.state.files.get(name, b"")
+        return {
+            "timestamp": page.latest.timestamp,
+            "user": page.latest.user,
+            "comment": page.latest.comment,
+            "size": len(data),
+            "width": 0,
+            "height": 0,
+            "sha1": hashlib.sha1(data).hexdigest(),
+            "url": f"http://localhost/images/{name}",
+            "descriptionurl": f"http://localhost/w/index.php/{page.title}",
+            "mime": "image/png",
+        }
+
+    def _pages(self, titles: list[str], params: dict[str, str], fv2: bool) -> dict:
+        props = self._split(params.get("prop"))
+        rvprops = self._split(params.get("rvprop")) or ["ids", "timestamp", "flags", "comment", "user"]
+        normalized = []
+        pages = []
+        missing_id = -1
+        for title in titles:
+            normalized_title = self.state.normalize(title)
+            if normalized_title != title:
+                normalized.append({"from": title, "to": normalized_title})
+            page = self.state.pages.get(normalized_title)
+            if page is None:
+                missing = {"ns": self.state.title_namespace(normalized_title), "title": normalized_title, "missing": True if fv2 else ""}
+                if fv2:
+                    pages.append(missing)
+                else:
+                    pages.append(missing | {"pageid": missing_id})
+                    missing_id -= 1
+            else:
+                pages.append(self._page_json(page, props, rvprops, fv2))
+
+        result: dict[str, Any] = {}
+        if normalized:
+            result["normalized"] = normalized
+        if fv2:
+            result["pages"] = pages
+        else:
+            # Missing pages have negative ids as keys, and no pageid.
+            result["pages"] = {str(page.pop("pageid") if "missing" in page else page["pageid"]): page for page in pages}
+        return result
+
+    def _recentchanges(self, params: dict[str, str]) -> list[dict]:
+        start = params.get("rcstart", "")
+        changes = [change for change in self.state.recent_changes if not start or change["timestamp"] >= start]
+        if params.get("rcdir") != "newer":
+            changes.reverse()
+        return changes
+
+    def _allpages(self, params: dict[str, str]) -> list[dict]:
+        namespace = int(params.get("apnamespace", "0"))
+        prefix = params.get("apprefix", "")
+        return [
+            {"pageid": page.pageid, "ns": page.namespace, "title": page.title}
+            for page in sorted(self.state.pages.values(), key=lambda p: p.title)
+            if page.namespace == namespace and page.title.split(":", 1)[-1].startswith(prefix)
+        ]
+
+    def _categorymembers(self, params: dict[str, str]) -> list[dict]:
+        category = self.state.normalize(params.get("cmtitle", ""))
+        link = f"[[{category}]]"
+        namespaces = [int(ns) for ns in self._split(params.get("cmnamespace"))]
+        return [
+            {"pageid": page.pageid, "ns": page.namespace, "title": page.title}
+            for page in sorted(self.state.pages.values(), key=lambda p: p.title)
+            if link in page.latest.content and (not namespaces or page.namespace in namespaces)
+        ]
+
+    @staticmethod
+    def _paginate(items: list[dict], params: dict[str, str], prefix: str) -> tuple[list[dict], dict[str, str]]:
+        """Returns (items of this response, continue parameters). The continue value is the offset of the next item."""
+        limit_value = params.get(f"{prefix}limit", "10")
+        limit = 500 if limit_value == "max" else int(limit_value)
+        offset = int(params.get(f"{prefix}continue", "0"))
+        if offset + limit >= len(items):
+            return items[offset:], {}
+        return items[offset : offset + limit], {f"{prefix}continue": str(offset + limit), "continue": "-||"}
+
+    # Writes
+
+    def edit(self, params: dict[str, str]) -> dict:
+        self._require_token(params)
+        title = params.get("title", "")
+        text = params.get("text")
+        if text is None:
+            raise ApiError("missingparam", "The text parameter must be set.")
+        existing = self.state.pages.get(self.state.normalize(title))
+        if "createonly" in params and existing:
+            raise ApiError("articleexists", "The article you tried to create has been created already.")
+        if "nocreate" in params and not existing:
+            raise ApiError("missingtitle", "The page you specified doesn't exist.")
+        if existing and existing.latest.content == text:
+            return {"edit": {"result": "Success", "pageid": existing.pageid, "title": existing.title, "contentmodel": "wikitext", "nochange": ""}}
+
+        old_revid = existing.latest.revid if existing else 0
+        page, revision, created = self.state.save(title, text, self._user(), params.get("summary", ""))
+        result = {
+            "result": "Success",
+            "pageid": page.pageid,
+            "title": page.title,
+            "contentmodel": "wikitext",
+            "oldrevid": old_revid,
+            "newrevid": revision.revid,
+            "newtimestamp": revision.timestamp,
+        }
+        if created:
+            result["new"] = ""
+        return {"edit": result}
+
+    def delete(self, params: dict[str, str]) -> dict:
+        self._require_token(params)
+        title = params.get("title", "")
+        page = self.state.delete(title, self._user())
+        if page is None:
+            raise ApiError("missingtitle", "The page you specified doesn't exist.")
+        return {"delete": {"title": page.title, "reason": params.get("reason", ""), "logid": page.pageid}}
+
+    def move(self, params: dict[str, str]) -> dict:
+        self._require_token(params)
+        old_title, new_title = params.get("from", ""), params.get("to", "")
+        if self.state.normalize(new_title) in self.state.pages:
+            raise ApiError("articleexists", "A page of that name already exists, or the name you have chosen is not valid.")
+        noredirect = "noredirect" in params
+        page = self.state.move(old_title, new_title, self._user(), noredirect)
+        if page is None:
+            raise ApiError("missingtitle", "The page you specified doesn't exist.")
+        result = {"from": self.state.normalize(old_title), "to": page.title, "reason": params.get("reason", "")}
+        if not noredirect:
+            result["redirectcreated"] = ""
+        return {"move": result}
+
+    def purge(self, params: dict[str, str]) -> dict:
+        result = []
+        for title in self._split(params.get("titles")):
+            title = self.state.normalize(title)
+            page = self.state.pages.get(title)
+            if page is None:
+                result.append({"ns": self.state.title_namespace(title), "title": title, "missing": ""})
+                continue
+            purged = {"ns": page.namespace, "title": page.title, "purged": ""}
+            if "forcelinkupdate" in params:
+                purged["linkupdate"] = ""
+            result.append(purged)
+        with self.state.lock:
+            self.state.purged += [page["title"] for page in result if "purged" in page]
+        return {"batchcomplete": "", "purge": result}
+
+    def upload(self, params: dict[str, str], files: dict[str, bytes]) -> dict:
+        self._require_token(params)
+        filename = self.state.normalize(params.get("filename", ""))
+        data = files.get("file")
+        if data is None:
+            raise ApiError("missingparam", "One of the parameters filekey, file and url is required.")
+        title = f"File:{filename}"
+        if title in self.state.pages and "ignorewarnings" not in params:
+            return {"upload": {"result": "Warning", "warnings": {"exists": filename}, "filekey": "fake"}}
+        self.state.files[filename] = data
+        page, _, _ = self.state.save(title, params.get("text", params.get("comment", "")), self._user(), params.get("comment", ""))
+        return {"upload": {"result": "Success", "filename": filename, "imageinfo": self._imageinfo(page)}}
+
+    def cargo_recreate(self, params: dict[str, str]) -> dict:
+        self._require_token(params)
+        with self.state.lock:
+            self.state.cargo_calls.append(dict(params))
+        return {"success": True}
+
+    def parse(self, params: dict[str, str]) -> dict:
+        title = self.state.normalize(params.get("page", ""))
+        page = self.state.pages.get(title)
+        if page is None:
+            raise ApiError("missingtitle", "The page you specified doesn't exist.")
+        return {"parse": {"title": page.title, "pageid": page.pageid, "limitreportdata": []}}
+
+    def paraminfo(self, params: dict[str, str]) -> dict:
+        """Module descriptions, only what pywikibot reads: submodules, prefixes, limits and mustbeposted."""
+        return {"paraminfo": {"modules": [self._module_info(path) for path in self._split(params.get("modules"))]}}
+
+    @staticmethod
+    def _module_info(path: str) -> dict:
+        def submodules_param(name: str, modules: list[str], parent: str) -> dict:
+            return {
+                "name": name,
+                "type": modules,
+                "submodules": {module: f"{parent}{module}" for module in modules},
+                "multi": "",
+                "limit": 50,
+                "lowlimit": 50,
+                "highlimit": 500,
+            }
+
+        if path == "main":
+            return {
+                "name": "main",
+                "path": "main",
+                "prefix": "",
+                "parameters": [
+                    {k: v for k, v in submodules_param("action", list(ACTION_MODULES), "").items() if k != "multi"},
+                    {"name": "format", "type": ["json"], "submodules": {"json": "json"}},
+                ],
+            }
+        if path == "query":
+            parameters = [
+                submodules_param(group, [name for name, (g, _, _) in QUERY_MODULES.items() if g == group], "query+") for group in ("prop", "list", "meta")
+            ]
+            generator = submodules_param("generator", [name for name, (_, _, gen) in QUERY_MODULES.items() if gen], "query+")
+            parameters.append({k: v for k, v in generator.items() if k != "multi"})
+            parameters += [{"name": "titles", "multi": "", "limit": 50}, {"name": "pageids", "multi": "", "limit": 50}]
+            return {"name": "query", "path": "query", "group": "action", "prefix": "", "parameters": parameters}
+        if path in ACTION_MODULES:
+            info: dict[str, Any] = {"name": path, "path": path, "group": "action", "prefix": "", "parameters": []}
+            if ACTION_MODULES[path]:
+                info["mustbeposted"] = ""
+            return info
+
+        name = path.removeprefix("query+")
+        if name not in QUERY_MODULES:
+            return {"name": name, "path": path, "missing": ""}
+        group, prefix, generator = QUERY_MODULES[name]
+        info = {"name": name, "path": f"query+{name}", "group": group, "prefix": prefix, "parameters": []}
+        if generator:
+            info["generator"] = ""
+        if group == "list" or name in ("revisions", "templates", "categories", "links", "langlinks", "imageinfo"):
+            info["parameters"].append({"name": "limit", "type": "limit", "min": 1, "max": 500, "highmax": 5000, "default": 10})
+        if group == "list":
+            info["parameters"].append({"name": "namespace", "type": [str(ns) for ns in NAMESPACES if ns >= 0], "multi": "", "limit": 50})
+        if name == "tokens":
+            info["parameters"].append({"name": "type", "type": TOKEN_TYPES, "multi": "", "limit": 50, "default": "csrf"})
+        if name == "info":
+            # pywikibot reads the batch size of preloadpages here.
+            info["parameters"].append({"name": "prop", "type": ["protection", "url"], "multi": "", "limit": 50, "highlimit": 500})
+        return info
+
+
+class FakeWikiServer:
+    """Serves a FakeWikiApi over HTTP, on localhost, from a background thread."""
+
+    def __init__(self, config: FakeWikiConfig | None = None, state: FakeWikiState | None = None, port: int = 0):
+        self.config = config or FakeWikiConfig()
+        self.state = state or FakeWikiState()
+        self.api = FakeWikiApi(self.state, self.config)
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler_class())
+        self._thread: threading.Thread | None = None
+
+    @property
+    def api_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}{API_PATH}"
+
+    def _handler_class(self) -> type[BaseHTTPRequestHandler]:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):  # pylint: disable=invalid-name
+                self._answer(self._query_params(), {}, "GET")
+
+            def do_POST(self):  # pylint: disable=invalid-name
+                params = self._query_params()
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                files: dict[str, bytes] = {}
+                content_type = self.headers.get("Content-Type", "")
+                if content_type.startswith("multipart/form-data"):
+                    message = BytesParser(policy=HTTP).parsebytes(f"Content-Type: {content_type}\r\n\r\n".encode() + body)
+                    for part in message.iter_parts():
+                        name = part.get_param("name", header="content-disposition")
+                        payload = part.get_payload(decode=True) or b""
+                        if part.get_filename():
+                            files[name] = payload
+                        else:
+                            params[name] = payload.decode("utf-8")
+                else:
+                    params.update({k: v[-1] for k, v in parse_qs(body.decode("utf-8"), keep_blank_values=True).items()})
+                self._answer(params, files, "POST")
+
+            def _query_params(self) -> dict[str, str]:
+                return {k: v[-1] for k, v in parse_qs(urlparse(self.path).query, keep_blank_values=True).items()}
+
+            def _answer(self, params: dict[str, str], files: dict[str, bytes], method: str):
+                if urlparse(self.path).path != API_PATH:
+                    self.send_error(404)
+                    return
+                if server.config.latency:
+                    time.sleep(server.config.latency)
+                response = server.api.handle(params, files, method)
+                body = json.dumps(response).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                if "error" in response and response["error"]["code"] == "maxlag":
+                    self.send_header("Retry-After", str(server.config.maxlag_seconds))
+                    self.send_header("X-Database-Lag", str(server.config.maxlag_seconds))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+                logger.debug(f"Fake wiki: {format % args}")
+
+        return Handler
+
+    def report(self):
+        """Logs the requests answered, by action."""
+        with self.state.lock:
+            counts = dict(self.state.counts)
+        logger.info(f"Fake wiki: {sum(counts.values())} requests {counts}, {len(self.state.pages)} pages")
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        logger.info(f"Fake wiki listening on {self.api_url}")
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def serve_forever(self):
+        logger.info(f"Fake wiki listening on {self.api_url}")
+        self._server.serve_forever()
@@ -0,0 +1,100 @@
+"""Static game data as Lua modules, read on the wiki with `mw.loadData`.
+
+Rows use the same field names as the cargo tables, so wiki modules can switch between a cargo query
+and a module lookup without renaming anything. Empty fields are left out, as cargo would return them empty: modules
+read them with `row.field or ""`, a nil value cannot be a table key.
+"""
+
+import re
+from typing import Any, Collection, Type
+
+from desynced_wiki_scripts.models.decorators import DesyncedObject
+from desynced_wiki_scripts.wiki.cargo.analyze_type import DataClassTypeInfo, analyze_type
+from desynced_wiki_scripts.wiki.cargo.cargo_printer import CargoPrinter
+
+_LINE_PATTERN = re.compile(r"^\|(\w+) = (.*)$", re.DOTALL)
+_IDENTIFIER_PATTERN = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+_LUA_KEYWORDS = {
+    "and", "break", "do", "else", "elseif", "end", "false", "for", "function", "goto", "if",
+    "in", "local", "nil", "not", "or", "repeat", "return", "then", "true", "until", "while",
+}  # fmt: skip
+
+
+def _parse_lines(lines: list[str]) -> dict[str, str]:
+    result = {}
+    for line in lines:
+        match = _LINE_PATTERN.match(line)
+        assert match, f"Unexpected cargo line '{line}'"
+        result[match.group(1)] = match.group(2)
+    return result
+
+
+def _convert(value: str, cargo_type: str) -> Any:
+    if cargo_type == "Integer":
+        return int(value)
+    if cargo_type == "Float":
+        return float(value)
+    if cargo_type == "Boolean":
+        return value == "True"
+    return value
+
+
+def to_rows(object_type: Type[DesyncedObject], objects: Collection) -> list[dict[str, Any]]:
+    """Cargo rows of `objects`, with values typed after the table declaration."""
+    type_info = analyze_type(object_type)
+    assert isinstance(type_info, DataClassTypeInfo), f"{object_type} is not a dataclass"
+
+    declarations = _parse_lines(CargoPrinter(CargoPrinter.Mode.DECLARATIONS).print_dataclass(None, type_info))
+    printer = CargoPrinter()
+    rows = []
+    for obj in objects:
+        row = _parse_lines(printer.print_dataclass(obj, type_info))
+        rows.append({field: _convert(value, declarations[field]) for field, value in row.items() if value != ""})
+    return rows
+
+
+def to_lua(value: Any, indent: int = 0) -> str:
+    """Lua literal for a python scalar, list or dict. Dict keys are sorted so output is stable."""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        return repr(value)
+    if isinstance(value, str):
+        return _quote(value)
+
+    prefix = "  " * (indent + 1)
+    if isinstance(value, (list, tuple)):
+        entries = [f"{prefix}{to_lua(element, indent + 1)}," for element in value]
+    elif isinstance(value, dict):
+        entries = [f"{prefix}{_key(key)} = {to_lua(value[key], indent + 1)}," for key in sorted(value)]
+    else:
+        raise ValueError(f"Cannot convert {type(value)} to lua: {value}")
+
+    if not entries:
+        return "{}"
+    return "{\n" + "\n".join(entries) + "\n" + "  " * indent + "}"
+
+
+def _key(key: str) -> str:
+    if _IDENTIFIER_PATTERN.match(key) and key not in _LUA_KEYWORDS:
+        return key
+    return f"[{_quote(key)}]"
+
+
+def _quote(value: str) -> str:
+    escaped = value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n").replace("\r", "\\r")
+    return f'"{escaped}"'
+
+
+def render_data_module(table_name: str, rows: list[dict[str, Any]]) -> str:
+    """Module returning `byName`, `nameByLuaId` and the sorted `names` of a table's rows.
+
+    Iterate `names` with `ipairs`: tables from `mw.loadData` don't support the `#` operator.
+    """
+    by_name = {row["name"]: row for row in rows}
+    module = {
+        "byName": by_name,
+        "nameByLuaId": {row["luaId"]: row["name"] for row in rows if "luaId" in row},
+        "names": sorted(by_name),
+    }
+    return f"-- Generated from the game files by generate_wiki ({table_name} table), do not edit.\nreturn {to_lua(module)}\n"
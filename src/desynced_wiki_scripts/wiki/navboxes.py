@@ -0,0 +1,122 @@
+"""Offline version of `createNavBox` in lua_wiki_modules/Navboxes.lua.
+
+Objects are sorted into categories exactly like `m.queryBaseCategories` does from the cargo tables,
+then rendered as a static template transcluding the same NavTable templates.
+Categories users add by hand on the wiki (userNavCategories) are not known here and not included.
+"""
+
+from dataclasses import dataclass
+from enum import StrEnum
+from typing import Any
+
+from desynced_wiki_scripts.wiki.data_categories import DataCategory
+from desynced_wiki_scripts.wiki.templates.templater import WikiTemplate, render_template
+from desynced_wiki_scripts.wiki.titles import get_navbox_template_title
+
+Row = dict[str, Any]
+
+BUGS_ORDERING = 999
+
+
+class NavboxType(StrEnum):
+    BOT = "Bot"
+    BUILDING = "Building"
+    COMPONENT = "Component"
+    ITEM = "Item"
+
+
+@dataclass
+class NavboxTypeData:
+    """Mirror of `TypeData` in Navboxes.lua."""
+
+    table: DataCategory
+    # Default title of the navbox, can be overridden with the `title` template parameter.
+    title: str
+    tab: str
+    filter_field: str
+    recipe_type: str | None = None
+    # Fields to sort by, before name.
+    order_by: tuple[str, ...] = ()
+
+
+NAVBOX_TYPES: dict[NavboxType, NavboxTypeData] = {
+    NavboxType.BOT: NavboxTypeData(DataCategory.entity, "Bots", tab="frame", filter_field="size", recipe_type="Production"),
+    NavboxType.BUILDING: NavboxTypeData(DataCategory.entity, "Buildings", tab="frame", filter_field="size", recipe_type="Construction"),
+    NavboxType.COMPONENT: NavboxTypeData(DataCategory.component, "Components", tab="item", filter_field="attachmentSize"),
+    NavboxType.ITEM: NavboxTypeData(DataCategory.item, "Items", tab="item", filter_field="tag", order_by=("type", "race")),
+}
+
+
+@dataclass
+class NavboxCategory:
+    name: str
+    ordering: int
+    names: list[str]
+
+
+def _same_text(a: Any, b: str) -> bool:
+    # Cargo where clauses are case insensitive.
+    return a is not None and str(a).lower() == b.lower()
+
+
+def _append(categories: dict[str, NavboxCategory], cat_name: str, name: str, ordering: int):
+    categories.setdefault(cat_name, NavboxCategory(cat_name, ordering, [])).names.append(name)
+
+
+def _sort_in_category(navbox_type: NavboxType, categories: dict[str, NavboxCategory], cat_name: str, ordering: int, row: Row):
+    if navbox_type != NavboxType.BOT:
+        _append(categories, cat_name, row["name"], ordering)
+    elif _same_text(row.get("slotType"), "DRONE"):
+        _append(categories, "Drone", row["name"], ordering)
+    elif _same_text(row.get("slotType"), "SATELLITE"):
+        _append(categories, "Satellite", row["name"], ordering)
+    elif row.get("race"):
+        _append(categories, row["race"], row["name"], ordering)
+    else:
+        _append(categories, "Other", row["name"], ordering)
+
+
+def categorize(navbox_type: NavboxType, category_filters: list[Row], objects: list[Row]) -> list[NavboxCategory]:
+    """Non empty categories of a navbox, sorted by ordering.
+
+    Args:
+        navbox_type (NavboxType): Navbox to build.
+        category_filters (list[Row]): categoryfilter rows, with cargo field names (see `lua_data.to_rows`).
+        objects (list[Row]): Rows of the table of `navbox_type`, with cargo field names.
+    """
+    type_data = NAVBOX_TYPES[navbox_type]
+
+    # One category per filter value, first by name wins.
+    filter_to_category: dict[str, tuple[str, int]] = {}
+    for cat in sorted(category_filters, key=lambda row: row["name"]):
+        if cat.get("tab") == type_data.tab and cat.get("filterField") == type_data.filter_field:
+            filter_to_category.setdefault(cat.get("filterVal", ""), (cat["name"], cat.get("ordering", 0)))
+
+    rows = sorted(objects, key=lambda row: tuple(str(row.get(f, "")) for f in type_data.order_by) + (row["name"],))
+    categories: dict[str, NavboxCategory] = {}
+    for row in rows:
+        if not row.get("unlockable"):
+            continue
+        if type_data.recipe_type and not _same_text(row.get("recipeType"), type_data.recipe_type):
+            continue
+        if meta := filter_to_category.get(row.get(type_data.filter_field, "")):
+            _sort_in_category(navbox_type, categories, meta[0], meta[1], row)
+
+    if navbox_type == NavboxType.BOT:
+        for row in sorted(objects, key=lambda row: row["name"]):
+            if _same_text(row.get("size"), "Unit") and _same_text(row.get("race"), "Virus"):
+                _append(categories, "Bugs", row["name"], BUGS_ORDERING)
+
+    return sorted((cat for cat in categories.values() if cat.names), key=lambda cat: (cat.ordering, cat.name))
+
+
+def render_navbox(navbox_type: NavboxType, categories: list[NavboxCategory]) -> str:
+    title = NAVBOX_TYPES[navbox_type].title
+    return render_template(
+        WikiTemplate.NAVBOX,
+        {
+            "title": title,
+            "template_name": get_navbox_template_title(navbox_type),
+            "categories": categories,
+        },
+    )
@@ -0,0 +1,219 @@
+"""Persistent local copy of wiki pages, in SQLite, kept current with the wiki recent changes.
+
+Pages are fetched in batches the first time they are needed. Later runs only read `list=recentchanges` since the last
+sync, and fetch again the pages that changed. Pages are handed to pywikibot as if it had preloaded them, so tools
+keep using `Page.text`, `Page.exists()` and `Page.save()`.
+
+Example Usage:
+
+    mirror = PageMirror(Path(".wiki_mirror.sqlite"))
+    sync = MirrorSync(mirror, wiki)
+    sync.sync_recent_changes()
+    sync.refresh(titles)
+    page = mirror.load_into(wiki.page(title))
+"""
+
+from __future__ import annotations
+
+import re
+import sqlite3
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from itertools import batched
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, Protocol
+
+from desynced_wiki_scripts.util.logger import get_logger
+
+if TYPE_CHECKING:
+    from pywikibot import Page
+
+logger = get_logger()
+
+# $wgRCMaxAge default: older changes are not listed anymore, the whole mirror must be refreshed.
+RC_MAX_AGE = timedelta(days=90)
+# Recent changes made while a sync runs can be listed with an earlier timestamp.
+SYNC_MARGIN = timedelta(minutes=1)
+# Max titles per query for normal users.
+FETCH_BATCH_SIZE = 50
+_SQL_BATCH_SIZE = 500
+TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+_REDIRECT_PATTERN = re.compile(r"\s*#REDIRECT\s*\[\[", re.IGNORECASE)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS page (
+    title TEXT PRIMARY KEY,
+    pageid INTEGER NOT NULL,
+    revid INTEGER NOT NULL,
+    sha1 TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    content TEXT NOT NULL,
+    stale INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+@dataclass
+class MirroredPage:
+    title: str
+    # 0 if the page does not exist.
+    pageid: int
+    revid: int = 0
+    sha1: str = ""
+    timestamp: str = ""
+    content: str = ""
+
+    @property
+    def exists(self) -> bool:
+        return self.pageid > 0
+
+    @staticmethod
+    def from_pagedict(pagedict: dict) -> "MirroredPage":
+        """From a page of a `prop=revisions&rvprop=ids|sha1|timestamp|content&rvslots=main` query (formatversion 1)."""
+        if "missing" in pagedict or "pageid" not in pagedict:
+            return MirroredPage(title=pagedict["title"], pageid=0)
+        revision = pagedict.get("revisions", [{}])[0]
+        return MirroredPage(
+            title=pagedict["title"],
+            pageid=int(pagedict["pageid"]),
+            revid=int(revision.get("revid", 0)),
+            sha1=revision.get("sha1", ""),
+            timestamp=revision.get("timestamp", ""),
+            content=revision.get("slots", {}).get("main", {}).get("*", ""),
+        )
+
+    def to_pagedict(self) -> dict:
+        """Inverse of `from_pagedict`, in the format pywikibot reads query results."""
+        if not self.exists:
+            return {"title": self.title, "missing": ""}
+        pagedict = {
+            "title": self.title,
+            "pageid": self.pageid,
+            "lastrevid": self.revid,
+            "revisions": [
+                {
+                    "revid": self.revid,
+                    "sha1": self.sha1,
+                    "timestamp": self.timestamp,
+                    "slots": {"main": {"contentmodel": "wikitext", "contentformat": "text/x-wiki", "*": self.content}},
+                }
+            ],
+        }
+        if _REDIRECT_PATTERN.match(self.content):
+            pagedict["redirect"] = ""
+        return pagedict
+
+
+class PageMirror:
+    def __init__(self, path: Path | str):
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(_SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def get(self, title: str) -> MirroredPage | None:
+        """Mirrored page, None if it was never fetched. Stale pages are returned too."""
+        row = self.connection.execute("SELECT title, pageid, revid, sha1, timestamp, content FROM page WHERE title = ?", (title,)).fetchone()
+        return MirroredPage(*row) if row else None
+
+    def fresh_titles(self, titles: list[str]) -> set[str]:
+        """Titles that are mirrored and not stale."""
+        fresh = set()
+        for batch in batched(titles, _SQL_BATCH_SIZE):
+            placeholders = ", ".join("?" for _ in batch)
+            rows = self.connection.execute(f"SELECT title FROM page WHERE stale = 0 AND title IN ({placeholders})", batch)
+            fresh.update(row[0] for row in rows)
+        return fresh
+
+    def store(self, pages: Iterable[MirroredPage]):
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO page (title, pageid, revid, sha1, timestamp, content, stale) VALUES (?, ?, ?, ?, ?, ?, 0)",
+                ((p.title, p.pageid, p.revid, p.sha1, p.timestamp, p.content) for p in pages),
+            )
+
+    def mark_stale(self, titles: Iterable[str]):
+        """Marks pages to fetch again, ex. after an edit. Titles not mirrored are ignored."""
+        with self.connection:
+            self.connection.executemany("UPDATE page SET stale = 1 WHERE title = ?", ((title,) for title in titles))
+
+    def mark_all_stale(self):
+        with self.connection:
+            self.connection.execute("UPDATE page SET stale = 1")
+
+    @property
+    def last_sync(self) -> datetime | None:
+        row = self.connection.execute("SELECT value FROM meta WHERE key = 'last_sync'").fetchone()
+        return datetime.strptime(row[0], TIMESTAMP_FORMAT).replace(tzinfo=UTC) if row else None
+
+    @last_sync.setter
+    def last_sync(self, value: datetime):
+        with self.connection:
+            self.connection.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('last_sync', ?)", (value.strftime(TIMESTAMP_FORMAT),))
+
+    def __len__(self) -> int:
+        return self.connection.execute("SELECT COUNT(*) FROM page").fetchone()[0]
+
+    def load_into(self, page: Page) -> Page:
+        """Fills a pywikibot page from the mirror, like a preload: reading its text or existence needs no request."""
+        from pywikibot.data import api  # The page is from pywikibot: already imported.
+
+        if mirrored := self.get(page.title()):
+            # "info": a page dict without "redirect" is not a redirect.
+            api.update_page(page, mirrored.to_pagedict(), props=["info"])
+        return page
+
+
+class MirrorSource(Protocol):
+    """The wiki requests the mirror needs, see DesyncedWiki."""
+
+    def query_page_revisions(self, titles: list[str]) -> list[dict]: ...
+
+    def recent_changes(self, since: datetime) -> list[dict]: ...
+
+
+class MirrorSync:
+    def __init__(self, mirror: PageMirror, wiki: MirrorSource):
+        self.mirror = mirror
+        self.wiki = wiki
+
+    def sync_recent_changes(self, now: datetime | None = None) -> int:
+        """Marks the pages changed on the wiki since the last sync as stale. Returns the number of changes read."""
+        now = now or datetime.now(UTC)
+        last_sync = self.mirror.last_sync
+        if last_sync is None:
+            # Nothing mirrored yet, pages get fetched by refresh().
+            changes = []
+        elif now - last_sync > RC_MAX_AGE:
+            logger.info(f"Mirror last synced {last_sync}, older than recent changes go: refreshing every page.")
+            self.mirror.mark_all_stale()
+            changes = []
+        else:
+            changes = self.wiki.recent_changes(last_sync - SYNC_MARGIN)
+            titles = set()
+            for change in changes:
+                titles.add(change["title"])
+                # Moves change the target page too.
+                if target := change.get("logparams", {}).get("target_title"):
+                    titles.add(target)
+            self.mirror.mark_stale(titles)
+            logger.info(f"Mirror: {len(changes)} recent changes since {last_sync}, {len(titles)} pages to refresh.")
+
+        self.mirror.last_sync = now
+        return len(changes)
+
+    def refresh(self, titles: list[str]) -> int:
+        """Fetches the pages not mirrored yet or stale, in batches. Returns the number of pages fetched."""
+        fresh = self.mirror.fresh_titles(titles)
+        to_fetch = [title for title in dict.fromkeys(titles) if title not in fresh]
+        for batch in batched(to_fetch, FETCH_BATCH_SIZE):
+            pagedicts = self.wiki.query_page_revisions(list(batch))
+            self.mirror.store(MirroredPage.from_pagedict(pagedict) for pagedict in pagedicts)
+        if to_fetch:
+            logger.info(f"Mirror: fetched {len(to_fetch)} pages, {len(fresh)} up to date.")
+        return len(to_fetch)
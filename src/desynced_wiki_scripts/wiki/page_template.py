@@ -1,9 +1,14 @@
+from __future__ import annotations
+
 from dataclasses import dataclass
-from typing import TypeAlias
-from pywikibot import Page
+from typing import TYPE_CHECKING, TypeAlias
 
 from desynced_wiki_scripts.util.logger import get_logger
 from .data_categories import DataCategory
+from .wikitext import parse_wikitext
+
+if TYPE_CHECKING:
+    from pywikibot import Page
 
 logger = get_logger()
 
@@ -74,68 +79,23 @@ def get_template_info(template_name) -> TemplateInfo | None:
     return TEMPLATES_INFO.get(template_name)
 
 
-def extract_template_info(template_content) -> tuple[TemplateName, TemplateInfo] | None:
-    template_name = template_content.split("|")[0].split("#")[0].strip()
-    arg_count = template_content.count("|")
-    if not template_name:
-        logger.warning(f"Unexpected empty template, logic error or bad page data? template was: '{template_content}'")
-        return None
-
-    return template_name, TemplateInfo(arg_count, arg_count)
-
-
 def extract_templates_info_from_page(
     content: str,
 ) -> list[tuple[TemplateName, TemplateInfo]]:
-    """Extract all template names & info from the given page content.
+    """Extract all template names & info from the given page content, nested templates included.
 
-    Uses a read pointer approach to handle multi-line templates and nested templates.
-    The template name is all text before the first | (if any, else it's all text).
+    Arguments are counted at the template level: the "|" of nested templates and links are not counted.
     """
-    templates_in_content = []
-    read_pointer = 0
-    content_length = len(content)
-
-    while read_pointer < content_length:
-        # Find the next template start
-        start_pos = content.find("{{", read_pointer)
-        if start_pos == -1:
-            break
-
-        # Find the corresponding template end
-        end_pos = content.find("}}", start_pos)
-        if end_pos == -1:
-            break
-
-        # Extract the template content
-        template_content = content[start_pos + 2 : end_pos].strip()
-
-        # Process nested templates recursively
-        nested_templates = extract_templates_info_from_page(template_content)
-        templates_in_content.extend(nested_templates)
-
-        # Extract the main template name
-        templates_in_content.append(extract_template_info(template_content))
-
-        # Move the read pointer past this template
-        read_pointer = end_pos + len("}}")
-
-    return templates_in_content
+    return [(node.name, TemplateInfo(node.arg_count, node.arg_count)) for node in parse_wikitext(content).templates if node.name]
 
 
 def extract_templates_from_page(content: str) -> list[TemplateName]:
-    """Extract all template names from the given page content.
-
-    Uses a read pointer approach to handle multi-line templates and nested templates.
-    The template name is all text before the first | (if any, else it's all text).
-    """
-    templates_in_content = extract_templates_info_from_page(content)
-    return [name for name, _ in templates_in_content]
+    """Extract all template names from the given page content, nested templates included."""
+    return parse_wikitext(content).template_names()
 
 
 def page_has_template(content: str, template: str) -> bool:
-    templates = extract_templates_from_page(content)
-    return template in templates
+    return parse_wikitext(content).has_template(template)
 
 
 # Testing, using Page instead. Could be great to use Page everywhere here but that's some rework.
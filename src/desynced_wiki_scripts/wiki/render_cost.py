@@ -0,0 +1,107 @@
+"""Render cost of wiki pages, from the limit report of action=parse responses."""
+
+import csv
+import json
+from dataclasses import asdict, dataclass, field, fields
+from pathlib import Path
+from typing import Any, Iterable
+
+# Limit report names, see https://www.mediawiki.org/wiki/API:Parse (prop=limitreportdata).
+LUA_TIME = "scribunto-limitreport-timeusage"
+LUA_MEMORY = "scribunto-limitreport-memusage"
+CPU_TIME = "limitreport-cputime"
+EXPENSIVE_FUNCTIONS = "limitreport-expensivefunctioncount"
+POST_EXPAND_INCLUDE_SIZE = "limitreport-postexpandincludesize"
+TEMPLATE_ARGUMENT_SIZE = "limitreport-templateargumentsize"
+# Cargo does not report its queries by default, any limit report entry with this prefix is counted as queries.
+CARGO_PREFIX = "cargo"
+
+
+@dataclass
+class RenderCost:
+    title: str
+    lua_seconds: float = 0
+    lua_memory_bytes: int = 0
+    cpu_seconds: float = 0
+    expensive_functions: int = 0
+    post_expand_include_size: int = 0
+    template_argument_size: int = 0
+    # None when the wiki does not report cargo queries.
+    cargo_queries: int | None = None
+    error: str = ""
+    # Every limit report value, by name.
+    raw: dict[str, Any] = field(default_factory=dict)
+
+
+def _number(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+def parse_limit_report(title: str, response: dict) -> RenderCost:
+    """RenderCost of one action=parse response (formatversion 1 or 2)."""
+    if "error" in response:
+        return RenderCost(title=title, error=str(response["error"].get("info", response["error"])))
+
+    entries = response.get("parse", {}).get("limitreportdata", [])
+    # Value is the first element, the limit the second when there is one.
+    raw = {entry["name"]: entry.get("0", entry.get("*")) for entry in entries}
+
+    cost = RenderCost(
+        title=response.get("parse", {}).get("title", title),
+        lua_seconds=_number(raw.get(LUA_TIME)),
+        lua_memory_bytes=int(_number(raw.get(LUA_MEMORY))),
+        cpu_seconds=_number(raw.get(CPU_TIME)),
+        expensive_functions=int(_number(raw.get(EXPENSIVE_FUNCTIONS))),
+        post_expand_include_size=int(_number(raw.get(POST_EXPAND_INCLUDE_SIZE))),
+        template_argument_size=int(_number(raw.get(TEMPLATE_ARGUMENT_SIZE))),
+        raw=raw,
+    )
+    cargo_values = [_number(value) for name, value in raw.items() if name.startswith(CARGO_PREFIX)]
+    if cargo_values:
+        cost.cargo_queries = int(sum(cargo_values))
+    return cost
+
+
+RANK_KEYS = [f.name for f in fields(RenderCost) if f.name not in ("title", "error", "raw")]
+
+
+def rank(costs: Iterable[RenderCost], key: str) -> list[RenderCost]:
+    """Costs sorted by `key`, most expensive first."""
+    return sorted(costs, key=lambda cost: getattr(cost, key) or 0, reverse=True)
+
+
+def write_json(costs: list[RenderCost], path: Path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump([asdict(cost) for cost in costs], f, indent=2, ensure_ascii=False)
+
+
+def write_csv(costs: list[RenderCost], path: Path):
+    columns = [f.name for f in fields(RenderCost) if f.name != "raw"]
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=columns)
+        writer.writeheader()
+        for cost in costs:
+            row = asdict(cost)
+            writer.writerow({column: row[column] for column in columns})
+
+
+def response_file_name(title: str) -> str:
+    """File name of a saved response, titles can contain "/" and ":"."""
+    return title.replace("/", "%2F").replace(":", "%3A") + ".json"
+
+
+def save_response(directory: Path, title: str, response: dict):
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / response_file_name(title)).write_text(json.dumps(response, ensure_ascii=False), encoding="utf-8")
+
+
+def load_saved_responses(directory: Path) -> dict[str, dict]:
+    """Saved action=parse responses by title, from `save_response` or any `<title>.json` file."""
+    responses = {}
+    for path in sorted(directory.glob("*.json")):
+        title = path.stem.replace("%2F", "/").replace("%3A", ":")
+        responses[title] = json.loads(path.read_text(encoding="utf-8"))
+    return responses
@@ -1,10 +1,14 @@
+from __future__ import annotations
+
 import logging
 from dataclasses import dataclass
 from enum import Enum
+from functools import cache
 import os
-from typing import Dict
+from typing import TYPE_CHECKING, Dict
 
-from jinja2 import Environment, FileSystemLoader, Template
+if TYPE_CHECKING:
+    from jinja2 import Template
 
 logger = logging.getLogger()
 
@@ -12,34 +16,34 @@ logger = logging.getLogger()
 class WikiTemplate(Enum):
     CARGO_DECLARE = "cargo_declaration.jinja"
     CARGO_STORE = "cargo_storage.jinja"
+    NAVBOX = "navbox.jinja"
 
 
 def remove_none(element):
     return element if element else ""
 
 
-# Set up the environment and file loader
-env = Environment(
-    loader=FileSystemLoader("src/desynced_wiki_scripts/wiki/templates"),
-    finalize=remove_none,
-    trim_blocks=True,
-    lstrip_blocks=True,
-)
-
-
 @dataclass
 class CachedTemplate:
     template: Template
 
 
-cached_templates: dict[WikiTemplate, CachedTemplate] = {}
+@cache
+def _cached_templates() -> dict[WikiTemplate, CachedTemplate]:
+    """Templates compiled on first render: jinja2 is not imported by the tools not rendering any."""
+    from jinja2 import Environment, FileSystemLoader
 
-for template_type in WikiTemplate:
-    template = env.get_template(template_type.value)
-    cached_templates[template_type] = CachedTemplate(template)
+    # Set up the environment and file loader
+    env = Environment(
+        loader=FileSystemLoader("src/desynced_wiki_scripts/wiki/templates"),
+        finalize=remove_none,
+        trim_blocks=True,
+        lstrip_blocks=True,
+    )
+    return {template_type: CachedTemplate(env.get_template(template_type.value)) for template_type in WikiTemplate}
 
 
 # Actual Public Interface
 def render_template(t_type: WikiTemplate, template_args: Dict):
-    tmp: Template = cached_templates[t_type].template
+    tmp: Template = _cached_templates()[t_type].template
     return tmp.render(template_args)
@@ -1,5 +1,8 @@
 from .data_categories import DATA_CATEGORY_INFO, DataCategory
 
+# Namespaces of the generated titles.
+_NAMESPACES = {"Data", "Template", "Module", "Category", "File"}
+
 
 def get_human_page_title(cat: DataCategory, subpagename: str) -> str:
     info = DATA_CATEGORY_INFO.get(cat)
@@ -13,6 +16,23 @@ def get_data_page_title(category: DataCategory, human_title: str) -> str:
     return f"Data:{category}:{human_title}"
 
 
+def normalize_title(title: str) -> str:
+    """Title as the wiki normalizes it, without asking the wiki: underscores are spaces, first letters are upper case.
+
+    Only knows the namespaces of the generated titles, ex. "Data:item:Metal_Ore" -> "Data:Item:Metal Ore".
+    """
+    title = title.replace("_", " ").strip()
+    namespace, sep, rest = title.partition(":")
+    if sep and namespace in _NAMESPACES:
+        return f"{namespace}:{rest[:1].upper()}{rest[1:]}"
+    return title[:1].upper() + title[1:]
+
+
+def get_data_file_name(name: str) -> str:
+    """Name of the generated data file of an object, ex. "Data/item/<file name>"."""
+    return name.replace("/", "_").replace("*", "")
+
+
 def get_template_title(category: str):
     """Not the same as the page name"""
     return f"Data{category[0].upper() + category[1:]}"  # "component" -> "DataComponent"
@@ -28,3 +48,17 @@ def get_sub_pagename(title: str) -> str:
 
 def get_base_pagename(title: str) -> str:
     return title.split("/")[0]
+
+
+def get_data_module_title(category: str) -> str:
+    """Lua data module mirroring a cargo table, ex. "component" -> "GameData/component"."""
+    return f"GameData/{category}"
+
+
+def get_module_page(module_title: str) -> str:
+    return f"Module:{module_title}"
+
+
+def get_navbox_template_title(navbox_type: str) -> str:
+    """Pre-rendered navbox, ex. "Item" -> "Navbox/Item"."""
+    return f"Navbox/{navbox_type}"
@@ -0,0 +1,172 @@
+"""Single pass parser of the templates used in wikitext, and position based edits of the parsed text.
+
+The text is scanned once for `{{`, `}}`, `{{{`, `}}}`, `[[`, `]]` and `|`, keeping a stack of the open constructs:
+nested templates get their own node, and only the `|` at the top level of a template separate its arguments
+(not the ones in nested templates, template parameters or links).
+
+Example Usage:
+
+    wikitext = parse_wikitext(page.text)
+    edits = [Edit(t.name_start, t.name_end, "Instruction_Top") for t in wikitext.templates if t.name == "Infobox"]
+    page.text = apply_edits(page.text, edits)
+"""
+
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+from desynced_wiki_scripts.util.logger import get_logger
+
+logger = get_logger()
+
+_TOKENS = re.compile(r"\{\{\{|\}\}\}|\{\{|\}\}|\[\[|\]\]|\|")
+
+TEMPLATE_START = "{{"
+TEMPLATE_END = "}}"
+
+_TEMPLATE = "template"
+_PARAMETER = "parameter"
+_LINK = "link"
+
+
+@dataclass
+class TemplateNode:
+    """A template call, positions are indexes in the parsed text."""
+
+    # Index of the opening "{{".
+    start: int
+    # Index after the closing "}}".
+    end: int = -1
+    # Name without whitespace (nor the "#anchor" part), empty for parser functions like {{#if:}}.
+    name: str = ""
+    name_start: int = -1
+    name_end: int = -1
+    # Indexes of the "|" separating the arguments of this template.
+    separators: list[int] = field(default_factory=list)
+    children: list["TemplateNode"] = field(default_factory=list)
+
+    @property
+    def arg_count(self) -> int:
+        return len(self.separators)
+
+    @property
+    def content_end(self) -> int:
+        """Index of the closing "}}"."""
+        return self.end - len(TEMPLATE_END)
+
+
+@dataclass
+class Edit:
+    """Replaces text[start:end] with `text`."""
+
+    start: int
+    end: int
+    text: str = ""
+
+
+class WikiText:
+    def __init__(self, content: str):
+        self.content = content
+        # Top level templates, in order.
+        self.roots: list[TemplateNode] = []
+        # Every template, nested ones included, in order of their start.
+        self.templates: list[TemplateNode] = []
+        self._parse()
+
+    def _parse(self):
+        content = self.content
+        # (kind, template node for templates)
+        stack: list[tuple[str, TemplateNode | None]] = []
+
+        def parent_children() -> list[TemplateNode]:
+            for kind, node in reversed(stack):
+                if kind == _TEMPLATE and node is not None:
+                    return node.children
+            return self.roots
+
+        pos = 0
+        while match := _TOKENS.search(content, pos):
+            token = match.group()
+            pos = match.end()
+            top = stack[-1][0] if stack else None
+
+            if token == "{{{":
+                stack.append((_PARAMETER, None))
+            elif token == "}}}" and top == _PARAMETER:
+                stack.pop()
+            elif token in ("}}}", "}}"):
+                # "}}}" closing a template followed by "}": only consume "}}".
+                pos = match.start() + len(TEMPLATE_END)
+                # Unclosed links inside a template end with it.
+                while stack and stack[-1][0] == _LINK:
+                    stack.pop()
+                if stack and stack[-1][0] == _TEMPLATE:
+                    node = stack.pop()[1]
+                    assert node is not None
+                    self._close(node, pos)
+                    parent_children().append(node)
+            elif token == "{{":
+                stack.append((_TEMPLATE, TemplateNode(start=match.start())))
+            elif token == "[[":
+                stack.append((_LINK, None))
+            elif token == "]]":
+                if top == _LINK:
+                    stack.pop()
+            elif token == "|" and top == _TEMPLATE:
+                node = stack[-1][1]
+                assert node is not None
+                node.separators.append(match.start())
+
+        # Unclosed templates are not templates, keep what they contain.
+        while stack:
+            kind, node = stack.pop()
+            if kind == _TEMPLATE and node is not None:
+                logger.debug(f"Unclosed template at {node.start}: '{content[node.start:node.start + 40]}'")
+                siblings = parent_children()
+                siblings.extend(node.children)
+                siblings.sort(key=lambda child: child.start)
+
+        self.templates = []
+        to_visit = list(reversed(self.roots))
+        while to_visit:
+            node = to_visit.pop()
+            self.templates.append(node)
+            to_visit.extend(reversed(node.children))
+
+    def _close(self, node: TemplateNode, end: int):
+        node.end = end
+        name_start = node.start + len(TEMPLATE_START)
+        raw_name = self.content[name_start : node.separators[0] if node.separators else node.content_end].split("#")[0]
+        node.name = raw_name.strip()
+        node.name_start = name_start + len(raw_name) - len(raw_name.lstrip())
+        node.name_end = node.name_start + len(node.name)
+
+    def template_names(self) -> list[str]:
+        """Names of every template, nested ones included, in order. Parser functions are skipped."""
+        return [node.name for node in self.templates if node.name]
+
+    def has_template(self, name: str) -> bool:
+        return any(node.name == name for node in self.templates)
+
+
+@lru_cache(maxsize=256)
+def parse_wikitext(content: str) -> WikiText:
+    """Parsed content, cached: the checks run on one page all share its parse. Do not modify the result."""
+    return WikiText(content)
+
+
+def apply_edits(content: str, edits: list[Edit]) -> str:
+    """Applies all the edits in one pass. Edit positions are in `content`, they must not overlap."""
+    if not edits:
+        return content
+
+    parts = []
+    pos = 0
+    for edit in sorted(edits, key=lambda e: (e.start, e.end)):
+        if edit.start < pos:
+            raise ValueError(f"Overlapping edit at {edit.start}, previous edit ends at {pos}")
+        parts.append(content[pos : edit.start])
+        parts.append(edit.text)
+        pos = edit.end
+    parts.append(content[pos:])
+    return "".join(parts)
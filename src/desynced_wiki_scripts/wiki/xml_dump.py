@@ -0,0 +1,61 @@
+"""Streams the pages of a MediaWiki XML export (Special:Export, or a dump file).
+
+The file is read incrementally, each <page> element is freed once read: memory stays flat on a full wiki dump.
+
+Example Usage:
+
+    for page in iter_dump_pages(Path("desynced-wiki.xml")):
+        print(page.title, len(page.text))
+"""
+
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator
+
+
+@dataclass
+class DumpPage:
+    title: str
+    namespace: int
+    # Text of the last revision in the dump.
+    text: str
+    revision_id: int = 0
+
+
+def _local_name(tag: str) -> str:
+    """Tag without the xml namespace, which changes with the export version. Ex. "{http://www.mediawiki.org/xml/export-0.11/}page" -> "page"."""
+    return tag.rsplit("}", 1)[-1]
+
+
+def _child_text(element: ET.Element, name: str) -> str | None:
+    for child in element:
+        if _local_name(child.tag) == name:
+            return child.text or ""
+    return None
+
+
+def iter_dump_pages(path: Path) -> Iterator[DumpPage]:
+    context = ET.iterparse(path, events=("start", "end"))
+    _, root = next(context)
+
+    for event, element in context:
+        if event != "end" or _local_name(element.tag) != "page":
+            continue
+
+        text = ""
+        revision_id = 0
+        for child in element:
+            if _local_name(child.tag) == "revision":
+                # Exports with history list every revision, oldest first.
+                text = _child_text(child, "text") or ""
+                revision_id = int(_child_text(child, "id") or 0)
+
+        yield DumpPage(
+            title=_child_text(element, "title") or "",
+            namespace=int(_child_text(element, "ns") or 0),
+            text=text,
+            revision_id=revision_id,
+        )
+        # Drop the pages already read.
+        root.clear()
@@ -0,0 +1,67 @@
+import unittest
+
+from desynced_wiki_scripts.wiki.cargo.cargo_emulator import CargoColumn, CargoEmulator, CargoQuery, parse_declaration, parse_storage_page
+
+DECLARATION = """<noinclude>
+[[Category:Data:TableDefinition]]
+{{#cargo_declare:
+_table=item
+|name = String
+|luaId = String
+|type = String (allowed values=Resource,Simple)
+|stackSize = Integer
+|unlockable = Boolean
+|tags = List (,) of String
+}}</noinclude>"""
+
+STORAGE_PAGE = """#REDIRECT [[Metal Ore]]
+[[Category:Data:Storage:item]]
+{{DISPLAYTITLE:Metal Ore}}<noinclude>
+{{DataItem
+|name = Metal Ore
+|luaId = metalore
+|stackSize = 
+}}{{DataTableIndex
+|storedTable=item
+|name=Metal Ore
+}}</noinclude>"""
+
+
+class TestCargoEmulator(unittest.TestCase):
+    def setUp(self):
+        self.cargo = CargoEmulator()
+        self.addCleanup(self.cargo.close)
+        table, columns = parse_declaration(DECLARATION)
+        self.cargo.create_table(table, columns)
+        self.cargo.create_table("usage", [CargoColumn("subject", "String"), CargoColumn("target", "String")])
+        with self.cargo.connection:
+            self.cargo.insert_rows(
+                "item",
+                [
+                    {"name": "Metal Ore", "luaId": "metalore", "type": "Resource", "stackSize": "20", "unlockable": "True", "tags": "a,bc"},
+                    {"name": "Metal Bar", "luaId": "metalbar", "type": "Simple", "stackSize": "5"},
+                ],
+            )
+            self.cargo.insert_rows("usage", [{"subject": "Metal Ore", "target": "Metal Bar"}])
+
+    def test_parse(self):
+        self.assertListEqual(parse_storage_page(STORAGE_PAGE), [("item", {"name": "Metal Ore", "luaId": "metalore"})])
+        self.assertEqual(parse_declaration(DECLARATION)[1][-1], CargoColumn("tags", "String", delimiter=","))
+
+    def test_typed_query(self):
+        rows = self.cargo.query(CargoQuery(tables="item=i", fields="i.name=itemName", where='stackSize > 10 AND unlockable = TRUE AND type = "resource"'))
+        self.assertListEqual(rows, [{"itemName": "Metal Ore"}])
+        self.assertListEqual(self.cargo.query(CargoQuery(tables="item", fields="name", where="tags HOLDS 'b'")), [])
+        self.assertListEqual(self.cargo.query(CargoQuery(tables="missing", fields="name")), [])
+
+    def test_join_order_limit(self):
+        query = CargoQuery(tables="item=i, usage=u", fields="i.name, u.target", join="i.name=u.subject", order_by="i.name", limit=1)
+        self.assertListEqual(self.cargo.query(query), [{"name": "Metal Bar", "target": None}])
+
+    def test_name_index_used(self):
+        plan = self.cargo.explain(CargoQuery(tables="item", fields="luaId", where="name = 'Metal Ore'"))
+        self.assertIn("USING INDEX item_name", " ".join(plan))
+
+
+if __name__ == "__main__":
+    unittest.main()
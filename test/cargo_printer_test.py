@@ -158,6 +158,19 @@ class TestDataclassPrinter(unittest.TestCase):
         # Field is skipped so should be empty.
         self.assertListEqual(output, [])
 
+    def test_delimited_list(self):
+        @desynced_object
+        class WithDelimitedList:
+            tags: List[str] = annotate(ListFieldOptions(delimiter=","))
+
+        obj = WithDelimitedList(tags=["a", "b"])
+        type_info = analyze_type(WithDelimitedList)
+        self.assertListEqual(CargoPrinter().print_dataclass(obj, type_info), ["|tags = a,b"])
+        self.assertListEqual(
+            CargoPrinter(mode=CargoPrinter.Mode.DECLARATIONS).print_dataclass(None, type_info),
+            ["|tags = List (,) of String"],
+        )
+
 
 class TestDataclassDeclarationPrinter(unittest.TestCase):
     def test_analyze_simple_dataclass(self):
@@ -173,5 +186,49 @@ class TestDataclassDeclarationPrinter(unittest.TestCase):
         )
 
 
+@desynced_object
+class Ingredient:
+    ingredient: str
+    amount: int
+
+
+@desynced_object
+class WithLists:
+    name: str
+    tags: List[str] = annotate(ListFieldOptions(max_length=3))
+    ingredients: List[Ingredient] = annotate(ListFieldOptions(max_length=3))
+
+
+class TestNormalizedListsPrinter(unittest.TestCase):
+
+    def test_lists_left_out_of_owner(self):
+        obj = WithLists(name="Bob", tags=["a"], ingredients=[])
+        output = CargoPrinter(normalize_lists=True).print_dataclass(obj, analyze_type(WithLists))
+        self.assertListEqual(output, ["|name = Bob"])
+
+    def test_child_table_names(self):
+        children = CargoPrinter().child_tables(analyze_type(WithLists))
+        self.assertListEqual([child.name for child in children], ["withListsTags", "ingredient"])
+
+    def test_child_declaration(self):
+        child = CargoPrinter().child_tables(analyze_type(WithLists))[1]
+        self.assertListEqual(
+            CargoPrinter(mode=CargoPrinter.Mode.DECLARATIONS).print_child_declaration(child),
+            ["|owner = String", "|ownerTable = String", "|listIndex = Integer", "|ingredient = String", "|amount = Integer"],
+        )
+
+    def test_child_rows(self):
+        obj = WithLists(name="Bob", tags=["a", "b"], ingredients=[Ingredient("Ore", 2)])
+        rows = CargoPrinter().print_child_rows(obj, analyze_type(WithLists), "Bob", "owner")
+        self.assertListEqual(
+            [(child.name, lines) for child, lines in rows],
+            [
+                ("withListsTags", ["|owner = Bob", "|ownerTable = owner", "|listIndex = 1", "|tags = a"]),
+                ("withListsTags", ["|owner = Bob", "|ownerTable = owner", "|listIndex = 2", "|tags = b"]),
+                ("ingredient", ["|owner = Bob", "|ownerTable = owner", "|listIndex = 1", "|ingredient = Ore", "|amount = 2"]),
+            ],
+        )
+
+
 if __name__ == "__main__":
     unittest.main()
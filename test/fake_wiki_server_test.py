@@ -0,0 +1,87 @@
+import json
+import unittest
+import urllib.parse
+import urllib.request
+
+from desynced_wiki_scripts.wiki.fake_wiki_server import FAKE_TOKEN, FakeWikiApi, FakeWikiConfig, FakeWikiServer, FakeWikiState
+
+
+class TestFakeWikiApi(unittest.TestCase):
+    def setUp(self):
+        self.state = FakeWikiState()
+        self.api = FakeWikiApi(self.state, FakeWikiConfig(username="Bot", password="secret"))
+
+    def test_login(self):
+        self.assertEqual(self.api.handle({"action": "clientlogin", "username": "Bot", "password": "nope"})["clientlogin"]["status"], "FAIL")
+        self.assertEqual(self.api.handle({"action": "clientlogin", "username": "Bot@tools", "password": "secret"})["clientlogin"]["status"], "PASS")
+        userinfo = self.api.handle({"action": "query", "meta": "userinfo", "formatversion": "2"})["query"]["userinfo"]
+        self.assertEqual(userinfo["name"], "Bot")
+
+    def test_edit_query_delete(self):
+        edit = {"action": "edit", "title": "metal_Ore", "text": "{{Infobox}}", "token": FAKE_TOKEN}
+        self.assertIn("new", self.api.handle(edit)["edit"])
+        self.assertIn("nochange", self.api.handle(edit)["edit"])
+        self.assertEqual(self.api.handle(edit | {"token": "bad"})["error"]["code"], "badtoken")
+
+        query = {"action": "query", "prop": "revisions", "rvprop": "ids|content", "titles": "Metal Ore|Missing"}
+        pages = self.api.handle(query)["query"]["pages"]
+        self.assertEqual(pages["1"]["revisions"][0]["slots"]["main"]["*"], "{{Infobox}}")
+        self.assertIn("missing", pages["-1"])
+        pages = self.api.handle(query | {"formatversion": "2"})["query"]["pages"]
+        self.assertEqual(pages[0]["revisions"][0]["slots"]["main"]["content"], "{{Infobox}}")
+
+        self.api.handle({"action": "delete", "title": "Metal Ore", "token": FAKE_TOKEN})
+        self.assertNotIn("Metal Ore", self.state.pages)
+        changes = self.api.handle({"action": "query", "list": "recentchanges", "rcdir": "newer"})["query"]["recentchanges"]
+        self.assertEqual([c["type"] for c in changes], ["new", "log"])
+
+    def test_category_members_continue(self):
+        for index in range(3):
+            self.state.save(f"Data:item:Ore {index}", "[[Category:Data:Storage:item]]", "Bot")
+        self.state.save("Ore", "{{Data:item:Ore 0}} [[Category:Data:Storage:item]]", "Bot")
+
+        query = {"action": "query", "list": "categorymembers", "cmtitle": "Category:Data:Storage:item", "cmnamespace": "3000", "cmlimit": "2"}
+        response = self.api.handle(query)
+        self.assertEqual([page["title"] for page in response["query"]["categorymembers"]], ["Data:Item:Ore 0", "Data:Item:Ore 1"])
+        response = self.api.handle(query | response["continue"])
+        self.assertEqual([page["title"] for page in response["query"]["categorymembers"]], ["Data:Item:Ore 2"])
+        self.assertNotIn("continue", response)
+
+    def test_purge(self):
+        self.state.save("Metal Ore", "x", "Bot")
+        response = self.api.handle({"action": "purge", "titles": "metal_Ore|Missing", "forcelinkupdate": "1"})
+        self.assertEqual(response["purge"][0], {"ns": 0, "title": "Metal Ore", "purged": "", "linkupdate": ""})
+        self.assertIn("missing", response["purge"][1])
+        self.assertEqual(self.state.purged, ["Metal Ore"])
+
+    def test_maxlag_and_writes_must_be_posted(self):
+        api = FakeWikiApi(self.state, FakeWikiConfig(maxlag_every=2))
+        responses = [api.handle({"action": "query", "meta": "siteinfo", "maxlag": "5"}) for _ in range(4)]
+        self.assertEqual(["error" in r for r in responses], [False, True, False, True])
+        self.assertEqual(api.handle({"action": "edit"}, method="GET")["error"]["code"], "mustbeposted")
+
+    def test_paraminfo(self):
+        modules = self.api.handle({"action": "paraminfo", "modules": "query|query+revisions|edit|nope"})["paraminfo"]["modules"]
+        self.assertIn("generator", [p["name"] for p in modules[0]["parameters"]])
+        self.assertEqual(modules[1]["prefix"], "rv")
+        self.assertIn("mustbeposted", modules[2])
+        self.assertIn("missing", modules[3])
+
+
+class TestFakeWikiServer(unittest.TestCase):
+    def test_http(self):
+        server = FakeWikiServer(FakeWikiConfig())
+        server.start()
+        try:
+            body = urllib.parse.urlencode({"action": "edit", "title": "Page", "text": "x", "token": FAKE_TOKEN, "format": "json"}).encode()
+            with urllib.request.urlopen(server.api_url, data=body) as response:
+                self.assertEqual(json.load(response)["edit"]["result"], "Success")
+            with urllib.request.urlopen(f"{server.api_url}?action=query&titles=Page&prop=info&format=json") as response:
+                self.assertEqual(json.load(response)["query"]["pages"]["1"]["lastrevid"], 1)
+        finally:
+            server.stop()
+        self.assertEqual(server.state.counts["edit"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
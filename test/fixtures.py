@@ -0,0 +1,38 @@
+"""Builders of the game models shared by the tests."""
+
+from desynced_wiki_scripts.models.recipe import Recipe, RecipeItem, RecipeType
+from desynced_wiki_scripts.models.recipe_usage import RecipeUsage, UsageRelation
+from desynced_wiki_scripts.models.tech import Technology
+from desynced_wiki_scripts.wiki.data_categories import DataCategory
+
+
+def make_tech(
+    name: str,
+    required_tech: list[str] | None = None,
+    progress_count: int = 1,
+    items: list[RecipeItem] | None = None,
+    lua_id: str | None = None,
+) -> Technology:
+    return Technology(
+        name=name,
+        lua_id=lua_id or f"t_{name.lower()}",
+        description="",
+        category="Robot",
+        texture="",
+        progress_count=progress_count,
+        recipe=Recipe(RecipeType.NONE, 1, items or [], []),
+        required_tech=required_tech or [],
+    )
+
+
+def usage(subject: str, relation: UsageRelation, target: str) -> RecipeUsage:
+    return RecipeUsage(
+        name=f"{subject}_{relation.value}_{target}",
+        subject=subject,
+        relation=relation,
+        target=target,
+        target_table=DataCategory.item,
+        recipe_type=RecipeType.PRODUCTION,
+        amount=1,
+        time=1.0,
+    )
@@ -0,0 +1,68 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from desynced_wiki_scripts.analysis.game_snapshot import SnapshotStore, diff_snapshots, take_snapshot
+from desynced_wiki_scripts.cli_tools.change_set import ChangeSet
+from desynced_wiki_scripts.models.tech import Technology
+from desynced_wiki_scripts.wiki.data_categories import DataCategory
+from desynced_wiki_scripts.wiki.data_tables import TableData
+
+from fixtures import make_tech
+
+
+def snapshot(*techs: Technology):
+    return take_snapshot({DataCategory.tech: TableData(Technology, list(techs))})
+
+
+class TestGameSnapshot(unittest.TestCase):
+    def test_diff(self):
+        old = snapshot(make_tech("Robotics"), make_tech("Old"), make_tech("Lasers"))
+        new = snapshot(make_tech("Robotics"), make_tech("Lasers II", lua_id="t_lasers"), make_tech("New", progress_count=5))
+        new["tech"]["t_robotics"].fields["progressCount"] = 3
+
+        diff = diff_snapshots(old, new).tables[DataCategory.tech]
+        self.assertEqual(diff.added, ["New"])
+        self.assertEqual(diff.removed, ["Old"])
+        self.assertEqual(diff.renamed, [("Lasers", "Lasers II")])
+        self.assertEqual(diff.changed["Robotics"], ["progressCount"])
+        self.assertEqual(diff.updated_names(), {"New", "Lasers II", "Robotics"})
+
+    def test_no_change(self):
+        diff = diff_snapshots(snapshot(make_tech("Robotics")), snapshot(make_tech("Robotics")))
+        self.assertFalse(diff.tables[DataCategory.tech])
+
+    def test_store(self):
+        with tempfile.TemporaryDirectory() as directory:
+            store = SnapshotStore(Path(directory) / "snapshots.sqlite")
+            first = snapshot(make_tech("Robotics"))
+            store.save("1", first)
+            store.save("2", snapshot(make_tech("Robotics", progress_count=2)))
+            # Saving a version again replaces it, and keeps its place.
+            store.save("1", first)
+            self.assertEqual(store.versions(), ["1", "2"])
+            self.assertEqual(store.previous_version("2"), "1")
+            self.assertIsNone(store.previous_version("1"))
+            self.assertEqual(store.load("1"), first)
+            self.assertTrue(diff_snapshots(store.load("1"), store.load("2")).tables["tech"].changed)
+            with self.assertRaises(KeyError):
+                store.load("3")
+            store.close()
+
+
+class TestChangeSet(unittest.TestCase):
+    def test_write_read(self):
+        changes = ChangeSet()
+        changes.add(DataCategory.item, "Metal Ore")
+        changes.add(DataCategory.tech, "Robotics")
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "changes.json"
+            changes.write(path)
+            read = ChangeSet.read(path)
+        self.assertEqual(len(read), 2)
+        self.assertTrue(read.contains(DataCategory.item, "Metal Ore"))
+        self.assertFalse(read.contains(DataCategory.tech, "Metal Ore"))
+
+
+if __name__ == "__main__":
+    unittest.main()
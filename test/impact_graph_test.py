@@ -0,0 +1,56 @@
+import unittest
+from types import SimpleNamespace
+
+from desynced_wiki_scripts.analysis.impact_graph import ImpactGraph
+from desynced_wiki_scripts.models.component import Component
+from desynced_wiki_scripts.models.item import Item
+from desynced_wiki_scripts.models.recipe_usage import RecipeUsage, UsageRelation
+from desynced_wiki_scripts.models.tech import Technology, TechnologyUnlock
+from desynced_wiki_scripts.wiki.data_categories import DataCategory
+from desynced_wiki_scripts.wiki.data_tables import TableData
+
+from fixtures import make_tech, usage
+
+
+class TestImpactGraph(unittest.TestCase):
+    def setUp(self):
+        # Only names are read from the objects of page tables.
+        items = [SimpleNamespace(name=name) for name in ("Metal Ore", "Metal Bar", "Crystal", "Circuit/Board")]
+        usages = [
+            usage("Metal Ore", UsageRelation.INGREDIENT, "Metal Bar"),
+            usage("Fabricator", UsageRelation.PRODUCER, "Metal Bar"),
+            usage("Metal Bar", UsageRelation.INGREDIENT, "Circuit/Board"),
+        ]
+        unlock = TechnologyUnlock(tech_name="Robotics", unlocks="Fabricator", name="Robotics_Fabricator")
+        self.graph = ImpactGraph.from_tables(
+            {
+                DataCategory.item: TableData(Item, items),
+                DataCategory.component: TableData(Component, [SimpleNamespace(name="Fabricator")]),
+                DataCategory.recipeUsage: TableData(RecipeUsage, usages),
+                DataCategory.tech: TableData(Technology, [make_tech("Robotics", []), make_tech("Lasers", ["Robotics"])]),
+                DataCategory.techUnlock: TableData(TechnologyUnlock, [unlock]),
+            }
+        )
+
+    def test_recipe_neighbours(self):
+        pages = self.graph.affected_pages([(DataCategory.item, "Metal Bar")])
+        # Its ingredient, its producer and what it is an ingredient of, not the ingredients of those.
+        self.assertEqual(pages, {"Metal Bar", "Metal Ore", "Fabricator", "Circuit_Board"})
+
+    def test_techs(self):
+        pages = self.graph.affected_pages([(DataCategory.tech, "Robotics")])
+        self.assertEqual(pages, {"Technology/Robotics", "Technology/Lasers", "Fabricator"})
+        pages = self.graph.affected_pages([(DataCategory.techUnlock, "Robotics_Fabricator")])
+        self.assertEqual(pages, {"Technology/Robotics", "Fabricator"})
+
+    def test_derived_rows_and_unknown_objects(self):
+        pages = self.graph.affected_pages([(DataCategory.recipeUsage, "Metal Ore_Ingredient_Metal Bar"), (DataCategory.item, "Removed")])
+        self.assertEqual(pages, {"Metal Ore", "Metal Bar"})
+        self.assertEqual(self.graph.affected_pages([(DataCategory.item, "Crystal")]), {"Crystal"})
+
+    def test_data_page_titles(self):
+        self.assertEqual(self.graph.data_page_titles()["Data:item:Circuit_Board"], (DataCategory.item, "Circuit/Board"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,30 @@
+import os
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+
+SRC_DIR = Path(__file__).parents[1] / "src"
+CLI_MODULES = sorted(f"desynced_wiki_scripts.{path.stem}" for path in (SRC_DIR / "desynced_wiki_scripts").glob("cli_*.py"))
+
+# Only imported by the code using them: a CLI starts without them (ex. for --help).
+HEAVY_MODULES = {"pywikibot", "jinja2", "steam", "requests"}
+
+
+def imported_modules(module: str) -> set[str]:
+    """Top-level names of the modules loaded by importing `module` in a fresh interpreter."""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([str(SRC_DIR), os.environ.get("PYTHONPATH", "")]))
+    code = f"import sys, {module}; print(*sys.modules, sep='\\n')"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=env, check=True)
+    return {name.partition(".")[0] for name in result.stdout.splitlines()}
+
+
+class TestLazyImports(unittest.TestCase):
+    def test_cli_modules(self):
+        for module in CLI_MODULES:
+            with self.subTest(module):
+                self.assertFalse(HEAVY_MODULES & imported_modules(module))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,32 @@
+import unittest
+
+from desynced_wiki_scripts.models.decorators import desynced_object
+from desynced_wiki_scripts.wiki.lua_data import render_data_module, to_lua, to_rows
+
+
+@desynced_object
+class Row:
+    name: str
+    lua_id: str
+    count: int
+    rate: float
+    unlockable: bool
+
+
+class TestLuaData(unittest.TestCase):
+    def test_to_rows_typed_and_sparse(self):
+        rows = to_rows(Row, [Row("Metal Ore", "metalore", 0, 1.5, True)])
+        # Empty fields (here 0) are left out, like cargo returns them empty.
+        self.assertListEqual(rows, [{"name": "Metal Ore", "luaId": "metalore", "rate": 1.5, "unlockable": True}])
+
+    def test_to_lua(self):
+        self.assertEqual(to_lua({"end": 'a "b"', "x": [1, False]}), '{\n  ["end"] = "a \\"b\\"",\n  x = {\n    1,\n    false,\n  },\n}')
+
+    def test_render_data_module(self):
+        module = render_data_module("item", [{"name": "B", "luaId": "b"}, {"name": "A"}])
+        self.assertIn('nameByLuaId = {\n    b = "B",\n  }', module)
+        self.assertIn('names = {\n    "A",\n    "B",\n  }', module)
+
+
+if __name__ == "__main__":
+    unittest.main()
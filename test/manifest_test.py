@@ -0,0 +1,35 @@
+import unittest
+
+from desynced_wiki_scripts.cli_tools.manifest import Manifest
+
+
+class TestManifest(unittest.TestCase):
+    def test_renames_by_key(self):
+        previous = Manifest({"item": {"metalore": "Metal Ore", "crystal": "Crystal"}})
+        manifest = previous.update({"item": {"metalore": "Raw Metal Ore", "crystal": "Crystal", "silica": "Silica"}})
+        self.assertEqual(manifest.renames, {"item": {"Metal Ore": "Raw Metal Ore"}})
+        self.assertEqual(manifest.files["item"]["silica"], "Silica")
+
+    def test_pending_renames_kept(self):
+        first = Manifest({"item": {"metalore": "Metal Ore"}}).update({"item": {"metalore": "Raw Metal Ore"}})
+        # Generated again before moving the pages, then renamed again.
+        second = first.update({"item": {"metalore": "Raw Metal Ore"}})
+        self.assertEqual(second.renames, {"item": {"Metal Ore": "Raw Metal Ore"}})
+        third = second.update({"item": {"metalore": "Ore"}})
+        self.assertEqual(third.renames, {"item": {"Metal Ore": "Ore", "Raw Metal Ore": "Ore"}})
+
+    def test_name_taken_by_another_object(self):
+        first = Manifest({"item": {"metalore": "Metal Ore"}}).update({"item": {"metalore": "Raw Metal Ore"}})
+        second = first.update({"item": {"metalore": "Raw Metal Ore", "metalore2": "Metal Ore"}})
+        self.assertEqual(second.renames, {})
+
+    def test_other_tables_kept(self):
+        first = Manifest({"item": {"metalore": "Metal Ore"}, "tech": {"t_robotics": "Robotics"}}).update({"item": {"metalore": "Ore"}})
+        second = first.update({"tech": {"t_robotics": "Robots"}})
+        self.assertEqual(second.files["item"], {"metalore": "Ore"})
+        self.assertEqual(second.renames, {"item": {"Metal Ore": "Ore"}, "tech": {"Robotics": "Robots"}})
+        self.assertEqual(Manifest.from_json(second.to_json()), second)
+
+
+if __name__ == "__main__":
+    unittest.main()
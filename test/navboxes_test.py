@@ -0,0 +1,34 @@
+import unittest
+
+from desynced_wiki_scripts.wiki.navboxes import NavboxCategory, NavboxType, categorize, render_navbox
+
+FILTERS = [
+    {"name": "Units", "tab": "frame", "filterField": "size", "filterVal": "Unit", "ordering": 1},
+    {"name": "Buildings", "tab": "frame", "filterField": "size", "filterVal": "Small", "ordering": 2},
+]
+
+
+class TestNavboxes(unittest.TestCase):
+    def test_bots(self):
+        entities = [
+            {"name": "Worker", "size": "Unit", "race": "Robot", "unlockable": True, "recipeType": "production"},
+            {"name": "Bee", "size": "Unit", "slotType": "Drone", "unlockable": True, "recipeType": "production"},
+            {"name": "Locked", "size": "Unit", "race": "Robot", "recipeType": "production"},
+            {"name": "Factory", "size": "Small", "unlockable": True, "recipeType": "construction"},
+            {"name": "Bug", "size": "Unit", "race": "Virus"},
+        ]
+        self.assertListEqual(
+            categorize(NavboxType.BOT, FILTERS, entities),
+            [NavboxCategory("Drone", 1, ["Bee"]), NavboxCategory("Robot", 1, ["Worker"]), NavboxCategory("Bugs", 999, ["Bug"])],
+        )
+        self.assertListEqual(categorize(NavboxType.BUILDING, FILTERS, entities), [NavboxCategory("Buildings", 2, ["Factory"])])
+
+    def test_render_is_stable(self):
+        content = render_navbox(NavboxType.BOT, [NavboxCategory("Robot", 1, ["Worker"])])
+        self.assertIn("{{NavboxIconLinkNamed|name=Worker}}", content)
+        # Uploads compare the content: the same categories render the same page.
+        self.assertEqual(content, render_navbox(NavboxType.BOT, [NavboxCategory("Robot", 1, ["Worker"])]))
+
+
+if __name__ == "__main__":
+    unittest.main()
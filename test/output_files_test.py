@@ -0,0 +1,40 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from desynced_wiki_scripts.cli_tools.output_files import OutputFiles
+
+FILES = {
+    "Data/item/Metal Ore": "{{DataItem}}",
+    "Module/GameData/item": "return {}",
+    "Template/item": "{{Declare}}",
+}
+
+
+class TestOutputFiles(unittest.TestCase):
+    def check(self, output: OutputFiles):
+        self.assertEqual(output.paths("Data"), ["item/Metal Ore"])
+        self.assertEqual(output.paths("Module"), ["GameData/item"])
+        self.assertEqual(output.paths("Navbox"), [])
+        self.assertEqual(output.read("Template/item"), "{{Declare}}")
+
+    def test_directory(self):
+        with tempfile.TemporaryDirectory() as directory:
+            root = Path(directory)
+            for path, content in FILES.items():
+                (root / path).parent.mkdir(parents=True, exist_ok=True)
+                (root / path).write_text(content, encoding="utf-8")
+            output = OutputFiles(root)
+            # Already on disk, not kept.
+            output.record("Data/item/Other", "")
+            self.check(output)
+
+    def test_in_memory(self):
+        output = OutputFiles(Path("missing"), in_memory=True)
+        for path, content in FILES.items():
+            output.record(path, content)
+        self.check(output)
+
+
+if __name__ == "__main__":
+    unittest.main()
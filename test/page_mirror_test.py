@@ -0,0 +1,79 @@
+import unittest
+from datetime import UTC, datetime, timedelta
+
+from desynced_wiki_scripts.wiki.page_mirror import MirroredPage, MirrorSync, PageMirror
+
+
+def pagedict(title: str, revid: int, content: str) -> dict:
+    return {
+        "pageid": revid * 10,
+        "ns": 0,
+        "title": title,
+        "revisions": [{"revid": revid, "sha1": f"sha{revid}", "timestamp": "2026-01-01T00:00:00Z", "slots": {"main": {"*": content}}}],
+    }
+
+
+class FakeWiki:
+    """Answers the mirror requests from a dict of pages."""
+
+    def __init__(self):
+        self.pages: dict[str, dict] = {}
+        self.changes: list[dict] = []
+        self.fetched: list[list[str]] = []
+
+    def query_page_revisions(self, titles: list[str]) -> list[dict]:
+        self.fetched.append(titles)
+        return [self.pages.get(title, {"ns": 0, "title": title, "missing": ""}) for title in titles]
+
+    def recent_changes(self, since: datetime) -> list[dict]:
+        return self.changes
+
+
+class TestPageMirror(unittest.TestCase):
+    def setUp(self):
+        self.mirror = PageMirror(":memory:")
+        self.addCleanup(self.mirror.close)
+        self.wiki = FakeWiki()
+        self.wiki.pages = {"Metal Ore": pagedict("Metal Ore", 1, "{{Infobox}}"), "Old": pagedict("Old", 2, "old")}
+        self.sync = MirrorSync(self.mirror, self.wiki)
+
+    def test_pagedict_round_trip(self):
+        page = MirroredPage.from_pagedict(pagedict("Metal Ore", 1, "{{Infobox}}"))
+        self.assertEqual((page.pageid, page.revid, page.content), (10, 1, "{{Infobox}}"))
+        self.assertEqual(MirroredPage.from_pagedict(page.to_pagedict() | {"title": "Metal Ore"}), page)
+        missing = MirroredPage.from_pagedict({"ns": 0, "title": "Nope", "missing": ""})
+        self.assertFalse(missing.exists)
+        self.assertIn("missing", missing.to_pagedict())
+        self.assertIn("redirect", MirroredPage("Ore", 1, content="#REDIRECT [[Metal Ore]]").to_pagedict())
+
+    def test_refresh_only_fetches_missing_and_stale(self):
+        now = datetime(2026, 1, 10, tzinfo=UTC)
+        self.sync.sync_recent_changes(now)
+        self.assertEqual(self.sync.refresh(["Metal Ore", "Old", "Nope"]), 3)
+        self.assertFalse(self.mirror.get("Nope").exists)
+        self.assertEqual(self.sync.refresh(["Metal Ore", "Old", "Nope"]), 0)
+
+        self.wiki.pages["Old"] = pagedict("Old", 3, "new")
+        self.wiki.changes = [{"type": "edit", "title": "Old"}, {"type": "log", "title": "Moved", "logparams": {"target_title": "Nope"}}]
+        self.assertEqual(self.sync.sync_recent_changes(now + timedelta(days=1)), 2)
+        self.assertEqual(self.sync.refresh(["Metal Ore", "Old", "Nope"]), 2)
+        self.assertEqual(self.wiki.fetched[-1], ["Old", "Nope"])
+        self.assertEqual(self.mirror.get("Old").content, "new")
+        self.assertEqual(self.mirror.last_sync, now + timedelta(days=1))
+
+    def test_too_old_sync_refreshes_everything(self):
+        now = datetime(2026, 1, 10, tzinfo=UTC)
+        self.sync.sync_recent_changes(now)
+        self.sync.refresh(["Metal Ore"])
+        self.sync.sync_recent_changes(now + timedelta(days=365))
+        self.assertEqual(self.sync.refresh(["Metal Ore"]), 1)
+
+    def test_mark_stale_after_write(self):
+        self.sync.refresh(["Metal Ore"])
+        self.mirror.mark_stale(["Metal Ore"])
+        self.assertEqual(self.mirror.fresh_titles(["Metal Ore"]), set())
+        self.assertEqual(len(self.mirror), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+
+from desynced_wiki_scripts.cli_tools.processor import PageProcessor, run_processors
+from desynced_wiki_scripts.wiki.data_categories import DataCategory
+
+
+class FakePage:
+    def __init__(self, title: str, text: str):
+        self._title = title
+        self.text = text
+
+    def title(self) -> str:
+        return self._title
+
+
+class Append(PageProcessor):
+    def __init__(self, suffix: str, summary: str = ""):
+        self.suffix = suffix
+        self.summary = summary
+        self.seen: list[str] = []
+
+    def process_page(self, category, page, file_content) -> bool:
+        self.seen.append(page.text)
+        page.text += self.suffix
+        return True
+
+
+class Upload(PageProcessor):
+    """A change that is not in the page text."""
+
+    summary = "Upload"
+
+    def should_process_page(self, category, page) -> bool:
+        return category == DataCategory.item
+
+    def process_page(self, category, page, file_content) -> bool:
+        return True
+
+
+class TestRunProcessors(unittest.TestCase):
+    def test_edits_are_chained(self):
+        first, second = Append("a", "First"), Append("b", "Second")
+        page = FakePage("Metal Ore", "")
+        made_change, summaries = run_processors([first, Upload(), second], DataCategory.item, page, "")
+        self.assertTrue(made_change)
+        self.assertEqual(page.text, "ab")
+        # Each processor sees the text edited by the previous ones.
+        self.assertEqual(second.seen, ["a"])
+        # Only text changes are in the summary of the single save.
+        self.assertEqual(summaries, ["First", "Second"])
+
+    def test_skipped_processors(self):
+        page = FakePage("Metal Ore", "x")
+        self.assertEqual(run_processors([Upload()], DataCategory.entity, page, ""), (False, []))
+
+
+if __name__ == "__main__":
+    unittest.main()
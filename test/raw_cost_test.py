@@ -0,0 +1,52 @@
+import unittest
+
+from desynced_wiki_scripts.analysis.raw_cost import RawCostCalculator
+from desynced_wiki_scripts.analysis.recipe_graph import RecipeGraph
+from desynced_wiki_scripts.models.raw_cost import RawCostProducer, RawResource
+from desynced_wiki_scripts.models.recipe import Recipe, RecipeItem, RecipeProducer, RecipeType
+
+
+def production(items: dict[str, int], producers: dict[str, float], num_produced: int = 1) -> Recipe:
+    return Recipe(
+        recipe_type=RecipeType.PRODUCTION,
+        num_produced=num_produced,
+        items=[RecipeItem(name, amount) for name, amount in items.items()],
+        producers=[RecipeProducer(name, time) for name, time in producers.items()],
+    )
+
+
+class TestRawCost(unittest.TestCase):
+    def test_rolls_up_to_raw_resources(self):
+        graph = RecipeGraph(
+            {
+                "Bar": production({"Ore": 1}, {"Fabricator": 2.0, "Assembler": 1.0}),
+                "Plate": production({"Bar": 3, "Crystal": 1}, {"Fabricator": 4.0}, num_produced=2),
+                "Frame": production({"Bar": 5, "Plate": 2}, {"Fabricator": 8.0}),
+            }
+        )
+        cost = RawCostCalculator(graph).raw_cost("Frame")
+
+        self.assertListEqual(cost.raw_resources, [RawResource("Crystal", 1.0), RawResource("Ore", 8.0)])
+        # 8s + 5 bars at 1s + 2 plates at (4s / 2 + 1.5 bars at 1s)
+        self.assertEqual(cost.total_time, 20.0)
+        self.assertListEqual(cost.producers, [RawCostProducer("Fabricator", 20.0)])
+
+    def test_compute_all_skips_raw_resources(self):
+        graph = RecipeGraph({"Bar": production({"Ore": 1}, {"Fabricator": 2.0})})
+        self.assertListEqual([cost.name for cost in RawCostCalculator(graph).compute_all()], ["Bar"])
+
+    def test_cycle_is_broken(self):
+        graph = RecipeGraph(
+            {
+                "A": production({"B": 1}, {"Fabricator": 1.0}),
+                "B": production({"A": 1, "Ore": 1}, {"Fabricator": 1.0}),
+            }
+        )
+        with self.assertLogs("DesyncedWiki", level="WARNING"):
+            cost = RawCostCalculator(graph).raw_cost("A")
+
+        self.assertListEqual(cost.raw_resources, [RawResource("A", 1.0), RawResource("Ore", 1.0)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import unittest
+from types import SimpleNamespace
+
+from desynced_wiki_scripts.lua.game_data import GameData
+from desynced_wiki_scripts.models.item import MiningRecipe
+from desynced_wiki_scripts.models.recipe import Recipe, RecipeItem, RecipeProducer, RecipeType
+from desynced_wiki_scripts.models.recipe_usage import RecipeUsage, UsageRelation
+from desynced_wiki_scripts.wiki.lua_data import to_rows
+
+
+def recipe(recipe_type: RecipeType, items: dict[str, int], producers: dict[str, float]) -> Recipe:
+    return Recipe(
+        recipe_type=recipe_type,
+        num_produced=1,
+        items=[RecipeItem(name, amount) for name, amount in items.items()],
+        producers=[RecipeProducer(name, time) for name, time in producers.items()],
+    )
+
+
+def item(name: str, production_recipe: Recipe, mining_recipes: list[MiningRecipe] | None = None) -> SimpleNamespace:
+    return SimpleNamespace(name=name, production_recipe=production_recipe, mining_recipes=mining_recipes or [])
+
+
+NO_RECIPE = recipe(RecipeType.NONE, {}, {})
+
+
+class TestRecipeIndexes(unittest.TestCase):
+    def setUp(self):
+        # Only the recipes are read by the indexes, no need for the lua game data.
+        self.game = GameData.__new__(GameData)
+        self.game.entities = [
+            # Construction recipes have a placeholder producer.
+            SimpleNamespace(name="Factory", recipe=recipe(RecipeType.CONSTRUCTION, {"Metal Plate": 5}, {"Construction": 10.0}))
+        ]
+        self.game.components = [SimpleNamespace(name=name, production_recipe=NO_RECIPE) for name in ("Fabricator", "Smelter", "Miner")]
+        self.game.items = [
+            item("Metal Ore", NO_RECIPE, [MiningRecipe("Miner", 2.5)]),
+            item("Metal Bar", recipe(RecipeType.PRODUCTION, {"Metal Ore": 2}, {"Fabricator": 5.0, "Smelter": 3.0})),
+            item("Metal Plate", recipe(RecipeType.PRODUCTION, {"Metal Bar": 1}, {"Fabricator": 4.0})),
+        ]
+        self.game.technologies = []
+        self.game._build_recipe_indexes()
+
+    def test_indexes(self):
+        def targets(usages: list[RecipeUsage]) -> list[tuple[str, str]]:
+            return [(usage.target_table, usage.target) for usage in usages]
+
+        self.assertEqual(
+            {subject: targets(usages) for subject, usages in self.game.ingredient_to_consumers.items()},
+            {"Metal Plate": [("entity", "Factory")], "Metal Ore": [("item", "Metal Bar")], "Metal Bar": [("item", "Metal Plate")]},
+        )
+        # Several producers of one item, and no placeholder producer of construction recipes.
+        self.assertEqual(
+            {subject: targets(usages) for subject, usages in self.game.producer_to_products.items()},
+            {"Fabricator": [("item", "Metal Bar"), ("item", "Metal Plate")], "Smelter": [("item", "Metal Bar")]},
+        )
+        self.assertEqual(self.game.miner_to_resources["Miner"][0].time, 2.5)
+        self.assertEqual(self.game.ingredient_to_consumers["Metal Plate"][0].recipe_type, RecipeType.CONSTRUCTION)
+
+    def test_exported_rows(self):
+        rows = to_rows(RecipeUsage, self.game.recipe_usages)
+
+        # Unset amounts, times and recipe types are left empty.
+        production = {"targetTable": "item", "recipeType": "production"}
+        self.assertEqual(
+            rows,
+            [
+                {
+                    "subject": "Metal Plate",
+                    "relation": "Ingredient",
+                    "target": "Factory",
+                    "targetTable": "entity",
+                    "recipeType": "construction",
+                    "amount": 5,
+                },
+                {"subject": "Metal Ore", "relation": "Ingredient", "target": "Metal Bar", **production, "amount": 2},
+                {"subject": "Metal Bar", "relation": "Ingredient", "target": "Metal Plate", **production, "amount": 1},
+                {"subject": "Fabricator", "relation": "Producer", "target": "Metal Bar", **production, "time": 5.0},
+                {"subject": "Fabricator", "relation": "Producer", "target": "Metal Plate", **production, "time": 4.0},
+                {"subject": "Smelter", "relation": "Producer", "target": "Metal Bar", **production, "time": 3.0},
+                {"subject": "Miner", "relation": "Miner", "target": "Metal Ore", "targetTable": "item", "time": 2.5},
+            ],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import csv
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from desynced_wiki_scripts.wiki.render_cost import (
+    load_saved_responses,
+    parse_limit_report,
+    rank,
+    save_response,
+    write_csv,
+    write_json,
+)
+
+# Trimmed action=parse&prop=limitreportdata&formatversion=2 response.
+RESPONSE = {
+    "parse": {
+        "title": "Technologies/Robotics",
+        "pageid": 42,
+        "limitreportdata": [
+            {"name": "limitreport-cputime", "0": "0.412"},
+            {"name": "limitreport-walltime", "0": "0.530"},
+            {"name": "limitreport-postexpandincludesize", "0": 20480, "1": 2097152},
+            {"name": "limitreport-templateargumentsize", "0": 1024, "1": 2097152},
+            {"name": "limitreport-expensivefunctioncount", "0": 3, "1": 500},
+            {"name": "scribunto-limitreport-timeusage", "0": "0.250", "1": "10.000"},
+            {"name": "scribunto-limitreport-memusage", "0": 2097152, "1": 52428800},
+        ],
+    }
+}
+
+
+class TestRenderCost(unittest.TestCase):
+    def test_parse_limit_report(self):
+        cost = parse_limit_report("Robotics", RESPONSE)
+        self.assertEqual(cost.title, "Technologies/Robotics")
+        self.assertAlmostEqual(cost.lua_seconds, 0.25)
+        self.assertAlmostEqual(cost.cpu_seconds, 0.412)
+        self.assertEqual(cost.expensive_functions, 3)
+        self.assertEqual(cost.post_expand_include_size, 20480)
+        self.assertEqual(cost.lua_memory_bytes, 2097152)
+        # Not reported by this wiki.
+        self.assertIsNone(cost.cargo_queries)
+
+    def test_cargo_and_errors(self):
+        response = {"parse": {"limitreportdata": [{"name": "cargo-limitreport-querycount", "0": 7}]}}
+        self.assertEqual(parse_limit_report("Item", response).cargo_queries, 7)
+
+        error = parse_limit_report("Missing", {"error": {"code": "missingtitle", "info": "The page you specified doesn't exist."}})
+        self.assertEqual(error.title, "Missing")
+        self.assertIn("doesn't exist", error.error)
+
+    def test_rank_and_reports(self):
+        costs = [
+            parse_limit_report("Technologies/Robotics", RESPONSE),
+            parse_limit_report("Cheap", {"parse": {"limitreportdata": []}}),
+        ]
+        costs = rank(list(reversed(costs)), "expensive_functions")
+        self.assertEqual([c.title for c in costs], ["Technologies/Robotics", "Cheap"])
+
+        with tempfile.TemporaryDirectory() as tmp:
+            write_json(costs, Path(tmp) / "report.json")
+            write_csv(costs, Path(tmp) / "report.csv")
+            self.assertEqual(json.loads((Path(tmp) / "report.json").read_text())[0]["raw"]["limitreport-cputime"], "0.412")
+            with open(Path(tmp) / "report.csv", encoding="utf-8", newline="") as f:
+                rows = list(csv.DictReader(f))
+            self.assertEqual(rows[0]["post_expand_include_size"], "20480")
+            self.assertNotIn("raw", rows[0])
+
+    def test_saved_responses(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            save_response(Path(tmp), "Data:item:Metal Ore", RESPONSE)
+            save_response(Path(tmp), "Technologies/Robotics", RESPONSE)
+            self.assertEqual(sorted(load_saved_responses(Path(tmp))), ["Data:item:Metal Ore", "Technologies/Robotics"])
+
+
+if __name__ == "__main__":
+    unittest.main()
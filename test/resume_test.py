@@ -0,0 +1,65 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from desynced_wiki_scripts.cli_tools.resume import ResumeHelper
+
+
+def pending(resume: ResumeHelper, *ids: str) -> list[str]:
+    return [resumable_id for resumable_id in ids if not resume.is_done(resumable_id)]
+
+
+class TestResumeJournal(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = Path(self.directory.name) / ".resume"
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def lines(self) -> list[str]:
+        return self.path.read_text(encoding="utf-8").splitlines()
+
+    def test_resume_by_id(self):
+        resume = ResumeHelper("Tool", self.path, resume=False, sync_every=2)
+        resume.update_progress("A")
+        # Written by batches.
+        self.assertFalse(self.path.exists())
+        resume.update_progress("C")
+        self.assertEqual(len(self.lines()), 2)
+
+        # Another order, and another worker of the same tool.
+        other_worker = ResumeHelper("Tool", self.path, resume=True)
+        self.assertEqual(pending(other_worker, "D", "C", "B", "A"), ["D", "B"])
+        other_worker.update_progress("B")
+        other_worker.flush()
+        self.assertEqual(pending(ResumeHelper("Tool", self.path, resume=True), "A", "B", "C", "D"), ["D"])
+
+    def test_sources(self):
+        ResumeHelper("Other", self.path, resume=False, sync_every=1).update_progress("A")
+        resume = ResumeHelper("Tool", self.path, resume=True, sync_every=1)
+        self.assertEqual(pending(resume, "A", "B"), ["A", "B"])
+        resume.update_progress("A")
+
+        # Starting over only forgets the records of this tool.
+        ResumeHelper("Tool", self.path, resume=False)
+        self.assertEqual(self.lines(), ['{"source": "Other", "id": "A"}'])
+
+    def test_restart(self):
+        resume = ResumeHelper("Tool", self.path, resume=False, sync_every=1)
+        resume.update_progress("A")
+        resume = ResumeHelper("Tool", self.path, resume=True)
+        self.assertTrue(resume.is_done("A"))
+        resume.restart()
+        self.assertEqual(pending(resume, "A"), ["A"])
+        self.assertEqual(self.lines(), [])
+
+    def test_compaction_and_invalid_lines(self):
+        self.path.write_text('{"source": "Tool", "last_processed": "A"}\n' + '{"source": "Tool", "id": "A"}\n' * 3 + '{"source": "To', encoding="utf-8")
+        resume = ResumeHelper("Tool", self.path, resume=True)
+        self.assertEqual(pending(resume, "A", "B"), ["B"])
+        self.assertEqual(self.lines(), ['{"source": "Tool", "id": "A"}'])
+
+
+if __name__ == "__main__":
+    unittest.main()
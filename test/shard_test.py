@@ -0,0 +1,40 @@
+import tempfile
+import unittest
+from collections import Counter
+from pathlib import Path
+
+from desynced_wiki_scripts.cli_tools.shard import Shard, merge_summaries, write_summary
+
+NAMES = [f"Item {index}" for index in range(200)] + ["Metal Ore", "Mk. II Frame"]
+
+
+class TestShard(unittest.TestCase):
+    def test_parse(self):
+        self.assertEqual(Shard.parse("2/4"), Shard(2, 4))
+        self.assertEqual(str(Shard(2, 4)), "2/4")
+        for value in ("0/4", "5/4", "1", "a/b"):
+            with self.assertRaises(ValueError):
+                Shard.parse(value)
+
+    def test_partition(self):
+        shards = [Shard(index, 3) for index in range(1, 4)]
+        owners = [[shard for shard in shards if shard.owns(name)] for name in NAMES]
+        # Every name in exactly one shard, and roughly balanced.
+        self.assertTrue(all(len(owner) == 1 for owner in owners))
+        for shard in shards:
+            self.assertGreater(sum(owner == [shard] for owner in owners), len(NAMES) / 6)
+        # Stable across processes: no hash().
+        self.assertTrue(Shard(1, 1).owns("Metal Ore"))
+        self.assertEqual([Shard(index, 4).owns("Metal Ore") for index in range(1, 5)], [False, False, True, False])
+
+    def test_merge_summaries(self):
+        with tempfile.TemporaryDirectory() as directory:
+            paths = [Path(directory) / f"{index}.json" for index in range(2)]
+            write_summary(paths[0], "UploadWiki", Shard(1, 2), {"Updated data files": Counter({"item": 2, "tech": 1})})
+            write_summary(paths[1], "UploadWiki", Shard(2, 2), {"Updated data files": Counter({"item": 3})})
+            merged = merge_summaries(paths)
+            self.assertEqual(merged["UploadWiki"]["Updated data files"], Counter({"item": 5, "tech": 1}))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+import unittest
+
+from desynced_wiki_scripts.analysis.tech_tree import TechTree
+from desynced_wiki_scripts.models.recipe import RecipeItem
+
+from fixtures import make_tech
+
+
+class TestTechTree(unittest.TestCase):
+    def setUp(self):
+        cube = [RecipeItem("Cube", 1)]
+        self.tree = TechTree(
+            [
+                make_tech("Top", ["Left", "Right"], 1, [RecipeItem("Cube", 2), RecipeItem("Plate", 1)]),
+                make_tech("Left", ["Seed"], 3, cube),
+                make_tech("Right", ["Left", "Ignored"], 5, cube),
+                make_tech("Seed", [], 10, cube),
+            ]
+        )
+
+    def test_order_and_depth(self):
+        self.assertListEqual(self.tree.order, ["Seed", "Left", "Right", "Top"])
+        self.assertEqual(self.tree.depth("Seed"), 0)
+        self.assertEqual(self.tree.depth("Top"), 3)
+
+    def test_all_prerequisites(self):
+        self.assertListEqual(self.tree.all_prerequisites("Top"), ["Seed", "Left", "Right"])
+        self.assertListEqual(self.tree.all_prerequisites("Seed"), [])
+
+    def test_cumulative_cost(self):
+        # Shared prerequisite "Left" is counted once.
+        progress_count, cost = self.tree.cumulative_cost("Top")
+        self.assertEqual(progress_count, 19)
+        self.assertListEqual(cost, [RecipeItem("Cube", 20), RecipeItem("Plate", 1)])
+
+    def test_cycle_left_out(self):
+        tree = TechTree([make_tech("A", ["B"], 1, []), make_tech("B", ["A"], 1, []), make_tech("C", [], 1, [])])
+        self.assertListEqual(tree.order, ["C"])
+
+
+if __name__ == "__main__":
+    unittest.main()
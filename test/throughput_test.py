@@ -0,0 +1,32 @@
+import unittest
+
+from desynced_wiki_scripts.analysis.recipe_graph import RecipeGraph
+from desynced_wiki_scripts.analysis.throughput import ThroughputCalculator
+from desynced_wiki_scripts.models.item import MiningRecipe
+from desynced_wiki_scripts.models.recipe import Recipe, RecipeItem, RecipeProducer, RecipeType
+from desynced_wiki_scripts.models.throughput import UpstreamProducer
+
+
+class TestThroughput(unittest.TestCase):
+    def test_chain(self):
+        graph = RecipeGraph(
+            {
+                "Bar": Recipe(RecipeType.PRODUCTION, 1, [RecipeItem("Ore", 1)], [RecipeProducer("Assembler", 1.0)]),
+                "Plate": Recipe(RecipeType.PRODUCTION, 2, [RecipeItem("Bar", 3)], [RecipeProducer("Fabricator", 4.0)]),
+            },
+            {"Ore": [MiningRecipe("Miner", 2.0)]},
+        )
+        calculator = ThroughputCalculator(graph, {"Assembler": 50, "Fabricator": 20, "Miner": 10})
+        throughputs = {t.name: t for t in calculator.compute_all()}
+
+        self.assertListEqual(sorted(throughputs), ["Bar_Assembler", "Plate_Fabricator"])
+        plate = throughputs["Plate_Fabricator"]
+        self.assertEqual(plate.items_per_minute, 30.0)
+        # 15 crafts/min need 45 bars/min, one assembler makes 60.
+        self.assertListEqual(plate.upstream, [UpstreamProducer("Bar", "Assembler", 0.75)])
+        # Each assembler needs 2 miners at 30 ore/min.
+        self.assertEqual(plate.chain_power_per_second, 20 + 0.75 * (50 + 2 * 10))
+
+
+if __name__ == "__main__":
+    unittest.main()
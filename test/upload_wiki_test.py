@@ -0,0 +1,107 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+from desynced_wiki_scripts.analysis.impact_graph import ImpactGraph
+from desynced_wiki_scripts.cli_upload_wiki import PURGED_PAGES, UPDATED_DATA_FILES, UploadWiki
+from desynced_wiki_scripts.models.component import Component
+from desynced_wiki_scripts.models.item import Item
+from desynced_wiki_scripts.models.recipe_usage import RecipeUsage, UsageRelation
+from desynced_wiki_scripts.wiki.data_categories import DataCategory
+from desynced_wiki_scripts.wiki.data_tables import TableData
+from desynced_wiki_scripts.wiki.desynced_wiki_wrapper import DesyncedWiki
+from desynced_wiki_scripts.wiki.fake_wiki_server import FakeWikiConfig, FakeWikiServer
+
+from fixtures import usage
+
+
+class TestUploadWiki(unittest.TestCase):
+    """Purges against a local fake wiki. pywikibot keeps its files (cookies, throttle) in a temporary directory.
+
+    One server for all the tests: pywikibot caches the site of its url.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        directory = tempfile.TemporaryDirectory()
+        cls.addClassCleanup(directory.cleanup)
+        cls.directory = Path(directory.name)
+        (cls.directory / "config.ini").write_text("[wiki]\nusername = Bot\npassword = secret\n")
+        cls.enterClassContext(mock.patch.dict(os.environ, {"PYWIKIBOT_NO_USER_CONFIG": "1", "PYWIKIBOT_DIR": str(cls.directory)}))
+        cls.addClassCleanup(os.chdir, os.getcwd())
+        os.chdir(cls.directory)
+
+        cls.server = FakeWikiServer(FakeWikiConfig(username="Bot", password="secret"), port=0)
+        cls.server.start()
+        cls.addClassCleanup(cls.server.stop)
+        for title in ("Metal Ore", "Metal Bar", "Fabricator"):
+            cls.server.state.save(title, "{{Infobox}}", "Bot")
+
+    def setUp(self):
+        self.server.state.counts.clear()
+        self.server.state.purged.clear()
+
+    def upload(self, *argv: str) -> UploadWiki:
+        return UploadWiki(description="", argv=["--wiki-url", self.server.api_url, "--wiki-output-directory", str(self.directory), *argv])
+
+    def test_affected_pages_of_normalized_titles(self):
+        items = [SimpleNamespace(name=name) for name in ("Metal Ore", "Metal Bar", "Circuit/Board")]
+        usages = [
+            usage("Metal Ore", UsageRelation.INGREDIENT, "Metal Bar"),
+            usage("Fabricator", UsageRelation.PRODUCER, "Metal Bar"),
+            usage("Metal Bar", UsageRelation.INGREDIENT, "Circuit/Board"),
+        ]
+        graph = ImpactGraph.from_tables(
+            {
+                DataCategory.item: TableData(Item, items),
+                DataCategory.component: TableData(Component, [SimpleNamespace(name="Fabricator")]),
+                DataCategory.recipeUsage: TableData(RecipeUsage, usages),
+            }
+        )
+        upload = self.upload()
+        # As recorded by process_page: generated as "Data:item:Metal Bar", normalized by the wiki.
+        upload._updated_data_pages = ["Data:Item:Metal Bar"]
+
+        self.assertEqual(upload.affected_pages(graph), ["Circuit_Board", "Fabricator", "Metal Bar", "Metal Ore"])
+
+    def test_purge_by_batches(self):
+        titles = ["Metal Ore", "Metal Bar", "Fabricator"] + [f"Missing {index}" for index in range(100)]
+
+        dry_run = self.upload()
+        dry_run.purge_pages(titles)
+        self.assertEqual(dry_run.counts[PURGED_PAGES]["Pages"], 103)
+        self.assertEqual(self.server.state.counts["purge"], 0)
+
+        upload = self.upload("--apply")
+        upload.purge_pages(titles)
+        self.assertEqual(self.server.state.counts["purge"], 3)
+        self.assertEqual(self.server.state.purged, ["Metal Ore", "Metal Bar", "Fabricator"])
+        # Missing pages are not counted.
+        self.assertEqual(upload.counts[PURGED_PAGES]["Pages"], 3)
+
+    def test_mirror_dry_run_does_not_log_in(self):
+        output = self.directory / "mirror_output"
+        (output / "Data" / "item").mkdir(parents=True)
+        (output / "Data" / "item" / "Metal Ore").write_text("{{DataItem}}")
+        argv = ("--wiki-output-directory", str(output), "--mirror-file", str(output / "mirror.sqlite"))
+
+        # Fills the mirror.
+        upload = self.upload(*argv)
+        self.addCleanup(upload.mirror.close)
+        upload.run()
+
+        self.server.state.counts.clear()
+        with mock.patch.object(DesyncedWiki, "_connect", side_effect=AssertionError("network login attempted")):
+            upload = self.upload(*argv, "--no-mirror-sync")
+            self.addCleanup(upload.mirror.close)
+            upload.run()
+
+        self.assertEqual(upload.counts[UPDATED_DATA_FILES][DataCategory.item], 1)
+        self.assertEqual(self.server.state.counts, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
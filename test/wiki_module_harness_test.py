@@ -0,0 +1,57 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from desynced_wiki_scripts.lua_wiki_modules.harness import WikiModuleHarness
+from desynced_wiki_scripts.wiki.cargo.cargo_emulator import CargoEmulator
+from desynced_wiki_scripts.wiki.lua_data import render_data_module
+
+class TestWikiModuleHarness(unittest.TestCase):
+    def test_tech_recipe_without_cargo_queries(self):
+        with tempfile.TemporaryDirectory() as output_dir:
+            modules = Path(output_dir) / "Module" / "GameData"
+            modules.mkdir(parents=True)
+            tech = {"name": "Top", "luaId": "t_top", "progressCount": 2, "numProduced": 1, "ingredient1": "Cube", "amount1": 3}
+            (modules / "tech").write_text(render_data_module("tech", [tech]))
+            (modules / "techtree").write_text(render_data_module("techtree", []))
+            (modules / "component").write_text(render_data_module("component", []))
+
+            cargo = CargoEmulator()
+            self.addCleanup(cargo.close)
+            harness = WikiModuleHarness(Path(output_dir), cargo=cargo)
+            stats = harness.invoke(harness.load_module("TechRecipe"), "render", {"name": "Top"})
+
+        self.assertEqual(stats.error, "")
+        self.assertIn("[[File:Cube.png|64x64px|link=Cube|alt=Cube]] 6", stats.output)
+        self.assertEqual(stats.counts["cargo_query"], 0)
+        self.assertEqual(stats.counts["load_data"], 3)
+
+    def test_navbox_category_filter_on_empty_value(self):
+        with tempfile.TemporaryDirectory() as output_dir:
+            modules = Path(output_dir) / "Module" / "GameData"
+            modules.mkdir(parents=True)
+            # Empty fields are left out of the modules: no filterVal, no tag.
+            filters = [
+                {"name": "Untagged", "tab": "item", "filterField": "tag", "ordering": 2},
+                {"name": "Ores", "tab": "item", "filterField": "tag", "filterVal": "resource", "ordering": 1},
+            ]
+            items = [
+                {"name": "Cube", "unlockable": True},
+                {"name": "Metal Ore", "tag": "resource", "unlockable": True},
+            ]
+            (modules / "categoryfilter").write_text(render_data_module("categoryfilter", filters))
+            (modules / "item").write_text(render_data_module("item", items))
+
+            cargo = CargoEmulator()
+            self.addCleanup(cargo.close)
+            harness = WikiModuleHarness(Path(output_dir), cargo=cargo)
+            navboxes = harness.load_module("Navboxes")
+            stats = harness.invoke(navboxes, "create", {"title": "Items", "type": "Item"})
+
+        self.assertEqual(stats.error, "")
+        self.assertLess(stats.output.index("Metal Ore"), stats.output.index("Cube"))
+        self.assertIn("Untagged", stats.output)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+
+from desynced_wiki_scripts.wiki.page_template import extract_templates_from_page, extract_templates_info_from_page, page_has_template
+from desynced_wiki_scripts.wiki.wikitext import Edit, WikiText, apply_edits, parse_wikitext
+
+PAGE = """{{Infobox}}
+Text with a [[Link|label]] and {{Tooltip|Metal Ore|{{Icon|metalore}}}}.
+{{#if:{{{1|}}}|{{Yes}}|no}}
+{{Recipe cargo|{{PAGENAME}}}}"""
+
+
+class TestWikiText(unittest.TestCase):
+    def test_nested_templates(self):
+        wikitext = WikiText(PAGE)
+        self.assertEqual([node.name for node in wikitext.roots], ["Infobox", "Tooltip", "", "Recipe cargo"])
+        self.assertEqual(wikitext.template_names(), ["Infobox", "Tooltip", "Icon", "Yes", "Recipe cargo", "PAGENAME"])
+
+        tooltip = wikitext.roots[1]
+        self.assertEqual(PAGE[tooltip.start : tooltip.end], "{{Tooltip|Metal Ore|{{Icon|metalore}}}}")
+        # The "|" of the nested template are its own.
+        self.assertEqual(tooltip.arg_count, 2)
+        self.assertEqual(tooltip.children[0].arg_count, 1)
+
+        # Parameters and links don't separate arguments.
+        parser_function = wikitext.roots[2]
+        self.assertEqual(parser_function.arg_count, 2)
+
+    def test_names(self):
+        wikitext = WikiText("{{ Recipe cargo \n|x}}{{Infobox#anchor}}")
+        node = wikitext.templates[0]
+        self.assertEqual(node.name, "Recipe cargo")
+        self.assertEqual(wikitext.content[node.name_start : node.name_end], "Recipe cargo")
+        self.assertEqual(wikitext.templates[1].name, "Infobox")
+
+    def test_unclosed(self):
+        wikitext = WikiText("{{Broken|{{Icon|x}} }} }}{{Open|{{Inner}}")
+        self.assertEqual(wikitext.template_names(), ["Broken", "Icon", "Inner"])
+        self.assertEqual([node.name for node in wikitext.roots], ["Broken", "Inner"])
+
+    def test_apply_edits(self):
+        content = "{{Infobox|a|b}} {{Other}}"
+        wikitext = parse_wikitext(content)
+        infobox, other = wikitext.templates
+        edits = [
+            Edit(other.name_start, other.name_end, "New"),
+            Edit(infobox.separators[0], infobox.content_end),
+        ]
+        self.assertEqual(apply_edits(content, edits), "{{Infobox}} {{New}}")
+        with self.assertRaises(ValueError):
+            apply_edits(content, [Edit(0, 5, ""), Edit(3, 6, "")])
+
+    def test_page_template(self):
+        self.assertEqual(extract_templates_from_page("{{A|{{B}}}}"), ["A", "B"])
+        self.assertEqual(extract_templates_info_from_page("{{A|[[B|c]]|d}}")[0][1].arg_count, 2)
+        self.assertTrue(page_has_template(PAGE, "Icon"))
+        self.assertFalse(page_has_template(PAGE, "Link"))
+        # Same content, same parse.
+        self.assertIs(parse_wikitext(PAGE), parse_wikitext(PAGE))
+
+
+if __name__ == "__main__":
+    unittest.main()
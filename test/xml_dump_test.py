@@ -0,0 +1,40 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from desynced_wiki_scripts.wiki.xml_dump import iter_dump_pages
+
+DUMP = """<mediawiki xmlns="http://www.mediawiki.org/xml/export-0.11/" version="0.11" xml:lang="en">
+  <siteinfo><sitename>Desynced Wiki</sitename></siteinfo>
+  <page>
+    <title>Metal Ore</title>
+    <ns>0</ns>
+    <id>12</id>
+    <revision><id>99</id><text xml:space="preserve">old</text></revision>
+    <revision><id>100</id><text bytes="11" xml:space="preserve">{{Infobox}}</text></revision>
+  </page>
+  <page>
+    <title>Template:Infobox</title>
+    <ns>10</ns>
+    <id>13</id>
+    <revision><id>7</id><text bytes="0" xml:space="preserve" /></revision>
+  </page>
+</mediawiki>
+"""
+
+
+class TestXmlDump(unittest.TestCase):
+    def test_iter_dump_pages(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "dump.xml"
+            path.write_text(DUMP, encoding="utf-8")
+            pages = list(iter_dump_pages(path))
+
+        self.assertEqual([(p.title, p.namespace, p.revision_id) for p in pages], [("Metal Ore", 0, 100), ("Template:Infobox", 10, 7)])
+        # Last revision.
+        self.assertEqual(pages[0].text, "{{Infobox}}")
+        self.assertEqual(pages[1].text, "")
+
+
+if __name__ == "__main__":
+    unittest.main()